@@ -17,6 +17,8 @@ class Configuration(object):
     VALUE_MOTOR_CLASS_DUMMY = "dummy"
     VALUE_MOTOR_CLASS_EMULATION = "emulation"
     
+    KEY_FRAME = "frame"
+    
     KEY_IMU_CLASS = "imu-class"
     VALUE_IMU_CLASS_3000 = "imu3000"
     VALUE_IMU_CLASS_6050 = "imu6050"
@@ -24,9 +26,46 @@ class Configuration(object):
     VALUE_IMU_CLASS_3000EMU = "imu3000emu"
     VALUE_IMU_CLASS_DUMMY = "dummy"
     VALUE_IMU_CLASS_EMULATION = "emulation"
+    VALUE_IMU_CLASS_REPLAY = "replay"
+    
+    KEY_IMU_INTERRUPT = "imu-interrupt"
+    VALUE_IMU_INTERRUPT_POLLING = "polling"
+    VALUE_IMU_INTERRUPT_GPIO = "gpio"
+    VALUE_IMU_INTERRUPT_SIMULATED = "simulated"
+    KEY_IMU_INTERRUPT_GPIO = "imu-interrupt-gpio"
+    
+    KEY_SENSOR_ACQUISITION = "sensor-acquisition"
+    VALUE_SENSOR_ACQUISITION_SYNCHRONOUS = "synchronous"
+    VALUE_SENSOR_ACQUISITION_THREADED = "threaded"
+    
+    KEY_ATTITUDE_ESTIMATOR = "attitude-estimator"
+    VALUE_ATTITUDE_ESTIMATOR_COMPLEMENTARY = "complementary"
+    VALUE_ATTITUDE_ESTIMATOR_MAHONY = "mahony"
+    VALUE_ATTITUDE_ESTIMATOR_MADGWICK = "madgwick"
+    
+    KEY_SENSOR_RECORD_FILE = "sensor-record-file"
+    KEY_SENSOR_RECORD_RAW = "sensor-record-raw"
+    KEY_SENSOR_REPLAY_FILE = "sensor-replay-file"
+    KEY_SENSOR_REPLAY_REAL_TIME = "sensor-replay-real-time"
+    
+    KEY_CALIBRATION_FILE = "calibration-file"
+    KEY_CALIBRATION_TEMPERATURE_BAND = "calibration-temperature-band"
+    
+    KEY_VERTICAL_ESTIMATOR = "vertical-estimator"
+    KEY_ALTIMETER_CLASS = "altimeter-class"
+    VALUE_ALTIMETER_CLASS_NONE = "none"
+    VALUE_ALTIMETER_CLASS_EMULATION = "emulation"
     
     KEY_REMOTE_ADDRESS = "remote-address"
     
+    KEY_LOOP_SCHEDULER = "loop-scheduler"
+    VALUE_LOOP_SCHEDULER_SLEEP = "sleep"
+    VALUE_LOOP_SCHEDULER_DEADLINE = "deadline"
+    KEY_LOOP_SPIN_TIME = "loop-spin-time"
+    KEY_LOOP_PRIORITY = "loop-priority"
+    KEY_LOOP_CPU = "loop-cpu"
+    KEY_LOOP_LOCK_MEMORY = "loop-lock-memory"
+    
     PID_ANGLES_SPEED_KP = "PID_ANGLES_SPEED_KP"
     PID_ANGLES_SPEED_KI = "PID_ANGLES_SPEED_KI"
     PID_ANGLES_SPEED_KD = "PID_ANGLES_SPEED_KD"
@@ -39,6 +78,11 @@ class Configuration(object):
     PID_ACCEL_KI = "PID_ACCEL_KI"
     PID_ACCEL_KD = "PID_ACCEL_KD"
     
+    PID_PERIOD = "PID_PERIOD"
+    PID_ANGLES_SPEED_DIVIDER = "PID_ANGLES_SPEED_DIVIDER"
+    PID_ANGLES_DIVIDER = "PID_ANGLES_DIVIDER"
+    PID_ACCEL_DIVIDER = "PID_ACCEL_DIVIDER"
+    
     KEY_MAX_ANGLE_X = "MAX_ANGLE_X"
     KEY_MAX_ANGLE_Y = "MAX_ANGLE_Y"
     KEY_MAX_ANGLE_SPEED_X = "MAX_ANGLE_SPEED_X"
@@ -48,10 +92,35 @@ class Configuration(object):
     
     DEFAULT_CONFIG = {
                       KEY_MOTOR_CLASS: VALUE_MOTOR_CLASS_DUMMY,
+                      KEY_FRAME: "quad+", #See Mixer.FRAME_*
                       KEY_IMU_CLASS: VALUE_IMU_CLASS_DUMMY,
                       
+                      KEY_IMU_INTERRUPT: VALUE_IMU_INTERRUPT_POLLING,
+                      KEY_IMU_INTERRUPT_GPIO: 117, #P9_25
+                      
+                      KEY_SENSOR_ACQUISITION: VALUE_SENSOR_ACQUISITION_SYNCHRONOUS,
+                      
+                      KEY_ATTITUDE_ESTIMATOR: VALUE_ATTITUDE_ESTIMATOR_COMPLEMENTARY,
+                      
+                      KEY_SENSOR_RECORD_FILE: "", #Empty means no recording
+                      KEY_SENSOR_RECORD_RAW: False,
+                      KEY_SENSOR_REPLAY_FILE: "sensor-record.bin",
+                      KEY_SENSOR_REPLAY_REAL_TIME: False,
+                      
+                      KEY_CALIBRATION_FILE: "./sensor-calibration.json",
+                      KEY_CALIBRATION_TEMPERATURE_BAND: 10.0, #degC
+                      
+                      KEY_VERTICAL_ESTIMATOR: False,
+                      KEY_ALTIMETER_CLASS: VALUE_ALTIMETER_CLASS_NONE,
+                      
                       KEY_REMOTE_ADDRESS: "localhost",
                       
+                      KEY_LOOP_SCHEDULER: VALUE_LOOP_SCHEDULER_DEADLINE,
+                      KEY_LOOP_SPIN_TIME: 0.0005,
+                      KEY_LOOP_PRIORITY: 0,
+                      KEY_LOOP_CPU: -1,
+                      KEY_LOOP_LOCK_MEMORY: False,
+                      
                       PID_ANGLES_SPEED_KP: [0.0, 0.0, 0.0], 
                       PID_ANGLES_SPEED_KI: [0.0, 0.0, 0.0],  
                       PID_ANGLES_SPEED_KD: [0.0, 0.0, 0.0],
@@ -64,6 +133,11 @@ class Configuration(object):
                       PID_ACCEL_KI: [0.0, 0.0, 0.0],  
                       PID_ACCEL_KD: [0.0, 0.0, 0.0],
                       
+                      PID_PERIOD: 0.006, #166.666Hz
+                      PID_ANGLES_SPEED_DIVIDER: 1,
+                      PID_ANGLES_DIVIDER: 1,
+                      PID_ACCEL_DIVIDER: 1,
+                      
                       KEY_MAX_ANGLE_X: 0.0,
                       KEY_MAX_ANGLE_Y: 0.0,
                       KEY_MAX_ANGLE_SPEED_X: 0.0,
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from emulation.drone import EmulatedDrone
+from emulation.noise import SensorNoiseModel
+
+
+class EmulatedAltimeter(object):
+    '''
+    Altimeter (barometer or sonar) of the emulated drone.
+
+    It measures at its own rate, which is usually slower than the PID's one.
+    '''
+
+    PERIOD = 0.02 #s
+    NOISE = 0.1 #m
+    BIAS_WALK = 0.01 #m/√s
+
+    def __init__(self, seed=None, period=PERIOD, noise=NOISE, biasWalk=BIAS_WALK):
+        '''
+        Constructor
+
+        @param seed: Seed of the errors. If None, the seed is random.
+        @param period: Time between measurements in seconds
+        @param noise: Standard deviation of the white noise in meters
+        @param biasWalk: Drift of the measurements as standard deviation per square root of second
+        '''
+
+        self._drone = EmulatedDrone.getInstance()
+        self._period = period
+        self._noise = SensorNoiseModel(1, seed, noise, 0.0, biasWalk)
+        self._height = [0.0]
+        self._lastTime = None
+
+
+    def readAltitude(self):
+        '''
+        @return: Height in meters, or None if there isn't a new measurement since the last reading
+        '''
+
+        state = self._drone.getState()
+        time = state._time
+
+        if time == None or self._lastTime == None or time - self._lastTime >= self._period:
+
+            self._lastTime = time
+            self._height[0] = state._coords[2]
+            altitude = self._noise.apply(self._height, time)[0]
+
+        else:
+            altitude = None
+
+        return altitude
@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from config import Configuration
+from emulation.drone import EmulatedDrone
+from emulation.motor import EmulatedMotor
+from emulation.propeller import Propeller
+from emulation.sensor import EmulatedSensor
+from flight.controller import FlightController
+from flight.driving.mixer import Mixer, NumpyMixer
+from flight.stabilization.pid_engine import NumpyPidEngine
+
+
+try:
+    import numpy
+
+except ImportError:
+
+    numpy = None
+
+
+class BatchEmulatedDrone(object):
+    '''
+    Emulates many drones at once. The state of all drones is held as arrays (one row per drone)
+    and all of them are updated within a single vectorized step.
+
+    The physics are the same as EmulatedDrone's, but the propellers may differ from drone to drone.
+    '''
+
+    PROPELLER_COUNT = 4
+
+    #Propellers' rotation as in EmulatedDrone: CCW, CW, CCW, CW
+    COUNTER_ROTATION_SIGNS = [-1.0, 1.0, -1.0, 1.0]
+
+    def __init__(self, count, throttleRotationRates=None, thrustedWeights=None, realisticFlight=False, \
+                 hangedMode=EmulatedDrone.HANGED_MODE):
+        '''
+        Constructor
+
+        @param count: Number of drones
+        @param throttleRotationRates: Array (count, 4) of each propeller's throttle rotation rate. See Propeller.
+            If None, all of them are 1.0
+        @param thrustedWeights: Array (count, 4) of the weight carried by each propeller. See Propeller.
+            If None, the drone's weight is equally distributed.
+        @param realisticFlight: Applies the propellers' low-pass filter
+        @param hangedMode: See EmulatedDrone.HANGED_MODE
+        '''
+
+        if numpy == None:
+            raise Exception("The batch emulator requires NumPy")
+
+        shape = (count, BatchEmulatedDrone.PROPELLER_COUNT)
+
+        self._count = count
+        self._hangedMode = hangedMode
+        self._weight = EmulatedDrone.WEIGHT
+        self._arcSpeedToAngleSpeed = 180.0 / numpy.pi * EmulatedDrone.ARM_LENGTH
+        self._lowPassFilter = Propeller.LPF if realisticFlight else 1.0
+
+        rates = numpy.ones(shape) if throttleRotationRates is None \
+            else numpy.array(throttleRotationRates, dtype=float).reshape(shape)
+        self._throttleThrustRates = EmulatedDrone.PROPELLER_THRUST_RATE * rates
+
+        self._thrustedWeights = numpy.full(shape, self._weight / BatchEmulatedDrone.PROPELLER_COUNT) \
+            if thrustedWeights is None else numpy.array(thrustedWeights, dtype=float).reshape(shape)
+        self._hangedForce = Propeller.GRAVITY * self._thrustedWeights.sum(axis=1)
+
+        self._counterRotationRates = numpy.array(BatchEmulatedDrone.COUNTER_ROTATION_SIGNS) \
+            * EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE
+
+        self._friction = numpy.array([EmulatedDrone.HORIZONTAL_FRICTION_CONSTANT, \
+                                      EmulatedDrone.HORIZONTAL_FRICTION_CONSTANT, \
+                                      EmulatedDrone.VERTICAL_FRICTION_CONSTANT])
+
+        self._throttles = numpy.zeros(shape)
+        self._thrustModules = numpy.zeros(shape)
+
+        self._coords = numpy.zeros((count, 3))
+        self._speeds = numpy.zeros((count, 3))
+        self._accels = numpy.zeros((count, 3))
+        self._angleSpeeds = numpy.zeros((count, 3))
+        self._angles = numpy.zeros((count, 3))
+        self._crashed = numpy.zeros(count, dtype=bool)
+
+        if EmulatedDrone.X_CONFIGURATON:
+            self._angles[:, 2] = -45.0
+
+        if hangedMode:
+            self._coords[:, 2] = 1.0
+
+
+    @staticmethod
+    def createRandomized(count, spread=0.03, seed=None):
+        '''
+        Creates drones whose propellers differ randomly as in the realistic flight mode of EmulatedDrone
+
+        @param count: Number of drones
+        @param spread: Max. relative deviation of each propeller from the ideal one
+        @param seed: Seed of the random generator
+        '''
+
+        if numpy == None:
+            raise Exception("The batch emulator requires NumPy")
+
+        random = numpy.random.RandomState(seed)
+        shape = (count, BatchEmulatedDrone.PROPELLER_COUNT)
+        rates = random.uniform(1.0 - spread, 1.0, shape)
+        weights = random.uniform(1.0 - spread, 1.0 + spread, shape) \
+            * EmulatedDrone.WEIGHT / BatchEmulatedDrone.PROPELLER_COUNT
+
+        return BatchEmulatedDrone(count, rates, weights, True)
+
+
+    def getCount(self):
+
+        return self._count
+
+
+    def setThrottles(self, throttles):
+        '''
+        Sets the throttle of all propellers
+
+        @param throttles: Array (count, 4) of throttle percentages
+        '''
+
+        self._throttles[:] = throttles
+
+        effectiveThrottles = numpy.maximum(self._throttles - Propeller.THROTTLE_THRESHOLD, 0.0)
+        newThrustModules = effectiveThrottles * self._throttleThrustRates * Propeller.GRAVITY
+        self._thrustModules += self._lowPassFilter * (newThrustModules - self._thrustModules)
+
+
+    @staticmethod
+    def _normalizeAngles(angles):
+
+        angles[angles < -180.0] += 360.0
+        angles[angles > 180.0] -= 360.0
+
+
+    def step(self, dt):
+        '''
+        Updates the state of all drones
+
+        @param dt: Elapsed time in seconds
+        '''
+
+        dt2 = dt / 2.0
+        active = ~self._crashed
+        previous = (self._coords.copy(), self._speeds.copy(), self._accels.copy(), \
+                    self._angleSpeeds.copy(), self._angles.copy())
+        _, previousSpeeds, previousAccels, previousAngleSpeeds, _ = previous
+
+        #Thrust direction: Vector.rotateVector3D applied to the Z-axis
+        radians = numpy.radians(self._angles)
+        cosx, cosy, cosz = numpy.cos(radians).T
+        sinx, siny, sinz = numpy.sin(radians).T
+
+        thrust = self._thrustModules.sum(axis=1)
+        forces = numpy.empty((self._count, 3))
+        forces[:, 0] = thrust * (cosz * siny * cosx + sinz * sinx)
+        forces[:, 1] = thrust * (sinz * siny * cosx - cosz * sinx)
+        forces[:, 2] = thrust * cosy * cosx - self._hangedForce
+        forces -= self._speeds * self._friction
+
+        self._angleSpeeds[:, 2] = (self._thrustModules * self._counterRotationRates).sum(axis=1)
+
+        #Speed & position
+        self._accels = forces / self._weight
+        self._speeds += (self._accels + previousAccels) * dt2
+        if not self._hangedMode:
+            self._coords += (self._speeds + previousSpeeds) * dt2
+
+        #The drone can not fly underground
+        grounded = (self._coords[:, 2] <= 0.0) & (self._speeds[:, 2] <= 0.0)
+        flying = ~grounded
+
+        if grounded.any():
+            self._crashed |= grounded & (self._speeds[:, 2] < EmulatedDrone.MAX_CRASH_SPEED)
+            self._coords[grounded, 2] = 0.0
+            self._accels[grounded] = 0.0
+            self._speeds[grounded] = 0.0
+            self._angles[grounded, 0:2] = 0.0
+            self._angleSpeeds[grounded] = 0.0
+
+        #Angles. Positive angles are CCW for axis Z
+        orthogonalAccels = self._throttles * self._throttleThrustRates * Propeller.GRAVITY / self._thrustedWeights
+        accelAxisX = orthogonalAccels[:, 3] - orthogonalAccels[:, 1]
+        accelAxisY = orthogonalAccels[:, 2] - orthogonalAccels[:, 0]
+
+        angleSpeeds = self._angleSpeeds[flying]
+        angleSpeeds[:, 0] += accelAxisX[flying] * dt * self._arcSpeedToAngleSpeed
+        angleSpeeds[:, 1] += accelAxisY[flying] * dt * self._arcSpeedToAngleSpeed
+
+        angles = self._angles[flying]
+        angles += (angleSpeeds + previousAngleSpeeds[flying]) * dt2
+        BatchEmulatedDrone._normalizeAngles(angles)
+
+        self._angleSpeeds[flying] = angleSpeeds
+        self._angles[flying] = angles
+
+        #Crashed drones don't change anymore
+        if not active.all():
+            crashed = ~active
+            self._coords[crashed], self._speeds[crashed], self._accels[crashed], \
+                self._angleSpeeds[crashed], self._angles[crashed] = [values[crashed] for values in previous]
+
+
+    def getAngles(self):
+        '''
+        @return: Array (count, 3) of the drones' angles as degrees
+        '''
+
+        return self._angles
+
+
+    def getWorldAngles(self):
+        '''
+        @return: Array (count, 3) of angles as the IMU reads them. See EmulatedDrone.getState
+        '''
+
+        if EmulatedDrone.X_CONFIGURATON:
+            #Rotate angles +45º
+            radians = numpy.radians(self._angles)
+            sinX = numpy.sin(radians[:, 0])
+            sinY = numpy.sin(radians[:, 1])
+
+            worldAngles = numpy.empty((self._count, 3))
+            worldAngles[:, 0] = numpy.degrees(numpy.arcsin((sinX + sinY) / 2.0 / EmulatedDrone.R1))
+            worldAngles[:, 1] = numpy.degrees(numpy.arcsin((sinY - sinX) / 2.0 / EmulatedDrone.R1))
+            worldAngles[:, 2] = self._angles[:, 2] + 45.0
+
+        else:
+            worldAngles = self._angles.copy()
+
+        return worldAngles
+
+
+    def getAngleSpeeds(self):
+
+        return self._angleSpeeds
+
+
+    def getAccels(self):
+
+        return self._accels
+
+
+    def getSpeeds(self):
+
+        return self._speeds
+
+
+    def getCoords(self):
+
+        return self._coords
+
+
+    def getCrashed(self):
+
+        return self._crashed
+
+
+class BatchSimulation(object):
+    '''
+    Flies many emulated drones at once, each of them stabilized by its own PID constants.
+    The whole flight is simulated in lockstep (see LockstepSimulation), but all drones, PIDs
+    and mixers are calculated as arrays.
+
+    Useful for Monte Carlo runs over propeller asymmetry, noise and PID constants.
+    '''
+
+    def __init__(self, drone, seed=None, addNoise=True, frame=""):
+        '''
+        Constructor
+
+        @param drone: BatchEmulatedDrone
+        @param seed: Seed of the sensors' noise
+        @param addNoise: Adds noise to the sensor readings as EmulatedSensor does
+        @param frame: Frame of the multirotor. See Mixer.FRAME_*
+        If frame value is not provided, the configuration will be used.
+        '''
+
+        config = Configuration.getInstance().getConfig()
+
+        if frame == "":
+            frame = config[Configuration.KEY_FRAME]
+
+        matrix = Mixer.getMatrix(frame)
+        if len(matrix) != BatchEmulatedDrone.PROPELLER_COUNT:
+            raise Exception("The frame \"{0}\" needs {1} motors, but the batch emulator has {2} propellers" \
+                            .format(frame, len(matrix), BatchEmulatedDrone.PROPELLER_COUNT))
+
+        self._drone = drone
+        self._count = drone.getCount()
+        self._period = config[Configuration.PID_PERIOD]
+        self._time = 0.0
+
+        self._addNoise = addNoise
+        self._random = numpy.random.RandomState(seed)
+
+        self._anglesSpeedDivider = max(1, int(config[Configuration.PID_ANGLES_SPEED_DIVIDER]))
+        self._anglesDivider = max(1, int(config[Configuration.PID_ANGLES_DIVIDER]))
+        self._tickCount = 0
+
+        count = self._count
+        self._anglesSpeedEngine = NumpyPidEngine([0.0] * 3 * count, [0.0] * 3 * count, [0.0] * 3 * count)
+        self._anglesEngine = NumpyPidEngine([0.0] * 2 * count, [0.0] * 2 * count, [0.0] * 2 * count)
+
+        self.setAnglesSpeedConstants(config[Configuration.PID_ANGLES_SPEED_KP], \
+                                     config[Configuration.PID_ANGLES_SPEED_KI], \
+                                     config[Configuration.PID_ANGLES_SPEED_KD])
+        self.setAnglesConstants(config[Configuration.PID_ANGLES_KP], \
+                                config[Configuration.PID_ANGLES_KI], \
+                                config[Configuration.PID_ANGLES_KD])
+
+        self._mixer = NumpyMixer(matrix, 0.0, EmulatedMotor.MAX_THROTTLE)
+
+        self._throttle = 0.0
+        self._anglesTargets = numpy.zeros((count, 2))
+        self._anglesSpeedTargets = numpy.zeros((count, 3))
+        self._command = numpy.zeros((count, 3))
+
+
+    @staticmethod
+    def _setConstants(engine, count, axes, kp, ki, kd, factor):
+
+        #Constants are given either per axis (shared by all drones) or per drone and axis
+        kp, ki, kd = [numpy.broadcast_to(numpy.asarray(k, dtype=float) / factor, (count, axes)).ravel() \
+                      for k in (kp, ki, kd)]
+
+        for index in range(count * axes):
+            engine.setConstants(index, kp[index], ki[index], kd[index])
+
+
+    def setAnglesSpeedConstants(self, kp, ki, kd):
+        '''
+        Sets the angle-speed PID constants as the configuration does (see FlightController.ANGLE_SPEED_FACTOR)
+
+        @param kp: Array (3) or (count, 3)
+        @param ki: Array (3) or (count, 3)
+        @param kd: Array (3) or (count, 3)
+        '''
+
+        BatchSimulation._setConstants(self._anglesSpeedEngine, self._count, 3, kp, ki, kd, \
+                                      FlightController.ANGLE_SPEED_FACTOR)
+
+
+    def setAnglesConstants(self, kp, ki, kd):
+        '''
+        Sets the angle PID constants
+
+        @param kp: Array (2) or (count, 2)
+        @param ki: Array (2) or (count, 2)
+        @param kd: Array (2) or (count, 2)
+        '''
+
+        BatchSimulation._setConstants(self._anglesEngine, self._count, 2, kp, ki, kd, 1.0)
+
+
+    def setThrottle(self, throttle):
+        '''
+        @param throttle: Base throttle. Either a number or an array with one value per drone.
+        '''
+
+        self._throttle = throttle
+
+
+    def setTargets(self, angleX, angleY, angleSpeedZ):
+        '''
+        Sets the targets of the angle mode. Each value can be either a number or an array with one value per drone.
+        '''
+
+        self._anglesTargets[:, 0] = angleX
+        self._anglesTargets[:, 1] = angleY
+        self._anglesSpeedTargets[:, 2] = angleSpeedZ
+
+
+    def getDrone(self):
+
+        return self._drone
+
+
+    def getTime(self):
+
+        return self._time
+
+
+    def _noisify(self, values, distribution):
+
+        #Gaussian white noise with the same mean and deviation as the uniform distribution, as EmulatedSensor's
+        whiteNoise = (distribution[1] - distribution[0]) / 12.0 ** 0.5
+        offset = (distribution[0] + distribution[1]) / 2.0
+
+        return values + offset + whiteNoise * self._random.standard_normal(values.shape)
+
+
+    def step(self):
+        '''
+        Runs a PID iteration of every drone and updates their physics
+        '''
+
+        drone = self._drone
+        dt = self._period
+
+        angleSpeeds = drone.getAngleSpeeds()
+        angles = drone.getWorldAngles()[:, 0:2]
+        if self._addNoise:
+            angleSpeeds = self._noisify(angleSpeeds, EmulatedSensor.ERROR_ANGLE_SPEED_DISTRIBUTION)
+            angles = self._noisify(angles, EmulatedSensor.ERROR_ANGLE_DISTRIBUTION)
+
+        #Each stage runs once every "divider" ticks as FlightController's stages do.
+        #The angles' output is the angle-speeds' target for the axes X and Y
+        self._tickCount += 1
+        if self._tickCount % self._anglesDivider == 0:
+            self._anglesEngine.setTargets(self._anglesTargets.ravel())
+            anglesOutput = self._anglesEngine.calculate(angles.ravel(), dt * self._anglesDivider)
+            self._anglesSpeedTargets[:, 0:2] = anglesOutput.reshape(self._count, 2)
+
+        if self._tickCount % self._anglesSpeedDivider == 0:
+            self._anglesSpeedEngine.setTargets(self._anglesSpeedTargets.ravel())
+            output = self._anglesSpeedEngine.calculate(angleSpeeds.ravel(), dt * self._anglesSpeedDivider)
+            self._command = output.reshape(self._count, 3)
+
+        command = self._command
+        drone.setThrottles(self._mixer.mix(command[:, 0], command[:, 1], command[:, 2], self._throttle))
+        drone.step(dt)
+
+        self._time += dt
+
+
+    def run(self, duration, listener=None):
+        '''
+        Runs the simulation for a while
+
+        @param duration: Simulated time in seconds
+        @param listener: Function called after each step with the simulation as argument
+        '''
+
+        steps = int(round(duration / self._period))
+        for _ in range(steps):
+            self.step()
+            if listener != None:
+                listener(self)
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+
+from config import Configuration
+from emulation.drone import EmulatedDrone
+from emulation.sensor import EmulatedSensor
+from flight.controller import FlightController
+from flight.driving.driver import Driver
+from flight.stabilization.scheduler import LoopStatistics, SimulatedClock, SimulatedScheduler, monotonic
+from sensors.IMU_dummy import IMUDummy
+
+
+#CPU time of the calling thread if available, otherwise of the whole process
+try:
+    cpuTime = time.thread_time
+
+except AttributeError:
+
+    try:
+        cpuTime = time.process_time
+
+    except AttributeError:
+
+        cpuTime = time.clock
+
+
+#Python 2 can't count the allocated memory blocks
+allocatedBlocks = getattr(sys, "getallocatedblocks", None)
+
+#Python 2 can't trace the memory allocations, and the peak can't be reset before Python 3.9
+try:
+    import tracemalloc
+    if not hasattr(tracemalloc, "reset_peak"):
+        tracemalloc = None
+
+except ImportError:
+
+    tracemalloc = None
+
+
+class BenchmarkScheduler(object):
+    '''
+    Wraps the scheduler of a control loop in order to measure each tick: wall time between ticks,
+    wall and CPU time spent within the tick, and memory allocated by the tick.
+
+    The net growth of the allocated memory blocks only counts the blocks which the tick didn't free.
+    The memory allocated and freed within the tick is measured as the peak of the traced memory over the
+    memory in use at the tick's start. Tracing the allocations slows down the loop, hence it's optional.
+
+    All buffers are allocated at construction, so the measurement doesn't allocate within the loop.
+    '''
+
+    def __init__(self, scheduler, period, capacity, traceAllocations=False):
+        '''
+        Constructor
+
+        @param scheduler: Scheduler which actually paces the loop
+        @param period: Target period in seconds
+        @param capacity: Max. number of ticks kept for the percentiles
+        @param traceAllocations: Measures the memory allocated within each tick. It requires Python 3.9 or newer.
+        '''
+
+        self._scheduler = scheduler
+        self._period = period
+        self._traceAllocations = traceAllocations and tracemalloc != None
+        self._tracingStarted = False
+
+        self._periods = LoopStatistics(period, capacity, "Period")
+        self._jitters = LoopStatistics(period, capacity, "Jitter")
+        self._tickTimes = LoopStatistics(period, capacity, "Tick time")
+        self._cpuTimes = LoopStatistics(period, capacity, "CPU time")
+        self._allocatedBytes = LoopStatistics(period, capacity, "Allocated bytes")
+
+        self._reset()
+
+
+    def _reset(self):
+
+        self._periods.reset()
+        self._jitters.reset()
+        self._tickTimes.reset()
+        self._cpuTimes.reset()
+        self._allocatedBytes.reset()
+
+        self._allocatedBlocks = 0
+        self._startTime = 0.0
+        self._stopTime = 0.0
+        self._tickStart = 0.0
+        self._cpuStart = 0.0
+        self._blocksStart = 0
+        self._memoryStart = 0
+
+
+    def _startTick(self):
+
+        self._cpuStart = cpuTime()
+        if allocatedBlocks != None:
+            self._blocksStart = allocatedBlocks()
+        if self._traceAllocations:
+            tracemalloc.reset_peak()
+            self._memoryStart = tracemalloc.get_traced_memory()[0]
+
+
+    def now(self):
+
+        return self._scheduler.now()
+
+
+    def isThreaded(self):
+
+        return self._scheduler.isThreaded()
+
+
+    def start(self):
+
+        self._reset()
+        self._scheduler.start()
+
+        if self._traceAllocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracingStarted = True
+
+        self._startTime = self._tickStart = monotonic()
+        self._startTick()
+
+
+    def waitNext(self):
+
+        tickEnd = monotonic()
+        self._tickTimes.add(tickEnd - self._tickStart)
+        self._cpuTimes.add(cpuTime() - self._cpuStart)
+        if allocatedBlocks != None:
+            self._allocatedBlocks += allocatedBlocks() - self._blocksStart
+        if self._traceAllocations:
+            self._allocatedBytes.add(tracemalloc.get_traced_memory()[1] - self._memoryStart)
+
+        self._scheduler.waitNext()
+
+        tickStart = monotonic()
+        period = tickStart - self._tickStart
+        self._periods.add(period)
+        self._jitters.add(abs(period - self._period))
+
+        self._tickStart = tickStart
+        self._startTick()
+
+
+    def stop(self):
+
+        self._stopTime = monotonic()
+        self._scheduler.stop()
+
+        if self._tracingStarted:
+            tracemalloc.stop()
+            self._tracingStarted = False
+
+
+    def getStatistics(self):
+
+        return self._scheduler.getStatistics()
+
+
+    def getTickCount(self):
+
+        return self._tickTimes.getCount()
+
+
+    @staticmethod
+    def _summarize(statistics, scale=1000.0):
+
+        return {"avg": statistics.getAverageJitter() * scale,
+                "p50": statistics.getPercentile(50.0) * scale,
+                "p90": statistics.getPercentile(90.0) * scale,
+                "p99": statistics.getPercentile(99.0) * scale,
+                "max": statistics.getMaxJitter() * scale}
+
+
+    def getResults(self):
+        '''
+        @return: Dictionary of results. Times are in milliseconds.
+            - netBlockGrowthPerTick: Memory blocks allocated but not freed by each tick. Transient allocations
+              aren't counted. None on Python 2.
+            - tickAllocatedBytes: Peak of the memory allocated within each tick, including the memory freed
+              within the tick. None if the allocations aren't traced.
+        '''
+
+        ticks = self.getTickCount()
+        wallTime = (self._stopTime if self._stopTime != 0.0 else monotonic()) - self._startTime
+
+        return {"ticks": ticks,
+                "wallTime": wallTime,
+                "loopRate": ticks / wallTime if wallTime > 0.0 else 0.0,
+                "period": BenchmarkScheduler._summarize(self._periods),
+                "jitter": BenchmarkScheduler._summarize(self._jitters),
+                "tickTime": BenchmarkScheduler._summarize(self._tickTimes),
+                "cpuTime": BenchmarkScheduler._summarize(self._cpuTimes),
+                "netBlockGrowthPerTick": float(self._allocatedBlocks) / ticks \
+                    if allocatedBlocks != None and ticks != 0 else None,
+                "tickAllocatedBytes": BenchmarkScheduler._summarize(self._allocatedBytes, 1.0) \
+                    if self._traceAllocations else None}
+
+
+class ControlBenchmark(object):
+    '''
+    Runs the flight controller headless against the emulated or dummy components and measures its loop.
+
+    Modes:
+    - lockstep: The PID runs within the calling thread against a simulated clock, as fast as possible.
+      The loop rate is the max. rate the control code can sustain.
+    - realtime: The PID runs on its own thread paced by the configured scheduler. The jitter is the
+      deviation of each period against the configured one.
+    '''
+
+    MODE_LOCKSTEP = "lockstep"
+    MODE_REALTIME = "realtime"
+
+    THROTTLE = 50.0
+    PID_THROTTLE_THRESHOLD = 20.0
+
+    #Time to sleep while the PID runs on its own thread
+    REALTIME_POLL_PERIOD = 0.05
+
+    def __init__(self, mode=MODE_LOCKSTEP, motorClass=Configuration.VALUE_MOTOR_CLASS_EMULATION, \
+                 imuClass=Configuration.VALUE_IMU_CLASS_EMULATION, seed=0, traceAllocations=False):
+        '''
+        Constructor
+
+        @param mode: See ControlBenchmark.MODE_*
+        @param motorClass: Configuration.VALUE_MOTOR_CLASS_EMULATION or Configuration.VALUE_MOTOR_CLASS_DUMMY
+        @param imuClass: Configuration.VALUE_IMU_CLASS_EMULATION or Configuration.VALUE_IMU_CLASS_DUMMY
+        @param seed: Seed of the emulated sensor's noise
+        @param traceAllocations: Measures the memory allocated within each tick. See BenchmarkScheduler.
+        '''
+
+        if mode not in [ControlBenchmark.MODE_LOCKSTEP, ControlBenchmark.MODE_REALTIME]:
+            raise Exception("Unknown benchmark mode \"{0}\"".format(mode))
+
+        self._mode = mode
+        self._motorClass = motorClass
+        self._imuClass = imuClass
+        self._seed = seed
+        self._traceAllocations = traceAllocations
+        self._period = Configuration.getInstance().getConfig()[Configuration.PID_PERIOD]
+
+
+    def run(self, ticks=0, duration=0.0):
+        '''
+        Runs the benchmark until any of the limits is reached
+
+        @param ticks: Max. number of PID iterations. Zero means no limit.
+        @param duration: Max. wall time in seconds. Zero means no limit.
+        @return: Dictionary of results
+        '''
+
+        if ticks <= 0 and duration <= 0.0:
+            raise Exception("Either ticks or duration must be set")
+
+        capacity = ticks if ticks > 0 else int(duration / self._period) + 1
+        capacity = max(1, min(capacity, LoopStatistics.HISTORY_SIZE * 16))
+
+        if self._mode == ControlBenchmark.MODE_LOCKSTEP:
+            clock = SimulatedClock()
+            EmulatedDrone.resetInstance(clock.now)
+            scheduler = BenchmarkScheduler(SimulatedScheduler(self._period, clock), self._period, capacity, \
+                                           self._traceAllocations)
+        else:
+            EmulatedDrone.resetInstance()
+            scheduler = BenchmarkScheduler(FlightController.createScheduler(self._period), self._period, capacity, \
+                                           self._traceAllocations)
+
+        #Motors and sensor must be created after the drone's reset
+        driver = Driver(self._motorClass)
+        sensor = EmulatedSensor(True, self._seed) if self._imuClass == Configuration.VALUE_IMU_CLASS_EMULATION \
+            else IMUDummy()
+        controller = FlightController(driver, sensor, scheduler)
+
+        collections = [stats["collections"] for stats in gc.get_stats()] if hasattr(gc, "get_stats") else None
+
+        controller.start()
+        controller.setPidThrottleThreshold(ControlBenchmark.PID_THROTTLE_THRESHOLD)
+        controller.addThrottle(ControlBenchmark.THROTTLE)
+
+        deadline = monotonic() + duration if duration > 0.0 else float("inf")
+        try:
+            if self._mode == ControlBenchmark.MODE_LOCKSTEP:
+                while (ticks <= 0 or scheduler.getTickCount() < ticks) and monotonic() < deadline:
+                    controller.step()
+            else:
+                while (ticks <= 0 or scheduler.getTickCount() < ticks) and monotonic() < deadline:
+                    time.sleep(ControlBenchmark.REALTIME_POLL_PERIOD)
+
+        finally:
+            controller.stop()
+            if self._mode == ControlBenchmark.MODE_LOCKSTEP:
+                #The loop is stepped by this thread, hence its scheduler isn't stopped by the controller
+                scheduler.stop()
+
+        results = scheduler.getResults()
+        if self._mode == ControlBenchmark.MODE_LOCKSTEP:
+            #Ticks don't wait for any deadline
+            results["jitter"] = None
+        if collections != None:
+            results["gcCollections"] = [stats["collections"] - previous \
+                                        for stats, previous in zip(gc.get_stats(), collections)]
+        else:
+            results["gcCollections"] = None
+
+        results.update({"mode": self._mode,
+                        "motorClass": self._motorClass,
+                        "imuClass": self._imuClass,
+                        "targetPeriod": self._period * 1000.0,
+                        "python": platform.python_version(),
+                        "implementation": platform.python_implementation(),
+                        "machine": platform.machine(),
+                        "platform": platform.platform()})
+
+        return results
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmarks the control loop headless. Results are written as JSON.")
+    parser.add_argument("-m", "--mode", help="Benchmark mode.", nargs="?", default=ControlBenchmark.MODE_LOCKSTEP, \
+                        choices=[ControlBenchmark.MODE_LOCKSTEP, ControlBenchmark.MODE_REALTIME])
+    parser.add_argument("-t", "--ticks", help="Number of PID iterations.", nargs="?", default=0, type=int)
+    parser.add_argument("-d", "--duration", help="Wall time in seconds.", nargs="?", default=0.0, type=float)
+    parser.add_argument("--motor", help="Motor class.", nargs="?", default=Configuration.VALUE_MOTOR_CLASS_EMULATION, \
+                        choices=[Configuration.VALUE_MOTOR_CLASS_EMULATION, Configuration.VALUE_MOTOR_CLASS_DUMMY])
+    parser.add_argument("--imu", help="IMU class.", nargs="?", default=Configuration.VALUE_IMU_CLASS_EMULATION, \
+                        choices=[Configuration.VALUE_IMU_CLASS_EMULATION, Configuration.VALUE_IMU_CLASS_DUMMY])
+    parser.add_argument("-a", "--allocations", help="Traces the memory allocated within each tick. It slows down the loop.", \
+                        action="store_true")
+    parser.add_argument("-o", "--output", help="JSON file. Standard output by default.", nargs="?", default=None)
+
+    args = parser.parse_args()
+
+    ticks = args.ticks if args.ticks > 0 or args.duration > 0.0 else 10000
+
+    #Messages of the control stack must not be mixed with the results
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        results = ControlBenchmark(args.mode, args.motor, args.imu, traceAllocations=args.allocations) \
+            .run(ticks, args.duration)
+
+    finally:
+        sys.stdout = stdout
+
+    serializedResults = json.dumps(results, indent=4, sort_keys=True)
+    if args.output != None:
+        with open(args.output, "w") as outputFile:
+            outputFile.write(serializedResults + "\n")
+    else:
+        print(serializedResults)
+
+
+if __name__ == '__main__':
+    main()
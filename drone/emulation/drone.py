@@ -6,20 +6,26 @@ Created on 03/02/2016
 @author: david
 '''
 
-from copy import deepcopy
 from math import pi as PI, sin, radians, sqrt, asin, degrees
-from operator import add
+from threading import RLock
 import time
 
-from emulation.propeller import Propeller
-from emulation.state import State
+from emulation.propeller import Propeller, PropellerBank
+from emulation.state import State, StateSnapshot
 
 
 class EmulatedDrone(object):
     '''
     Emulates a physical drone
+
+    The physics advance with the time given by the clock, in fixed substeps. Propeller throttles are hold
+    between two commands (zero-order hold), hence the physics don't depend on how often the motors are driven.
     '''
     
+    INTEGRATOR_TRAPEZOIDAL = "trapezoidal"
+    INTEGRATOR_SEMI_IMPLICIT_EULER = "semi-implicit-euler"
+    INTEGRATOR_RK4 = "rk4"
+    
     #TODO: Create config
     REALISTIC_FLIGHT = False #Realistic or ideal flight emulation mode
     HANGED_MODE = True #Emulates the drone hanged by ropes. It doesn't move, but speeds and accelerations changes.
@@ -32,8 +38,14 @@ class EmulatedDrone(object):
     
     HORIZONTAL_FRICTION_CONSTANT = 0.1
     VERTICAL_FRICTION_CONSTANT = 0.4
+    
+    PHYSICS_SUBSTEP = 0.002 #s. Zero means a single step each update, whatever the elapsed time
+    INTEGRATOR = INTEGRATOR_TRAPEZOIDAL
+    MAX_ELAPSED_TIME = 0.1 #s. Longer gaps between updates are skipped (i.e. the emulation was paused)
     #end config
     
+    SUBSTEP_TOLERANCE = 1e-9 #s. Avoids missing substeps due to rounding errors of the clock
+    
     R1 = sqrt(2.0)/2.0 # constant used for angle rotation in X-configuration mode
     
     _instance = None
@@ -46,8 +58,46 @@ class EmulatedDrone(object):
             
         return EmulatedDrone._instance
     
+    
+    @staticmethod
+    def resetInstance(clock=time.time, substep=None, integrator=None):
+        '''
+        Replaces the current instance by a new one at its initial state.
+        Motors and sensors must be created after the reset.
+        
+        @param clock: Function returning the current time in seconds
+        @param substep: See EmulatedDrone.__init__
+        @param integrator: See EmulatedDrone.__init__
+        '''
+        
+        EmulatedDrone._instance = EmulatedDrone(clock, substep, integrator)
+        
+        return EmulatedDrone._instance
+    
 
-    def __init__(self):
+    def __init__(self, clock=time.time, substep=None, integrator=None):
+        '''
+        Constructor
+        
+        @param clock: Function returning the current time in seconds
+        @param substep: Fixed integration step in seconds. By default, EmulatedDrone.PHYSICS_SUBSTEP
+        @param integrator: See EmulatedDrone.INTEGRATOR_*. By default, EmulatedDrone.INTEGRATOR
+        '''
+        
+        self._clock = clock
+        self._substep = substep if substep != None else EmulatedDrone.PHYSICS_SUBSTEP
+        integrator = integrator if integrator != None else EmulatedDrone.INTEGRATOR
+        if integrator == EmulatedDrone.INTEGRATOR_TRAPEZOIDAL:
+            self._step = self._stepTrapezoidal
+        elif integrator == EmulatedDrone.INTEGRATOR_SEMI_IMPLICIT_EULER:
+            self._step = self._stepSemiImplicitEuler
+        elif integrator == EmulatedDrone.INTEGRATOR_RK4:
+            self._step = self._stepRungeKutta4
+        else:
+            raise Exception("Unknown integrator \"{0}\"".format(integrator))
+        
+        self._pendingTime = 0.0
+        self._lock = RLock()
         
         self._realisticFlight = EmulatedDrone.REALISTIC_FLIGHT 
         
@@ -72,118 +122,251 @@ class EmulatedDrone(object):
         #
         if self._realisticFlight:
         
-            self._propellers = [Propeller(self, EmulatedDrone.PROPELLER_THRUST_RATE, 0.98, 1.01 * self._weight/4.0, Propeller.ROTATION_CCW, EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE),
-                                Propeller(self, EmulatedDrone.PROPELLER_THRUST_RATE, 0.97, 0.97 * self._weight/4.0, Propeller.ROTATION_CW, EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE),
-                                Propeller(self, EmulatedDrone.PROPELLER_THRUST_RATE, 0.96, 0.99 * self._weight/4.0, Propeller.ROTATION_CCW, EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE),
-                                Propeller(self, EmulatedDrone.PROPELLER_THRUST_RATE, 0.99, 1.03 * self._weight/4.0, Propeller.ROTATION_CW, EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE)]
+            throttleRotationRates = [0.98, 0.97, 0.96, 0.99]
+            thrustedWeights = [1.01 * self._weight/4.0, 0.97 * self._weight/4.0, 0.99 * self._weight/4.0, 1.03 * self._weight/4.0]
         else:
             
-            self._propellers = [Propeller(self, EmulatedDrone.PROPELLER_THRUST_RATE, 1.0, self._weight/4.0, Propeller.ROTATION_CCW, EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE),
-                                Propeller(self, EmulatedDrone.PROPELLER_THRUST_RATE, 1.0, self._weight/4.0, Propeller.ROTATION_CW, EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE),
-                                Propeller(self, EmulatedDrone.PROPELLER_THRUST_RATE, 1.0, self._weight/4.0, Propeller.ROTATION_CCW, EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE),
-                                Propeller(self, EmulatedDrone.PROPELLER_THRUST_RATE, 1.0, self._weight/4.0, Propeller.ROTATION_CW, EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE)]
-
-        self._propellersCount = len(self._propellers)
+            throttleRotationRates = [1.0]*4
+            thrustedWeights = [self._weight/4.0]*4
+            
+        self._propellers = PropellerBank(self, EmulatedDrone.PROPELLER_THRUST_RATE, throttleRotationRates, thrustedWeights, \
+                                         [Propeller.ROTATION_CCW, Propeller.ROTATION_CW, Propeller.ROTATION_CCW, Propeller.ROTATION_CW], \
+                                         EmulatedDrone.PROPELLER_COUNTER_ROTATION_RATE)
 
-        self._propellersUpdatedCount = 0
+        #Friction constant of each axis
+        self._frictions = [EmulatedDrone.HORIZONTAL_FRICTION_CONSTANT, EmulatedDrone.HORIZONTAL_FRICTION_CONSTANT, \
+                           EmulatedDrone.VERTICAL_FRICTION_CONSTANT]
+        
+        #Weight carried by the propellers
+        self._thrustedWeightForce = sum(self._propellers.getWeights()) * Propeller.GRAVITY
+        
+        #Inputs held along the current update. See _sampleInputs
+        self._thrustModule = 0.0
+        self._torque = 0.0
+        self._angleAccels = [0.0]*2
+        
+        self._snapshot = None
+        self._publishState()
         
     
     def getPropeller(self, index):
         
-        return self._propellers[index]
+        return self._propellers.getPropeller(index)
+    
+    
+    def getPropellerCount(self):
+        
+        return self._propellers.getCount()
     
     
-    def _updateStatus(self):
+    def getSubstep(self):
         
-        if self._state._time and not self._state._crashed:
+        return self._substep
+    
+    
+    def addAngleSpeeds(self, increments):
+        '''
+        Applies an external disturbance to the drone, i.e. a gust
+        
+        @param increments: Increments of the angle-speeds of the axes X and Y as degrees/s.
+            The angle-speed of the axis Z depends only on the propellers.
+        '''
+        
+        with self._lock:
+            self.update()
+            self._state._angleSpeeds[0] += increments[0]
+            self._state._angleSpeeds[1] += increments[1]
+            self._publishState()
+    
+    
+    def update(self):
+        '''
+        Advances the physics up to the current time of the clock.
+        Propellers call this method before changing their throttle, so the former throttle is applied until now.
+        '''
+        
+        with self._lock:
             
-            currentTime = time.time() 
-            dt = currentTime - self._state._time
-            #Detect pid stopped 
-            if dt > 0.1:
-                dt = 0.0
-            dt2 = dt/2.0
-            self._state._time = currentTime
+            if self._state._time != None:
+                
+                currentTime = self._clock()
+                dt = currentTime - self._state._time
+                self._state._time = currentTime
+                
+                #Detect pid stopped
+                if dt > EmulatedDrone.MAX_ELAPSED_TIME:
+                    self._pendingTime = 0.0
+                    
+                elif dt > 0.0 and not self._state._crashed:
+                    
+                    self._sampleInputs()
+                    
+                    if self._substep > 0.0:
+                        self._pendingTime += dt
+                        stepped = False
+                        while self._pendingTime > self._substep - EmulatedDrone.SUBSTEP_TOLERANCE \
+                            and not self._state._crashed:
+                            
+                            self._step(self._substep)
+                            self._pendingTime -= self._substep
+                            stepped = True
+                            
+                        if stepped:
+                            self._publishState()
+                    else:
+                        self._step(dt)
+                        self._publishState()
+    
+    
+    def _sampleInputs(self):
+        '''
+        Samples the propellers. Their values are constant until the next update (zero-order hold).
+        '''
         
-            #Accelerations
+        self._thrustModule = self._propellers.getThrustModule()
+        self._torque = self._propellers.getTorque()
             
-            previousAngleSpeedZ = self._state._angleSpeeds[2] 
-            self._state._angleSpeeds[2] = 0.0
+        #Angular acceleration (as degrees/s²) due to the difference of the opposite propellers
+        ortogonalAccels = self._propellers.getOrtogonalAccels()
+        accelAxisX = ortogonalAccels[3] - ortogonalAccels[1]
+        accelAxisY = ortogonalAccels[2] - ortogonalAccels[0]
+        self._angleAccels = [accelAxisX * self._arcSpeedToAngleSpeed, accelAxisY * self._arcSpeedToAngleSpeed]
+        
+    
+    def _calculateAccels(self, speeds, angles):
+        '''
+        Calculates the linear accelerations
+        
+        @param speeds: Linear speeds
+        @param angles: Drone's angles as degrees
+        '''
+        
+        forces = PropellerBank.rotateThrust(self._thrustModule, angles)
+        forces[2] -= self._thrustedWeightForce
+        
+        return [(forces[index] - speeds[index] * self._frictions[index]) / self._weight for index in range(3)]
+    
+    
+    def _calculateDerivatives(self, coords, speeds, angles, angleSpeeds):
+        '''
+        Calculates the derivatives of the state
+        
+        @return: Tuple of lists (coords, speeds, angles, angle-speeds) derivatives
+        '''
+        
+        coordsDerivatives = [0.0]*3 if EmulatedDrone.HANGED_MODE else list(speeds)
+        speedsDerivatives = self._calculateAccels(speeds, angles)
+        anglesDerivatives = [angleSpeeds[0], angleSpeeds[1], self._torque]
+        angleSpeedsDerivatives = self._angleAccels + [0.0]
+        
+        return coordsDerivatives, speedsDerivatives, anglesDerivatives, angleSpeedsDerivatives
+    
+    
+    def _stepTrapezoidal(self, dt):
+        '''
+        Integrates the state using the trapezoidal rule with the values of the previous step
+        '''
+        
+        dt2 = dt/2.0
+        state = self._state
+        previousYaw = state._angles[2]
+        
+        previousAccels = state._accels
+        previousSpeeds = list(state._speeds)
+        previousAngleSpeeds = list(state._angleSpeeds)
+        
+        state._accels = self._calculateAccels(state._speeds, state._angles)
+        state._angleSpeeds = [state._angleSpeeds[0] + self._angleAccels[0] * dt, \
+                              state._angleSpeeds[1] + self._angleAccels[1] * dt, \
+                              self._torque]
+        
+        for index in range(3):
+            state._speeds[index] += (state._accels[index] + previousAccels[index]) * dt2
+            if not EmulatedDrone.HANGED_MODE:
+                state._coords[index] += (state._speeds[index] + previousSpeeds[index]) * dt2
+            state._angles[index] += (state._angleSpeeds[index] + previousAngleSpeeds[index]) * dt2
             
-            forces = [0.0]*3            
-            for propeller in self._propellers:
-                            
-                propellerForces = propeller.getThrust()                
-                self._state._angleSpeeds[2] += propeller.getTorque()
-                forces = map(add, forces, propellerForces)
-            
-            forces = [force for force in forces]            
-            forces[0] -= self._state._speeds[0] * EmulatedDrone.HORIZONTAL_FRICTION_CONSTANT
-            forces[1] -= self._state._speeds[1] * EmulatedDrone.HORIZONTAL_FRICTION_CONSTANT
-            forces[2] -= self._state._speeds[2] * EmulatedDrone.VERTICAL_FRICTION_CONSTANT
-
-            previousAccels = deepcopy(self._state._accels)
-            self._state._accels = [force / self._weight for force in forces]            
+        self._finishStep(previousYaw)
+        
+        
+    def _stepSemiImplicitEuler(self, dt):
+        '''
+        Integrates the state using the semi-implicit Euler method: speeds first, then positions with the new speeds
+        '''
+        
+        state = self._state
+        previousYaw = state._angles[2]
+        
+        state._accels = self._calculateAccels(state._speeds, state._angles)
+        state._angleSpeeds = [state._angleSpeeds[0] + self._angleAccels[0] * dt, \
+                              state._angleSpeeds[1] + self._angleAccels[1] * dt, \
+                              self._torque]
+        
+        for index in range(3):
+            state._speeds[index] += state._accels[index] * dt
+            if not EmulatedDrone.HANGED_MODE:
+                state._coords[index] += state._speeds[index] * dt
+            state._angles[index] += state._angleSpeeds[index] * dt
             
-            #Speed & position
-            if EmulatedDrone.HANGED_MODE:
-
-                for index in range(3):
-                    self._state._speeds[index] += (self._state._accels[index] + previousAccels[index]) * dt2
-
-            else:
-                for index in range(3):
-                    previousSpeed = self._state._speeds[index]
-                    self._state._speeds[index] += (self._state._accels[index] + previousAccels[index]) * dt2
-                    self._state._coords[index] += (self._state._speeds[index] + previousSpeed) * dt2
-            
-            #The drone can not fly underground
-            if self._state._coords[2] <= 0.0 and self._state._speeds[2] <= 0.0:
-                            
-                self._state._crashed = self._state._speeds[2] < EmulatedDrone.MAX_CRASH_SPEED
-                
-                self._state._coords[2] = 0.0
-                self._state._accels = [0.0]*3
-                self._state._speeds = [0.0]*3
-                self._state._angles = [0.0, 0.0, self._state._angles[2]]
-                self._state._angleSpeeds = [0.0]*3
-            
-                '''    
-                elif self._state._coords[2] >= 0.5 and self._state._speeds[2] > 0.0:
-                    
-                    self._state._coords[2] = 0.5
-                    self._state._accels = [0.0]*3
-                    self._state._speeds = [0.0]*3
-                '''
-            else:
-            
-                #Calculate drone's current yaw (self._state._angles[2])
-                #Positive angles are CCW for axis Z
-                self._state._angles[2] += (self._state._angleSpeeds[2] + previousAngleSpeedZ) * dt2           
-                self._state._angles[2] = self._normalizeAngle(self._state._angles[2])
-                
-                #Calculate drone's angle-speeds
-                accelAxisX = self._propellers[3].getOrtogonalAccel() - self._propellers[1].getOrtogonalAccel()
-                previousAngleSpeedX = self._state._angleSpeeds[0]
-                self._state._angleSpeeds[0] += accelAxisX * dt * self._arcSpeedToAngleSpeed
-    
-                accelAxisY = self._propellers[2].getOrtogonalAccel() - self._propellers[0].getOrtogonalAccel()
-                previousAngleSpeedY = self._state._angleSpeeds[1]
-                self._state._angleSpeeds[1] += accelAxisY * dt * self._arcSpeedToAngleSpeed            
-    
-                #Calculate drone's angles (heading was already calculated)                
-                self._state._angles[0] += (self._state._angleSpeeds[0] + previousAngleSpeedX) * dt2
-                self._state._angles[0] = self._normalizeAngle(self._state._angles[0])
-                self._state._angles[1] += (self._state._angleSpeeds[1] + previousAngleSpeedY) * dt2
-                self._state._angles[1] = self._normalizeAngle(self._state._angles[1])                                         
-    
-            #Update propeller angles
-            for propeller in self._propellers:
-                propeller.setAngles(self._state._angles)
-
-            #if dt < 1.0:
-            #    print self._state
+        self._finishStep(previousYaw)
+        
+        
+    def _stepRungeKutta4(self, dt):
+        '''
+        Integrates the state using the classic 4th order Runge-Kutta method
+        '''
+        
+        state = self._state
+        previousYaw = state._angles[2]
+        values = (state._coords, state._speeds, state._angles, state._angleSpeeds)
+        
+        k1 = self._calculateDerivatives(*values)
+        k2 = self._calculateDerivatives(*EmulatedDrone._addScaled(values, k1, dt/2.0))
+        k3 = self._calculateDerivatives(*EmulatedDrone._addScaled(values, k2, dt/2.0))
+        k4 = self._calculateDerivatives(*EmulatedDrone._addScaled(values, k3, dt))
         
+        derivatives = [[(d1 + 2.0*d2 + 2.0*d3 + d4) / 6.0 for d1, d2, d3, d4 in zip(*group)] \
+                       for group in zip(k1, k2, k3, k4)]
+        
+        state._coords, state._speeds, state._angles, state._angleSpeeds = \
+            EmulatedDrone._addScaled(values, derivatives, dt)
+        state._angleSpeeds[2] = self._torque
+        #Mean acceleration along the step
+        state._accels = derivatives[1]
+        
+        self._finishStep(previousYaw)
+    
+    
+    @staticmethod
+    def _addScaled(values, derivatives, dt):
+        
+        return [[value + derivative * dt for value, derivative in zip(valueGroup, derivativeGroup)] \
+                for valueGroup, derivativeGroup in zip(values, derivatives)]
+    
+    
+    def _finishStep(self, previousYaw):
+        '''
+        Applies the constraints after an integration step
+        
+        @param previousYaw: Yaw before the step. The drone doesn't turn on the ground.
+        '''
+        
+        state = self._state
+        
+        #The drone can not fly underground
+        if state._coords[2] <= 0.0 and state._speeds[2] <= 0.0:
+                        
+            state._crashed = state._speeds[2] < EmulatedDrone.MAX_CRASH_SPEED
+            
+            state._coords[2] = 0.0
+            state._accels = [0.0]*3
+            state._speeds = [0.0]*3
+            state._angles = [0.0, 0.0, previousYaw]
+            state._angleSpeeds = [0.0]*3
+        
+        #Positive angles are CCW for axis Z
+        state._angles = [self._normalizeAngle(angle) for angle in state._angles]
+            
     
     def _normalizeAngle(self, angle):
         
@@ -195,14 +378,17 @@ class EmulatedDrone(object):
         return angle
      
     
-    def getState(self):
+    def _publishState(self):
+        '''
+        Publishes a snapshot of the current state. The world angles are calculated here once per update.
+        '''
         
-        currentState = deepcopy(self._state)
+        angles = self._state._angles
         
         if EmulatedDrone.X_CONFIGURATON:
             #Rotate angles +45º
-            droneAngleX = radians(currentState._angles[0])
-            droneAngleY = radians(currentState._angles[1])
+            droneAngleX = radians(angles[0])
+            droneAngleY = radians(angles[1])
             
             sinX = sin(droneAngleX)
             sinY = sin(droneAngleY)
@@ -210,30 +396,32 @@ class EmulatedDrone(object):
             hx = (sinX + sinY)/2.0
             hy = (sinY - sinX)/2.0
             
-            worldAngleX = degrees(asin(hx/EmulatedDrone.R1))
-            worldAngleY = degrees(asin(hy/EmulatedDrone.R1))
-            worldAngleZ = currentState._angles[2] + 45.0
+            #Rounding errors might lead out of the domain of asin at ±90º
+            worldAngleX = degrees(asin(max(-1.0, min(1.0, hx/EmulatedDrone.R1))))
+            worldAngleY = degrees(asin(max(-1.0, min(1.0, hy/EmulatedDrone.R1))))
+            worldAngleZ = angles[2] + 45.0
             
-            currentState._angles = [worldAngleX, worldAngleY, worldAngleZ]
-                
+            angles = [worldAngleX, worldAngleY, worldAngleZ]
         
-        return currentState
+        version = self._snapshot._version + 1 if self._snapshot != None else 0
+        self._snapshot = StateSnapshot(self._state, angles, version)
         
     
-    def initStateTime(self):
+    def getState(self):
+        '''
+        @return: Snapshot of the state up to the current time. See StateSnapshot.
+            It is shared, hence it must not be modified.
+        '''
         
-        self._state._time = time.time()
+        with self._lock:
+            self.update()
+            
+            return self._snapshot
         
     
-    def onPropellerUpdated(self):
-        
-        self._propellersUpdatedCount += 1
-        if self._propellersUpdatedCount == self._propellersCount:
-            
-            self._updateStatus()
-            self._propellersUpdatedCount = 0
-            
-        elif self._propellersUpdatedCount > self._propellersCount:
-            
-            raise Exception("Error: Any propellers updated unsuccesfully.")
+    def initStateTime(self):
         
+        with self._lock:
+            self._state._time = self._clock()
+            self._pendingTime = 0.0
+            self._publishState()
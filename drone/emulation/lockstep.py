@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from config import Configuration
+from emulation.drone import EmulatedDrone
+from emulation.sensor import EmulatedSensor
+from flight.controller import FlightController
+from flight.driving.driver import Driver
+from flight.stabilization.scheduler import SimulatedClock, SimulatedScheduler
+
+
+class LockstepSimulation(object):
+    '''
+    Runs the flight controller and the emulated drone synchronously against a simulated clock.
+
+    Each step runs a PID iteration, whose output updates the drone's physics, and then advances the clock
+    one PID period. There are neither threads nor sleeps, hence the simulation runs as fast as the CPU allows.
+    Given the same seed, the same inputs produce exactly the same flight.
+    '''
+
+    def __init__(self, seed=None, addNoise=True, substep=None, integrator=None, realisticNoise=None):
+        '''
+        Constructor
+
+        @param seed: Seed of the sensor's noise
+        @param addNoise: Adds noise to the sensor readings
+        @param substep: Physics' integration step. See EmulatedDrone
+        @param integrator: Physics' integrator. See EmulatedDrone.INTEGRATOR_*
+        @param realisticNoise: See EmulatedSensor
+        '''
+
+        config = Configuration.getInstance().getConfig()
+        self._period = config[Configuration.PID_PERIOD]
+
+        self._clock = SimulatedClock()
+        self._drone = EmulatedDrone.resetInstance(self._clock.now, substep, integrator)
+
+        #Motors and sensor must be created after the drone's reset
+        sensor = EmulatedSensor(addNoise, seed, realisticNoise)
+        driver = Driver(Configuration.VALUE_MOTOR_CLASS_EMULATION)
+        scheduler = SimulatedScheduler(self._period, self._clock)
+
+        self._controller = FlightController(driver, sensor, scheduler, \
+                                            Configuration.VALUE_SENSOR_ACQUISITION_SYNCHRONOUS)
+
+
+    def getClock(self):
+
+        return self._clock
+
+
+    def getDrone(self):
+
+        return self._drone
+
+
+    def getController(self):
+
+        return self._controller
+
+
+    def getPeriod(self):
+
+        return self._period
+
+
+    def start(self):
+
+        self._controller.start()
+
+
+    def stop(self):
+
+        self._controller.stop()
+
+
+    def step(self):
+
+        self._controller.step()
+
+
+    def run(self, duration, listener=None):
+        '''
+        Runs the simulation for a while
+
+        @param duration: Simulated time in seconds
+        @param listener: Function called after each step with the simulation as argument
+        @return: Drone's state at the end
+        '''
+
+        steps = int(round(duration / self._period))
+        for _ in range(steps):
+            self._controller.step()
+            if listener != None:
+                listener(self)
+
+        return self._drone.getState()
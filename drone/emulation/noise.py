@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from math import pi as PI, sin, sqrt
+from random import Random
+
+
+try:
+    import numpy
+
+except ImportError:
+
+    numpy = None
+
+
+class NoiseStream(object):
+    '''
+    Seeded stream of standard normal samples.
+
+    Samples are generated in blocks (at once with NumPy if available) and consumed through a cursor,
+    hence the cost of generating each sample is paid once per block.
+    '''
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, seed=None, blockSize=BLOCK_SIZE):
+        '''
+        Constructor
+
+        @param seed: Seed of the stream. The same seed produces the same samples.
+        @param blockSize: Number of samples generated at once
+        '''
+
+        self._blockSize = blockSize
+
+        if numpy != None:
+            self._numpyRandom = numpy.random.RandomState(seed)
+            self._random = None
+        else:
+            self._numpyRandom = None
+            self._random = Random(seed)
+
+        self._refill()
+
+
+    def _refill(self):
+
+        if self._numpyRandom != None:
+            #Plain floats are faster than NumPy scalars when read one by one
+            self._block = self._numpyRandom.standard_normal(self._blockSize).tolist()
+        else:
+            gauss = self._random.gauss
+            self._block = [gauss(0.0, 1.0) for _ in range(self._blockSize)]
+
+        self._cursor = 0
+
+
+    def next(self):
+        '''
+        @return: Next sample
+        '''
+
+        if self._cursor == self._blockSize:
+            self._refill()
+
+        sample = self._block[self._cursor]
+        self._cursor += 1
+
+        return sample
+
+
+class SensorNoiseModel(object):
+    '''
+    Errors of a multi-axis sensor:
+
+    - White noise: Gaussian noise added to each reading.
+    - Bias: Offset of each axis, which drifts as a random walk.
+    - Scale factor: Constant relative error of each axis.
+    - Vibration: Sinusoidal tones caused by the motors. Their amplitude and frequency depend on the throttle.
+
+    Each kind of error is driven by its own stream, seeded from the model's seed.
+    '''
+
+    def __init__(self, length, seed=None, whiteNoise=0.0, offset=0.0, biasWalk=0.0, scaleError=0.0, \
+                 vibration=0.0, vibrationFrequency=0.0):
+        '''
+        Constructor
+
+        @param length: Number of axes
+        @param seed: Seed of the model
+        @param whiteNoise: Standard deviation of the white noise
+        @param offset: Initial bias of all axes
+        @param biasWalk: Bias' random walk as standard deviation per square root of second
+        @param scaleError: Standard deviation of the relative scale-factor error
+        @param vibration: Amplitude of the vibration caused by each motor at 100% throttle
+        @param vibrationFrequency: Frequency of the vibration in Hz per throttle percentage
+        '''
+
+        seeds = Random(seed)
+
+        self._length = length
+        self._indexes = range(length)
+
+        self._whiteNoise = whiteNoise
+        self._whiteStream = NoiseStream(seeds.getrandbits(32))
+
+        self._biasWalk = biasWalk
+        self._biasStream = NoiseStream(seeds.getrandbits(32))
+        self._biases = [offset] * length
+
+        scaleStream = NoiseStream(seeds.getrandbits(32), length)
+        self._scales = [1.0 + scaleError * scaleStream.next() for _ in self._indexes]
+
+        self._vibration = vibration
+        self._vibrationFrequency = vibrationFrequency
+        self._phases = []
+
+        self._lastTime = None
+
+
+    def getBiases(self):
+
+        return self._biases
+
+
+    def getScales(self):
+
+        return self._scales
+
+
+    def _updateVibration(self, dt, throttles):
+        '''
+        Advances the tones of the motors
+
+        @return: Vibration of each axis
+        '''
+
+        if len(self._phases) != len(throttles):
+            self._phases = [0.0] * len(throttles)
+
+        vibrations = [0.0] * self._length
+        for motor, throttle in enumerate(throttles):
+
+            phase = (self._phases[motor] + 2.0 * PI * self._vibrationFrequency * throttle * dt) % (2.0 * PI)
+            self._phases[motor] = phase
+
+            amplitude = self._vibration * throttle / 100.0
+            for index in self._indexes:
+                #Each axis perceives the tone shifted
+                vibrations[index] += amplitude * sin(phase + index)
+
+        return vibrations
+
+
+    def apply(self, values, time=None, throttles=None):
+        '''
+        Adds the errors to the actual values
+
+        @param values: Actual value of each axis
+        @param time: Time of the reading in seconds. It is required by the bias' random walk and the vibration.
+        @param throttles: Throttle of each motor. It is required by the vibration.
+        @return: List of readings
+        '''
+
+        dt = time - self._lastTime if time != None and self._lastTime != None else 0.0
+        self._lastTime = time
+
+        if self._biasWalk != 0.0 and dt > 0.0:
+            walk = self._biasWalk * sqrt(dt)
+            for index in self._indexes:
+                self._biases[index] += walk * self._biasStream.next()
+
+        vibrations = self._updateVibration(dt, throttles) \
+            if self._vibration != 0.0 and throttles != None else None
+
+        readings = [0.0] * self._length
+        for index in self._indexes:
+            reading = values[index] * self._scales[index] + self._biases[index]
+            if self._whiteNoise != 0.0:
+                reading += self._whiteNoise * self._whiteStream.next()
+            if vibrations != None:
+                reading += vibrations[index]
+            readings[index] = reading
+
+        return readings
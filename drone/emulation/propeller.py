@@ -5,13 +5,13 @@ Created on 03/02/2016
 
 @author: david
 '''
-from math import radians
-from sensors.vector import Vector
+
+from math import cos, radians, sin
 
 
 class Propeller(object):
     '''
-    Represents the drone's propeller
+    Represents the drone's propeller. Its values are stored within the propeller bank.
     '''
     
     THROTTLE_THRESHOLD = 10.0 #Below this threshold the motor cannot move the propeller
@@ -22,44 +22,21 @@ class Propeller(object):
     ROTATION_CW = 0
     ROTATION_CCW = 1
 
-    def __init__(self, drone, rotationThrustRate, throttleRotationRate, thrustedWeight, rotation, counterRotationRate):
+    def __init__(self, bank, index):
         '''
         Constructor
         
-        @param drone: Drone object to notify changes  
-        @param rotationThrustRate: Rate of thrust increment per angular-speed. 
-            For example: let a propeller of max. 4kg. This means that 100% angular-speed is 4kg thrust, 
-            then the rate is 0.04
-        @param throttleRotationRate: Rate of rotation per throttle. Simulates the power down due to the presence
-            of the other propellers. Should be near to 1.0
-        @param thrustedWeight: Weight that this propeller carries
-        @param rotation: Rotation mode (clockwise/counter clockwise)
-        @param counterRotationRate: Reaction rotation to the current rotation
+        @param bank: PropellerBank which stores the values
+        @param index: Index of the propeller within the bank
         '''
 
-        self._throttleThrustRate = rotationThrustRate * throttleRotationRate
-        self._thrustedWeight = thrustedWeight
-        
-        #IMU's positive angles are CCW
-        if rotation == Propeller.ROTATION_CW:
-            self._counterRotationRate = counterRotationRate
-        else:
-            self._counterRotationRate = -counterRotationRate
-
-        self._throttle = 0.0
-        self._thrustModule = 0.0
-        self._thrust = [0.0]*3
-        
-        self._angles = [0.0] * 3
-        
-        self._drone = drone
-        
-        self._lowPassFilter = Propeller.LPF if self._drone._realisticFlight else 1.0
+        self._bank = bank
+        self._index = index
     
     
     def getWeight(self):
         
-        return self._thrustedWeight
+        return self._bank.getWeights()[self._index]
     
     
     def setThrottle(self, throttle):
@@ -69,51 +46,171 @@ class Propeller(object):
         @param throttle: Percentage of the throttle        
         '''
         
-        self._throttle = throttle
-        self._update()
+        self._bank.setThrottle(self._index, throttle)
 
         
-    def setAngles(self, angles):
-        '''
-        Set the angles
-
-        @param angles: Angles as degrees of the propeller
-        '''
-
-        self._angles = [radians(angle) for angle in angles]
-
-    
-    def getThrust(self):
+    def getThrustModule(self):
         
-        return self._thrust
+        return self._bank.getThrustModules()[self._index]
     
     
     def getTorque(self):
         
-        return self._counterRotation
+        return self._bank.getTorques()[self._index]
     
     
     def getThrottle(self):
         
-        return self._throttle
+        return self._bank.getThrottles()[self._index]
 
 
     def getOrtogonalAccel(self):
         
-        return self._throttle * self._throttleThrustRate * Propeller.GRAVITY / self._thrustedWeight
+        return self._bank.getOrtogonalAccels()[self._index]
+
+
+class PropellerBank(object):
+    '''
+    Values of all propellers of the drone, stored as lists indexed by propeller.
+    The thrust of all propellers is rotated at once to the world's frame.
+    '''
     
+    def __init__(self, drone, rotationThrustRate, throttleRotationRates, thrustedWeights, rotations, counterRotationRate):
+        '''
+        Constructor
+        
+        @param drone: Drone object to notify changes  
+        @param rotationThrustRate: Rate of thrust increment per angular-speed. 
+            For example: let a propeller of max. 4kg. This means that 100% angular-speed is 4kg thrust, 
+            then the rate is 0.04
+        @param throttleRotationRates: Rate of rotation per throttle of each propeller. Simulates the power down
+            due to the presence of the other propellers. Should be near to 1.0
+        @param thrustedWeights: Weight that each propeller carries
+        @param rotations: Rotation mode (clockwise/counter clockwise) of each propeller
+        @param counterRotationRate: Reaction rotation to the current rotation
+        '''
+        
+        self._drone = drone
+        self._count = len(thrustedWeights)
+        
+        self._throttleThrustRates = [rotationThrustRate * rate for rate in throttleRotationRates]
+        self._thrustedWeights = list(thrustedWeights)
+        
+        #IMU's positive angles are CCW
+        self._counterRotationRates = [counterRotationRate if rotation == Propeller.ROTATION_CW \
+                                      else -counterRotationRate for rotation in rotations]
+        
+        #Orthogonal acceleration per throttle
+        self._ortogonalAccelRates = [rate * Propeller.GRAVITY / weight \
+                                     for rate, weight in zip(self._throttleThrustRates, self._thrustedWeights)]
+        
+        self._throttles = [0.0] * self._count
+        self._thrustModules = [0.0] * self._count
+        self._torques = [0.0] * self._count
+        
+        self._lowPassFilter = Propeller.LPF if self._drone._realisticFlight else 1.0
+        
+        self._propellers = [Propeller(self, index) for index in range(self._count)]
+        
+        
+    def getPropeller(self, index):
+        
+        return self._propellers[index]
     
-    def _update(self):
-
-        effectiveThrottle = self._throttle - Propeller.THROTTLE_THRESHOLD \
-            if self._throttle > Propeller.THROTTLE_THRESHOLD else 0.0        
+    
+    def getCount(self):
+        
+        return self._count
+    
+    
+    def getWeights(self):
+        
+        return self._thrustedWeights
+    
+    
+    def getThrottles(self):
+        
+        return self._throttles
+    
+    
+    def getThrustModules(self):
+        
+        return self._thrustModules
+    
+    
+    def getTorques(self):
+        
+        return self._torques
+    
+    
+    def getOrtogonalAccels(self):
+        
+        return [throttle * rate for throttle, rate in zip(self._throttles, self._ortogonalAccelRates)]
+    
+    
+    def getThrustModule(self):
+        '''
+        @return: Thrust of all propellers
+        '''
+        
+        return sum(self._thrustModules)
+    
+    
+    def getTorque(self):
+        '''
+        @return: Counter-rotation of all propellers
+        '''
+        
+        return sum(self._torques)
+    
+    
+    def setThrottle(self, index, throttle):
+        '''
+        Set the throttle of a propeller
+        
+        @param index: Index of the propeller
+        @param throttle: Percentage of the throttle
+        '''
+        
+        #The former throttle is applied until now
+        self._drone.update()
+        
+        self._throttles[index] = throttle
+        
+        effectiveThrottle = throttle - Propeller.THROTTLE_THRESHOLD \
+            if throttle > Propeller.THROTTLE_THRESHOLD else 0.0        
 
-        newThrustModule = effectiveThrottle * self._throttleThrustRate * Propeller.GRAVITY
-        self._thrustModule += self._lowPassFilter * (newThrustModule - self._thrustModule) 
-        self._thrust = Vector.rotateVector3D([0.0, 0.0, self._thrustModule], self._angles)
-        self._thrust[2] -= Propeller.GRAVITY * self._thrustedWeight
+        newThrustModule = effectiveThrottle * self._throttleThrustRates[index] * Propeller.GRAVITY
+        thrustModule = self._thrustModules[index]
+        thrustModule += self._lowPassFilter * (newThrustModule - thrustModule)
+        self._thrustModules[index] = thrustModule 
 
         #Counter-rotation        
-        self._counterRotation = self._thrustModule * self._counterRotationRate
-    
-        self._drone.onPropellerUpdated()
+        self._torques[index] = thrustModule * self._counterRotationRates[index]
+        
+        
+    @staticmethod
+    def rotateThrust(thrustModule, angles):
+        '''
+        Rotates the thrust to the world's frame. 
+        It gives the same result as Vector.rotateVector3D for the vector [0, 0, thrustModule].
+        
+        @param thrustModule: Thrust along the drone's Z-axis
+        @param angles: Drone's angles as degrees
+        @return: Thrust as [x,y,z]
+        '''
+        
+        angleX = radians(angles[0])
+        angleY = radians(angles[1])
+        angleZ = radians(angles[2])
+        
+        cosz = cos(angleZ)
+        sinz = sin(angleZ)
+        
+        #Rotation on X-axis, then on Y-axis
+        thrustXY = cos(angleX) * thrustModule
+        thrustX = sin(angleY) * thrustXY
+        thrustY = -(sin(angleX) * thrustModule)
+        
+        #Rotation on Z-axis
+        return [cosz * thrustX - sinz * thrustY, sinz * thrustX + cosz * thrustY, cos(angleY) * thrustXY]
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import argparse
+import json
+import sys
+
+from config import Configuration
+from flight.controller import FlightController
+from flight.driving.driver import Driver
+from flight.stabilization.scheduler import SimulatedClock, SimulatedScheduler
+from sensors.recording import ReplaySensor
+
+
+class ReplaySimulation(object):
+    '''
+    Runs the flight controller against a sensor record instead of a device.
+
+    Each step feeds the next recorded state to a PID iteration, as LockstepSimulation does.
+    The motors are dummy ones, hence the PID's outputs don't alter the recorded states.
+    It allows to compare the outputs of different controllers against the same recorded flight.
+    '''
+
+    THROTTLE = 50.0
+    PID_THROTTLE_THRESHOLD = 20.0
+
+    def __init__(self, filePath, realTime=False):
+        '''
+        Constructor
+
+        @param filePath: Sensor record file. See SensorRecorder
+        @param realTime: Feeds the states with the original timing instead of as fast as possible
+        '''
+
+        config = Configuration.getInstance().getConfig()
+        self._period = config[Configuration.PID_PERIOD]
+
+        self._clock = SimulatedClock()
+        self._sensor = ReplaySensor(filePath, realTime)
+        driver = Driver(Configuration.VALUE_MOTOR_CLASS_DUMMY)
+        scheduler = SimulatedScheduler(self._period, self._clock)
+
+        self._controller = FlightController(driver, self._sensor, scheduler, \
+                                            Configuration.VALUE_SENSOR_ACQUISITION_SYNCHRONOUS)
+        self._driver = driver
+
+
+    def getController(self):
+
+        return self._controller
+
+
+    def getSensor(self):
+
+        return self._sensor
+
+
+    def run(self, throttle=THROTTLE, pidThrottleThreshold=PID_THROTTLE_THRESHOLD):
+        '''
+        Replays the whole record
+
+        @param throttle: Base throttle of the motors
+        @param pidThrottleThreshold: See FlightController.setPidThrottleThreshold
+        @return: List of the motors' throttles after each step
+        '''
+
+        controller = self._controller
+
+        controller.start()
+        try:
+            controller.setPidThrottleThreshold(pidThrottleThreshold)
+            #The PID takes the first state when it starts
+            controller.addThrottle(throttle)
+
+            throttles = []
+            while not self._sensor.isFinished():
+                controller.step()
+                throttles.append(list(self._driver.getThrottles()))
+
+        finally:
+            controller.stop()
+
+        return throttles
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Replays a sensor record against the flight controller. " \
+                                     + "The motors' throttles are written as JSON.")
+    parser.add_argument("file", help="Sensor record file.")
+    parser.add_argument("-r", "--real-time", help="Feeds the states with the original timing.", action="store_true")
+    parser.add_argument("-t", "--throttle", help="Base throttle.", nargs="?", default=ReplaySimulation.THROTTLE, \
+                        type=float)
+
+    args = parser.parse_args()
+
+    #Messages of the control stack must not be mixed with the results
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        throttles = ReplaySimulation(args.file, args.real_time).run(args.throttle)
+
+    finally:
+        sys.stdout = stdout
+
+    print(json.dumps(throttles))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,8 +8,8 @@ Created on 7 de feb. de 2016
 import logging
 
 from emulation.drone import EmulatedDrone
-from random import uniform, seed
-from copy import deepcopy
+from emulation.noise import SensorNoiseModel
+from random import Random
 
 
 class EmulatedSensor(object):
@@ -21,20 +21,68 @@ class EmulatedSensor(object):
     ERROR_ANGLE_DISTRIBUTION = [-0.0, 0.0] #[-0.08, 0.1]
     ERROR_ACCEL_DISTRIBUTION = [-0.1, 0.1] #[-0.1, 0.15]
     
-    def __init__(self, addNoise):
+    #Errors of the realistic noise. Otherwise, only the white noise is added.
+    ANGLE_SPEED_BIAS_WALK = 0.05 #º/s/√s
+    ANGLE_SPEED_SCALE_ERROR = 0.01
+    ANGLE_SPEED_VIBRATION = 0.5 #º/s per motor at 100% throttle
+    ACCEL_BIAS_WALK = 0.002 #per √s
+    ACCEL_SCALE_ERROR = 0.01
+    ACCEL_VIBRATION = 0.02 #per motor at 100% throttle
+    VIBRATION_FREQUENCY = 2.0 #Hz per throttle percentage
+    
+    @staticmethod
+    def _createNoiseModel(seed, distribution, realistic, biasWalk=0.0, scaleError=0.0, vibration=0.0):
+        '''
+        The white noise has the same mean and deviation as the uniform distribution
+        '''
+        
+        whiteNoise = (distribution[1] - distribution[0]) / 12.0 ** 0.5
+        offset = (distribution[0] + distribution[1]) / 2.0
+        
+        if realistic:
+            model = SensorNoiseModel(3, seed, whiteNoise, offset, biasWalk, scaleError, vibration, \
+                                     EmulatedSensor.VIBRATION_FREQUENCY)
+        else:
+            model = SensorNoiseModel(3, seed, whiteNoise, offset)
+        
+        return model
+    
+    
+    def __init__(self, addNoise, seed=None, realisticNoise=None):
+        '''
+        Constructor
+        
+        @param addNoise: Adds random errors to the readings
+        @param seed: Seed of the errors. The same seed produces the same errors. If None, the seed is random.
+        @param realisticNoise: Adds bias drift, scale-factor errors and motor vibration to the white noise.
+            By default, as EmulatedDrone.REALISTIC_FLIGHT
+        '''
         
         self._addNoise = addNoise
-        if self._addNoise:        
-            seed()
         self._drone = EmulatedDrone.getInstance()
+        
+        self._realisticNoise = realisticNoise if realisticNoise != None else EmulatedDrone.REALISTIC_FLIGHT
+        
+        #Each signal has its own streams
+        seeds = Random(seed)
+        self._angleSpeedNoise = EmulatedSensor._createNoiseModel(seeds.getrandbits(32), \
+            EmulatedSensor.ERROR_ANGLE_SPEED_DISTRIBUTION, self._realisticNoise, \
+            EmulatedSensor.ANGLE_SPEED_BIAS_WALK, EmulatedSensor.ANGLE_SPEED_SCALE_ERROR, \
+            EmulatedSensor.ANGLE_SPEED_VIBRATION)
+        self._angleNoise = EmulatedSensor._createNoiseModel(seeds.getrandbits(32), \
+            EmulatedSensor.ERROR_ANGLE_DISTRIBUTION, False)
+        self._accelNoise = EmulatedSensor._createNoiseModel(seeds.getrandbits(32), \
+            EmulatedSensor.ERROR_ACCEL_DISTRIBUTION, self._realisticNoise, \
+            EmulatedSensor.ACCEL_BIAS_WALK, EmulatedSensor.ACCEL_SCALE_ERROR, \
+            EmulatedSensor.ACCEL_VIBRATION)
     
     
-    def _noisify(self, data, distribution):
+    def _noisify(self, state, data, noiseModel):
 
-        inputData = deepcopy(data)
-        noisedList = [item + uniform(distribution[0], distribution[1]) for item in inputData]
+        throttles = [self._drone.getPropeller(index).getThrottle() for index in range(self._drone.getPropellerCount())] \
+            if self._realisticNoise else None
 
-        return noisedList
+        return noiseModel.apply(data, state._time, throttles)
 
 
     def readAngleSpeeds(self):
@@ -45,9 +93,9 @@ class EmulatedSensor(object):
         state = self._drone.getState()        
 
         angleSpeeds = \
-            self._noisify(state._angleSpeeds, EmulatedSensor.ERROR_ANGLE_SPEED_DISTRIBUTION) \
+            self._noisify(state, state._angleSpeeds, self._angleSpeedNoise) \
             if self._addNoise \
-            else deepcopy(state._angleSpeeds)
+            else list(state._angleSpeeds)
             
         return angleSpeeds 
 
@@ -59,9 +107,9 @@ class EmulatedSensor(object):
         
         state = self._drone.getState()        
         angles = \
-            self._noisify(state._angles, EmulatedSensor.ERROR_ANGLE_DISTRIBUTION) \
+            self._noisify(state, state._angles, self._angleNoise) \
             if self._addNoise \
-            else deepcopy(state._angles) 
+            else list(state._angles) 
         
         return angles
 
@@ -75,9 +123,9 @@ class EmulatedSensor(object):
         
         state = self._drone.getState()        
         accels = \
-            self._noisify(state._accels, EmulatedSensor.ERROR_ACCEL_DISTRIBUTION) \
+            self._noisify(state, state._accels, self._accelNoise) \
             if self._addNoise \
-            else deepcopy(state._accels)
+            else list(state._accels)
         
         return accels
 
@@ -38,3 +38,39 @@ class State(object):
         
         return string
 
+
+
+class StateSnapshot(State):
+    '''
+    Immutable state of a drone, as published by the emulator after each physics update.
+    Vectors are tuples and the angles are the world angles. Snapshots can be shared without copying.
+    '''
+
+    def __init__(self, state, angles, version):
+        '''
+        Constructor
+
+        @param state: Working state to be copied
+        @param angles: World angles
+        @param version: Number of the snapshot. It increases on each publication.
+        '''
+
+        setAttribute = object.__setattr__
+        setAttribute(self, "_version", version)
+        setAttribute(self, "_time", state._time)
+        setAttribute(self, "_crashed", state._crashed)
+        setAttribute(self, "_coords", tuple(state._coords))
+        setAttribute(self, "_accels", tuple(state._accels))
+        setAttribute(self, "_speeds", tuple(state._speeds))
+        setAttribute(self, "_angleSpeeds", tuple(state._angleSpeeds))
+        setAttribute(self, "_angles", tuple(angles))
+
+
+    def __setattr__(self, name, value):
+
+        raise AttributeError("State snapshots are read-only")
+
+
+    def getVersion(self):
+
+        return self._version
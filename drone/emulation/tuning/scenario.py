@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from config import Configuration
+from emulation.lockstep import LockstepSimulation
+from flight.controller import FlightController
+
+
+class Scenario(object):
+    '''
+    Emulated flight used to score a set of PID gains.
+
+    The drone takes off, then the targets change (step) and/or an external disturbance hits the drone.
+    The score is the mean absolute error of the controlled axes along the flight, relative to the size
+    of the step or the disturbance. The lower, the better.
+    '''
+
+    THROTTLE = 50.0
+    PID_THROTTLE_THRESHOLD = 20.0
+
+    #Any crashed flight is worse than any flown one
+    CRASH_COST = 1e6
+
+    #Gains are tuned against bias drift, scale-factor errors and motor vibration
+    REALISTIC_NOISE = True
+
+    @staticmethod
+    def createAngleStep(angle=10.0, duration=2.0, weight=1.0):
+        '''
+        Step of the target angles of the axes X and Y in angle mode
+        '''
+
+        return Scenario("angle-step", FlightController.FLIGHT_MODE_ANGLE, [angle, angle, 0.0], duration, \
+                        weight=weight)
+
+
+    @staticmethod
+    def createAngleSpeedStep(angleSpeed=30.0, duration=1.0, weight=1.0):
+        '''
+        Step of the target angle-speeds of all axes in angle-speed mode
+        '''
+
+        return Scenario("angle-speed-step", FlightController.FLIGHT_MODE_ANGLE_SPEED, \
+                        [angleSpeed, angleSpeed, angleSpeed], duration, weight=weight)
+
+
+    @staticmethod
+    def createDisturbance(angleSpeed=100.0, duration=2.0, weight=1.0):
+        '''
+        Hit on the axes X and Y while the drone holds its attitude in angle mode
+        '''
+
+        return Scenario("disturbance", FlightController.FLIGHT_MODE_ANGLE, [0.0, 0.0, 0.0], duration, \
+                        disturbance=[angleSpeed, -angleSpeed], weight=weight)
+
+
+    def __init__(self, name, flightMode, targets, duration, eventTime=0.2, disturbance=None, weight=1.0):
+        '''
+        Constructor
+
+        @param name: Name of the scenario for logging purposes
+        @param flightMode: See FlightController.FLIGHT_MODE_*
+        @param targets: Targets set at the event time, as FlightController.setTargets does.
+            In angle mode: [angle X, angle Y, angle-speed Z]. In angle-speed mode: [angle-speed X, Y, Z]
+        @param duration: Flight time in seconds
+        @param eventTime: Time in seconds when the step and the disturbance happen
+        @param disturbance: Angle-speed increments of the axes X and Y. See EmulatedDrone.addAngleSpeeds
+        @param weight: Weight of the scenario within the total cost
+        '''
+
+        self._name = name
+        self._flightMode = flightMode
+        self._targets = list(targets)
+        self._duration = duration
+        self._eventTime = eventTime
+        self._disturbance = disturbance
+        self._weight = weight
+
+        scales = [abs(value) for value in self._targets + (disturbance if disturbance != None else [])]
+        self._scale = max(scales + [1.0])
+
+
+    def getName(self):
+
+        return self._name
+
+
+    def getWeight(self):
+
+        return self._weight
+
+
+    @staticmethod
+    def _applyGains(controller, gains):
+
+        allGains = dict(Configuration.getInstance().getConfig())
+        allGains.update(gains)
+        gains = allGains
+
+        for axis in range(3):
+            controller.alterPidAnglesSpeedConstants(axis, gains[Configuration.PID_ANGLES_SPEED_KP][axis], \
+                                                    gains[Configuration.PID_ANGLES_SPEED_KI][axis], \
+                                                    gains[Configuration.PID_ANGLES_SPEED_KD][axis])
+        for axis in range(2):
+            controller.alterPidAnglesConstants(axis, gains[Configuration.PID_ANGLES_KP][axis], \
+                                               gains[Configuration.PID_ANGLES_KI][axis], \
+                                               gains[Configuration.PID_ANGLES_KD][axis])
+
+
+    def _calculateError(self, state, targets):
+
+        if self._flightMode == FlightController.FLIGHT_MODE_ANGLE:
+            values = [state._angles[0], state._angles[1], state._angleSpeeds[2]]
+        else:
+            values = state._angleSpeeds
+
+        return sum([abs(target - value) for target, value in zip(targets, values)])
+
+
+    def run(self, gains, seed=None):
+        '''
+        Flies the scenario
+
+        @param gains: PID gains as stored in the configuration (see Configuration.PID_*). Missing keys
+            are taken from the current configuration.
+        @param seed: Seed of the sensor's noise
+        @return: Cost of the flight
+        '''
+
+        simulation = LockstepSimulation(seed, realisticNoise=Scenario.REALISTIC_NOISE)
+        controller = simulation.getController()
+        drone = simulation.getDrone()
+
+        Scenario._applyGains(controller, gains)
+        controller.setFlightMode(self._flightMode)
+
+        simulation.start()
+        controller.setPidThrottleThreshold(Scenario.PID_THROTTLE_THRESHOLD)
+        controller.addThrottle(Scenario.THROTTLE)
+
+        period = simulation.getPeriod()
+        steps = int(round(self._duration / period))
+        eventStep = int(round(self._eventTime / period))
+        targets = [0.0] * 3
+        errorSum = 0.0
+
+        try:
+            for step in range(steps):
+
+                if step == eventStep:
+                    targets = self._targets
+                    controller.setTargets(targets + [0.0])
+                    if self._disturbance != None:
+                        drone.addAngleSpeeds(self._disturbance)
+
+                simulation.step()
+
+                state = drone.getState()
+                if state._crashed:
+                    return Scenario.CRASH_COST
+
+                errorSum += self._calculateError(state, targets)
+
+        finally:
+            simulation.stop()
+
+        return errorSum / (steps * self._scale)
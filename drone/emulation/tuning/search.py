@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from itertools import product
+import logging
+from random import Random
+
+
+class SearchParameter(object):
+    '''
+    Value to be searched within a range
+    '''
+
+    def __init__(self, name, minValue, maxValue):
+
+        self._name = name
+        self._minValue = minValue
+        self._maxValue = maxValue
+
+
+    def getName(self):
+
+        return self._name
+
+
+    def getMinValue(self):
+
+        return self._minValue
+
+
+    def getMaxValue(self):
+
+        return self._maxValue
+
+
+    def getRange(self):
+
+        return self._maxValue - self._minValue
+
+
+    def getMiddleValue(self):
+
+        return (self._minValue + self._maxValue) / 2.0
+
+
+    def clip(self, value):
+
+        return min(max(value, self._minValue), self._maxValue)
+
+
+class Search(object):
+    '''
+    Method to find the values of the parameters with the lowest cost.
+
+    The cost function receives a list of candidates (each one a list with a value per parameter) and returns
+    their costs. Searches pass as many candidates as possible at once, so they can be evaluated in parallel.
+    '''
+
+    def __init__(self):
+
+        self._bestValues = None
+        self._bestCost = float("inf")
+
+
+    def _evaluate(self, evaluate, candidates):
+
+        costs = evaluate(candidates)
+        for values, cost in zip(candidates, costs):
+            if cost < self._bestCost:
+                self._bestCost = cost
+                self._bestValues = list(values)
+
+        return costs
+
+
+    def _log(self, message):
+
+        message = "{0}: {1}. Best cost: {2:.6f}".format(self.__class__.__name__, message, self._bestCost)
+        logging.info(message)
+        print(message)
+
+
+    def search(self, parameters, evaluate):
+        '''
+        Searches the best values
+
+        @param parameters: List of SearchParameter
+        @param evaluate: Cost function
+        @return: Tuple (best values, best cost)
+        '''
+
+        raise NotImplementedError()
+
+
+class GridSearch(Search):
+    '''
+    Evaluates all combinations of equally spaced values of each parameter
+    '''
+
+    def __init__(self, steps=5):
+        '''
+        Constructor
+
+        @param steps: Number of values of each parameter
+        '''
+
+        Search.__init__(self)
+
+        self._steps = max(2, steps)
+
+
+    def search(self, parameters, evaluate):
+
+        axes = [[parameter.getMinValue() + parameter.getRange() * index / (self._steps - 1.0) \
+                 for index in range(self._steps)] for parameter in parameters]
+
+        candidates = [list(values) for values in product(*axes)]
+        self._evaluate(evaluate, candidates)
+        self._log("{0} candidates".format(len(candidates)))
+
+        return self._bestValues, self._bestCost
+
+
+class CoordinateDescentSearch(Search):
+    '''
+    Improves one parameter at a time, trying several values around the current one at once.
+    The step is reduced when no parameter can be improved.
+    '''
+
+    def __init__(self, iterations=6, stepFactor=0.25, shrinkFactor=0.5, points=2, initialValues=None):
+        '''
+        Constructor
+
+        @param iterations: Number of sweeps over all parameters
+        @param stepFactor: Initial step as a fraction of each parameter's range
+        @param shrinkFactor: Reduction of the step when a sweep doesn't improve
+        @param points: Number of values tried at each side of the current value
+        @param initialValues: Starting point. By default, the middle of the ranges.
+        '''
+
+        Search.__init__(self)
+
+        self._iterations = iterations
+        self._stepFactor = stepFactor
+        self._shrinkFactor = shrinkFactor
+        self._points = points
+        self._initialValues = initialValues
+
+
+    def search(self, parameters, evaluate):
+
+        current = list(self._initialValues) if self._initialValues != None \
+            else [parameter.getMiddleValue() for parameter in parameters]
+        self._evaluate(evaluate, [current])
+
+        stepFactor = self._stepFactor
+        for iteration in range(self._iterations):
+
+            improved = False
+            for index, parameter in enumerate(parameters):
+
+                candidates = []
+                for point in range(1, self._points + 1):
+                    for sign in (-1.0, 1.0):
+                        value = parameter.clip(current[index] + sign * point * stepFactor * parameter.getRange())
+                        if value != current[index]:
+                            candidate = list(current)
+                            candidate[index] = value
+                            candidates.append(candidate)
+
+                previousCost = self._bestCost
+                self._evaluate(evaluate, candidates)
+                if self._bestCost < previousCost:
+                    current = list(self._bestValues)
+                    improved = True
+
+            if not improved:
+                stepFactor *= self._shrinkFactor
+
+            self._log("iteration {0}, step {1:.4f}".format(iteration, stepFactor))
+
+        return self._bestValues, self._bestCost
+
+
+class CrossEntropySearch(Search):
+    '''
+    Model-based random search: candidates are sampled from a normal distribution per parameter,
+    which is refitted to the best candidates of each iteration.
+    '''
+
+    def __init__(self, iterations=8, population=16, eliteCount=4, seed=None):
+        '''
+        Constructor
+
+        @param iterations: Number of sampling iterations
+        @param population: Candidates per iteration
+        @param eliteCount: Best candidates used to refit the distribution
+        @param seed: Seed of the sampling
+        '''
+
+        Search.__init__(self)
+
+        self._iterations = iterations
+        self._population = population
+        self._eliteCount = min(eliteCount, population)
+        self._random = Random(seed)
+
+
+    def search(self, parameters, evaluate):
+
+        means = [parameter.getMiddleValue() for parameter in parameters]
+        deviations = [parameter.getRange() / 4.0 for parameter in parameters]
+        #Keeps the distribution from collapsing before the last iteration
+        minDeviations = [parameter.getRange() / 100.0 for parameter in parameters]
+
+        for iteration in range(self._iterations):
+
+            candidates = [[parameter.clip(self._random.gauss(mean, deviation)) \
+                           for parameter, mean, deviation in zip(parameters, means, deviations)] \
+                          for _ in range(self._population)]
+            if iteration == 0:
+                candidates[0] = list(means)
+
+            costs = self._evaluate(evaluate, candidates)
+
+            elite = [candidate for _, candidate in sorted(zip(costs, candidates), key=lambda item: item[0])]
+            elite = elite[:self._eliteCount]
+
+            for index in range(len(parameters)):
+                values = [candidate[index] for candidate in elite]
+                means[index] = sum(values) / len(values)
+                variance = sum([(value - means[index]) ** 2 for value in values]) / len(values)
+                deviations[index] = max(variance ** 0.5, minDeviations[index])
+
+            self._log("iteration {0}".format(iteration))
+
+        return self._bestValues, self._bestCost
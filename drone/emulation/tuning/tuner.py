@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import argparse
+import logging
+
+from config import Configuration
+from emulation.tuning.scenario import Scenario
+from emulation.tuning.search import SearchParameter, GridSearch, CoordinateDescentSearch, CrossEntropySearch
+
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+
+except ImportError:
+
+    ProcessPoolExecutor = None
+
+
+class GainParameter(SearchParameter):
+    '''
+    PID gain to be tuned. The same value can be applied to several axes (i.e. X and Y of a symmetric frame).
+    '''
+
+    def __init__(self, key, axes, minValue, maxValue):
+        '''
+        Constructor
+
+        @param key: Configuration key of the gain. See Configuration.PID_*
+        @param axes: Indexes of the axes sharing this value
+        @param minValue: Min. value as stored in the configuration
+        @param maxValue: Max. value as stored in the configuration
+        '''
+
+        SearchParameter.__init__(self, "{0}{1}".format(key, list(axes)), minValue, maxValue)
+
+        self._key = key
+        self._axes = list(axes)
+
+
+    def getKey(self):
+
+        return self._key
+
+
+    def getAxes(self):
+
+        return self._axes
+
+
+def evaluateGains(gains, scenarios, seed):
+    '''
+    Calculates the cost of a set of gains. It runs within the worker processes.
+
+    @param gains: Gains as stored in the configuration
+    @param scenarios: List of Scenario
+    @param seed: Seed of the sensor's noise
+    @return: Weighted sum of the scenarios' costs
+    '''
+
+    return sum([scenario.getWeight() * scenario.run(gains, seed) for scenario in scenarios])
+
+
+class PidTuner(object):
+    '''
+    Tunes the PID gains against emulated flights.
+
+    Each candidate flies all the scenarios within the lockstep simulation. Candidates are spread over a pool
+    of processes if available, otherwise they are evaluated one after another.
+    '''
+
+    GAIN_KEYS = [Configuration.PID_ANGLES_SPEED_KP, Configuration.PID_ANGLES_SPEED_KI, \
+                 Configuration.PID_ANGLES_SPEED_KD, Configuration.PID_ANGLES_KP, \
+                 Configuration.PID_ANGLES_KI, Configuration.PID_ANGLES_KD]
+
+    SEARCH_GRID = "grid"
+    SEARCH_COORDINATE_DESCENT = "coordinate-descent"
+    SEARCH_CROSS_ENTROPY = "cross-entropy"
+
+    @staticmethod
+    def createDefaultParameters():
+        '''
+        Parameters of the rate (angle-speed) and angle loops. Axes X and Y share their gains.
+        '''
+
+        return [GainParameter(Configuration.PID_ANGLES_SPEED_KP, [0, 1], 0.0, 300.0),
+                GainParameter(Configuration.PID_ANGLES_SPEED_KI, [0, 1], 0.0, 100.0),
+                GainParameter(Configuration.PID_ANGLES_SPEED_KD, [0, 1], 0.0, 20.0),
+                #The emulated yaw reacts instantly to the propellers, hence higher gains oscillate
+                GainParameter(Configuration.PID_ANGLES_SPEED_KP, [2], 0.0, 3.0),
+                GainParameter(Configuration.PID_ANGLES_KP, [0, 1], 0.0, 10.0),
+                GainParameter(Configuration.PID_ANGLES_KI, [0, 1], 0.0, 5.0),
+                GainParameter(Configuration.PID_ANGLES_KD, [0, 1], 0.0, 1.0)]
+
+
+    @staticmethod
+    def createDefaultScenarios():
+
+        return [Scenario.createAngleSpeedStep(), Scenario.createAngleStep(), Scenario.createDisturbance()]
+
+
+    @staticmethod
+    def createSearch(method, seed=None):
+        '''
+        @param method: See PidTuner.SEARCH_*
+        '''
+
+        if method == PidTuner.SEARCH_GRID:
+            search = GridSearch(3)
+        elif method == PidTuner.SEARCH_COORDINATE_DESCENT:
+            search = CoordinateDescentSearch()
+        elif method == PidTuner.SEARCH_CROSS_ENTROPY:
+            search = CrossEntropySearch(seed=seed)
+        else:
+            raise Exception("Unknown search method \"{0}\"".format(method))
+
+        return search
+
+
+    def __init__(self, parameters=None, scenarios=None, seed=0, workers=None):
+        '''
+        Constructor
+
+        @param parameters: List of GainParameter. By default, see PidTuner.createDefaultParameters
+        @param scenarios: List of Scenario. By default, see PidTuner.createDefaultScenarios
+        @param seed: Seed of the sensor's noise. All candidates fly with the same noise.
+        @param workers: Number of processes. By default, as many as CPUs. One means no process pool.
+        '''
+
+        self._parameters = parameters if parameters != None else PidTuner.createDefaultParameters()
+        self._scenarios = scenarios if scenarios != None else PidTuner.createDefaultScenarios()
+        self._seed = seed
+        self._workers = workers
+        self._executor = None
+
+        config = Configuration.getInstance().getConfig()
+        self._baseGains = dict([(key, list(config[key])) for key in PidTuner.GAIN_KEYS])
+
+
+    def createGains(self, values):
+        '''
+        @param values: Value of each parameter
+        @return: Gains as stored in the configuration
+        '''
+
+        gains = dict([(key, list(gains)) for key, gains in self._baseGains.items()])
+        for parameter, value in zip(self._parameters, values):
+            for axis in parameter.getAxes():
+                gains[parameter.getKey()][axis] = value
+
+        return gains
+
+
+    def evaluate(self, candidates):
+        '''
+        @param candidates: List of candidates, each one a list with a value per parameter
+        @return: List of costs
+        '''
+
+        gainsList = [self.createGains(values) for values in candidates]
+        count = len(gainsList)
+
+        if self._executor != None:
+            costs = list(self._executor.map(evaluateGains, gainsList, [self._scenarios] * count, \
+                                            [self._seed] * count))
+        else:
+            costs = [evaluateGains(gains, self._scenarios, self._seed) for gains in gainsList]
+
+        return costs
+
+
+    def tune(self, search):
+        '''
+        Searches the best gains
+
+        @param search: Search method. See emulation.tuning.search
+        @return: Tuple (best gains, best cost)
+        '''
+
+        if ProcessPoolExecutor != None and self._workers != 1:
+            self._executor = ProcessPoolExecutor(self._workers)
+        else:
+            logging.info("Tuning without process pool")
+
+        try:
+            values, cost = search.search(self._parameters, self.evaluate)
+
+        finally:
+            if self._executor != None:
+                self._executor.shutdown()
+                self._executor = None
+
+        return self.createGains(values), cost
+
+
+    @staticmethod
+    def writeConfig(gains, filePath=Configuration.FILE_PATH):
+        '''
+        Stores the gains within the configuration file
+
+        @param gains: Gains as stored in the configuration
+        @param filePath: Configuration file
+        '''
+
+        configuration = Configuration.getInstance()
+        configuration.getConfig().update(gains)
+        configuration.writeFile(filePath)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Tunes the PID gains against the emulated drone")
+    parser.add_argument("-m", "--method", help="Search method.", nargs="?", default=PidTuner.SEARCH_CROSS_ENTROPY, \
+                        choices=[PidTuner.SEARCH_GRID, PidTuner.SEARCH_COORDINATE_DESCENT, PidTuner.SEARCH_CROSS_ENTROPY])
+    parser.add_argument("-w", "--workers", help="Number of processes.", nargs="?", default=None, type=int)
+    parser.add_argument("-s", "--seed", help="Seed of the sensor's noise.", nargs="?", default=0, type=int)
+    parser.add_argument("-o", "--output", help="Configuration file to write.", nargs="?", \
+                        default=Configuration.FILE_PATH)
+
+    args = parser.parse_args()
+
+    tuner = PidTuner(seed=args.seed, workers=args.workers)
+    gains, cost = tuner.tune(PidTuner.createSearch(args.method, args.seed))
+
+    print("Best cost: {0:.6f}".format(cost))
+    for key in PidTuner.GAIN_KEYS:
+        print("{0}: {1}".format(key, gains[key]))
+
+    PidTuner.writeConfig(gains, args.output)
+
+
+if __name__ == '__main__':
+    main()
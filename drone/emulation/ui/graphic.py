@@ -9,11 +9,11 @@ import sys
 
 if sys.version_info.major < 3:
 
-    from Tkconstants import BOTH, DISABLED
+    from Tkconstants import BOTH, DISABLED, HIDDEN, NORMAL
     from Tkinter import Tk, Frame as tkFrame, Canvas, StringVar, Entry, Label
     from ttk import Frame as ttkFrame, Style
 else:
-    from tkinter.constants import BOTH, DISABLED
+    from tkinter.constants import BOTH, DISABLED, HIDDEN, NORMAL
     from tkinter import Tk, Frame as tkFrame, Canvas, StringVar, Entry, Label
     from tkinter.ttk import Frame as ttkFrame, Style
     
@@ -21,15 +21,21 @@ from math import cos, sin, radians
 from threading import Thread
 
 
-from sensors.vector import Vector
+from flight.stabilization.scheduler import monotonic
 
 
 class Display(ttkFrame):
     '''
     Displays the drone state on a graphical interface
+
+    Canvas items are created once and moved on each frame. Items and texts are only updated when they change.
+    The frame rate is reduced when rendering takes longer, so the GUI doesn't steal much time from the flight
+    controller running within the same process.
     '''
 
     REFRESH_PERIOD = 0.2 #5Hz by default
+    MAX_LOAD = 0.05 #Max. fraction of the time spent rendering
+    COST_FILTER = 0.2 #Low-pass filter of the measured rendering time
     
     ARM_LENGTH = 23 #pixels
     PIXELS_METER = 100.0 #pixels/meter
@@ -61,6 +67,10 @@ class Display(ttkFrame):
         self._isRunning = False        
         self._droneThread = None
         
+        self._lastState = None
+        self._isCrashShown = False
+        self._renderTime = 0.0
+        
         self._parent = parent
         self._initUI()
         
@@ -152,6 +162,15 @@ class Display(ttkFrame):
         
         self._linesXZ = [self._canvasXZ.create_line(100,200, 90, 200, fill="#0000ff"), \
                          self._canvasXZ.create_line(100,200, 110, 200, fill="#0000ff")]
+        
+        #Last coordinates of each line
+        self._coordsXY = [None]*4
+        self._coordsYZ = [None]*2
+        self._coordsXZ = [None]*2
+        
+        self._crashTexts = [(self._canvasXY, self._canvasXY.create_text((200,100), text="CRASHED!", fill="#ff0000", state=HIDDEN)), \
+                            (self._canvasXZ, self._canvasXZ.create_text((100,100), text="CRASHED!", fill="#ff0000", state=HIDDEN)), \
+                            (self._canvasYZ, self._canvasYZ.create_text((100,100), text="CRASHED!", fill="#ff0000", state=HIDDEN))]
 
         
         #Info frame
@@ -182,6 +201,31 @@ class Display(ttkFrame):
         self._speedTexts = [StringVar(),StringVar(),StringVar()]
         for index in range(3):
             Entry(infoFrame, textvariable=self._speedTexts[index], state=DISABLED, width=5).grid(column=index, row=7)
+            
+        #Last value of each text
+        self._lastTexts = {}
+        
+    
+    @staticmethod
+    def _moveLine(canvas, lines, lastCoords, index, coords):
+        '''
+        Moves a line only if its coordinates changed
+        '''
+        
+        if coords != lastCoords[index]:
+            canvas.coords(lines[index], *coords)
+            lastCoords[index] = coords
+            
+    
+    def _setText(self, textVar, value):
+        '''
+        Sets a text only if its value changed
+        '''
+        
+        text = "{0:.3f}".format(value)
+        if self._lastTexts.get(textVar) != text:
+            textVar.set(text)
+            self._lastTexts[textVar] = text
         
             
     def _plotXY(self, coord, angles):
@@ -189,30 +233,23 @@ class Display(ttkFrame):
         x = int((coord[0]*Display.PIXELS_METER + 200.0) % 400.0)
         y = int((100.0 - coord[1]*Display.PIXELS_METER) % 200.0)
         
-        sinz = sin(angles[2])
-        cosz = cos(angles[2])
-        
-        lines = [Vector.rotateVector(line, sinz, cosz) \
-                 for line in [ [0, Display.ARM_LENGTH], \
-                              [Display.ARM_LENGTH, 0], \
-                              [0, -Display.ARM_LENGTH], \
-                              [-Display.ARM_LENGTH, 0]] ] 
+        #Arms rotated on the Z-axis: front, right, back and left
+        dx = int(round(-sin(angles[2]) * Display.ARM_LENGTH))
+        dy = int(round(cos(angles[2]) * Display.ARM_LENGTH))
         
-        for index in range(4):
-            self._canvasXY.coords(self._linesXY[index], x, y, x+lines[index][0], y-lines[index][1])
+        Display._moveLine(self._canvasXY, self._linesXY, self._coordsXY, 0, (x, y, x+dx, y-dy))
+        Display._moveLine(self._canvasXY, self._linesXY, self._coordsXY, 1, (x, y, x+dy, y+dx))
+        Display._moveLine(self._canvasXY, self._linesXY, self._coordsXY, 2, (x, y, x-dx, y+dy))
+        Display._moveLine(self._canvasXY, self._linesXY, self._coordsXY, 3, (x, y, x-dy, y-dx))
 
 
-    def _plotHeight(self, x, y, angle, canvas, lines):
+    def _plotHeight(self, x, y, angle, canvas, lines, lastCoords):
     
-        cosine = cos(angle)
-        sine = sin(angle)
-        
-        vectors = [Vector.rotateVector(vector, sine, cosine) \
-                 for vector in [[-Display.ARM_LENGTH, 0], \
-                              [Display.ARM_LENGTH, 0]] ]
+        dx = int(round(cos(angle) * Display.ARM_LENGTH))
+        dy = int(round(sin(angle) * Display.ARM_LENGTH))
         
-        for index in range(2):
-            canvas.coords(lines[index], x, y, x+vectors[index][0], y+vectors[index][1])
+        Display._moveLine(canvas, lines, lastCoords, 0, (x, y, x-dx, y-dy))
+        Display._moveLine(canvas, lines, lastCoords, 1, (x, y, x+dx, y+dy))
 
 
     def _plotXZ(self, coord, angles):
@@ -220,7 +257,7 @@ class Display(ttkFrame):
         x = 100
         y = int(200.0 - (coord[2]*Display.PIXELS_METER%200.0))
         
-        self._plotHeight(x, y, angles[1], self._canvasXZ, self._linesXZ)
+        self._plotHeight(x, y, angles[1], self._canvasXZ, self._linesXZ, self._coordsXZ)
         
 
     def _plotYZ(self, coord, angles):
@@ -228,31 +265,44 @@ class Display(ttkFrame):
         x = 100
         y = int(200.0 - (coord[2]*Display.PIXELS_METER%200.0))
         
-        self._plotHeight(x, y, -angles[0], self._canvasYZ, self._linesYZ)
+        self._plotHeight(x, y, -angles[0], self._canvasYZ, self._linesYZ, self._coordsYZ)
+
+
+    def _render(self, state):
+        
+        if state._crashed != self._isCrashShown:
+            self._isCrashShown = state._crashed
+            for canvas, item in self._crashTexts:
+                canvas.itemconfigure(item, state=NORMAL if state._crashed else HIDDEN)
+        
+        if not state._crashed:
+            angles = [radians(angle) for angle in state._angles]
+            self._plotXY(state._coords, angles)
+            self._plotXZ(state._coords, angles)
+            self._plotYZ(state._coords, angles)
+
+            for index in range(3):
+                self._setText(self._coordTexts[index], state._coords[index])
+                self._setText(self._angleTexts[index], state._angles[index])
+                self._setText(self._accelTexts[index], state._accels[index])
+                self._setText(self._speedTexts[index], state._speeds[index])
 
 
     def _refresh(self):
         
         if self._isRunning:
+            
+            startTime = monotonic()
         
+            #The state provider might return the same state while the drone doesn't change (see StateSnapshot)
             state = self._stateProvider.getState()
-            if not state._crashed:
-                angles = [radians(angle) for angle in state._angles]
-                self._plotXY(state._coords, angles)
-                self._plotXZ(state._coords, angles)
-                self._plotYZ(state._coords, angles)
-
-                for index in range(3):
-                    self._coordTexts[index].set("{0:.3f}".format(state._coords[index]))
-                    self._angleTexts[index].set("{0:.3f}".format(state._angles[index]))
-                    self._accelTexts[index].set("{0:.3f}".format(state._accels[index]))
-                    self._speedTexts[index].set("{0:.3f}".format(state._speeds[index]))
-                
-            else:
-                self._canvasXY.create_text((200,100), text="CRASHED!", fill="#ff0000")
-                self._canvasXZ.create_text((100,100), text="CRASHED!", fill="#ff0000")
-                self._canvasYZ.create_text((100,100), text="CRASHED!", fill="#ff0000")
+            if state is not self._lastState:
+                self._lastState = state
+                self._render(state)
             
-            self.update_idletasks()
+            renderTime = monotonic() - startTime
+            self._renderTime += Display.COST_FILTER * (renderTime - self._renderTime)
             
-            self.after(int(self._refreshTime * 1000.0), self._refresh)
+            #Reduce the frame rate if rendering takes longer than allowed
+            delay = max(self._refreshTime, self._renderTime / Display.MAX_LOAD)
+            self.after(int(delay * 1000.0), self._refresh)
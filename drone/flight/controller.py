@@ -9,22 +9,31 @@ import logging
 import time
 
 from config import Configuration
+from emulation.altimeter import EmulatedAltimeter
 from emulation.drone import EmulatedDrone
 from emulation.sensor import EmulatedSensor
 from flight.driving.driver import Driver
-from flight.stabilization.pid import PID
+from flight.stabilization.attitude import AttitudeEstimator
+from flight.stabilization.acquisition import SensorAcquisition, SampledSensor
+from flight.stabilization.cascade import ControlStage, ControllerGraph
+from flight.stabilization.kalman import VerticalEstimator
+from flight.stabilization.sample_ring import SampleRing
+from flight.stabilization.scheduler import SleepScheduler, DeadlineScheduler
 from flight.stabilization.sensor import Sensor
 from flight.state import State
 from sensors.IMU_dummy import IMUDummy
 from sensors.imu3000_emu import Imu3000Emulated
 from sensors.imu6050dmp import Imu6050Dmp
+from sensors.interrupt import GpioInterrupt, SimulatedInterrupt
+from sensors.recording import SensorRecorder, ReplaySensor
 
 
 class FlightController(object):
     
-    PID_PERIOD = 0.006 #166.666Hz #0.02  # seconds (50Hz)
     ANGLE_SPEED_FACTOR = 1000.0 # Angle-speed's PID-constants are divided by this factor
     
+    SIMULATED_INTERRUPT_PERIOD = 0.01 # DMP's default output rate (100Hz)
+    
     FLIGHT_MODE_ANGLE_SPEED = 0
     FLIGHT_MODE_ANGLE = 1
     FLIGHT_MODE_ACCEL = 2
@@ -40,12 +49,26 @@ class FlightController(object):
         return FlightController._instance
     
     
-    def __init__(self):
+    def __init__(self, driver=None, sensor=None, scheduler=None, acquisitionMode=""):
+        '''
+        Constructor
+        
+        The parameters allow to replace the configured components (i.e. for the lockstep simulation).
+        
+        @param driver: Driver of the motors. If None, it is created according to the configuration.
+        @param sensor: IMU. If None, it is created according to the configuration.
+        @param scheduler: Scheduler of the PID. If None, it is created according to the configuration.
+        @param acquisitionMode: See Configuration.VALUE_SENSOR_ACQUISITION_*. If empty, the configuration will be used.
+        '''
         
         self._config = Configuration.getInstance().getConfig()
         
-        self._driver = Driver()
-        self._createSensor(self._config[Configuration.KEY_IMU_CLASS])
+        self._driver = driver if driver != None else Driver()
+        
+        if sensor != None:
+            self._sensor = sensor
+        else:
+            self._createSensor(self._config[Configuration.KEY_IMU_CLASS])
         
         #PID constants must have the same length
         self._pidAnglesSpeedKP = [k / FlightController.ANGLE_SPEED_FACTOR for k \
@@ -56,24 +79,55 @@ class FlightController(object):
                                      in self._config[Configuration.PID_ANGLES_SPEED_KD]]
         
         #PID constants must have the same length
-        self._pidAnglesKP = self._config[Configuration.PID_ANGLES_KP] 
-        self._pidAnglesKI = self._config[Configuration.PID_ANGLES_KI]
-        self._pidAnglesKD = self._config[Configuration.PID_ANGLES_KD]
+        self._pidAnglesKP = list(self._config[Configuration.PID_ANGLES_KP]) 
+        self._pidAnglesKI = list(self._config[Configuration.PID_ANGLES_KI])
+        self._pidAnglesKD = list(self._config[Configuration.PID_ANGLES_KD])
+        
+        self._pidAccelKP = list(self._config[Configuration.PID_ACCEL_KP])
+        self._pidAccelKI = list(self._config[Configuration.PID_ACCEL_KI])
+        self._pidAccelKD = list(self._config[Configuration.PID_ACCEL_KD])
         
-        self._pidAccelKP = self._config[Configuration.PID_ACCEL_KP]
-        self._pidAccelKI = self._config[Configuration.PID_ACCEL_KI]
-        self._pidAccelKD = self._config[Configuration.PID_ACCEL_KD]
+        #Roll, pitch and yaw corrections of the current tick
+        self._attitudeCommand = [0.0] * 3
         
         #PID
-        self._pidKP = self._pidAnglesSpeedKP + self._pidAnglesKP + self._pidAccelKP
-        self._pidKI = self._pidAnglesSpeedKI + self._pidAnglesKI + self._pidAccelKI
-        self._pidKD = self._pidAnglesSpeedKD + self._pidAnglesKD + self._pidAccelKD
+        #The period is the one of the fastest stage. The slower stages run once every "divider" periods.
+        self._pidPeriod = self._config[Configuration.PID_PERIOD]
+        
+        self._pidAnglesSpeedStage = ControlStage("angles-speed", \
+                                                 self._pidAnglesSpeedKP, self._pidAnglesSpeedKI, self._pidAnglesSpeedKD, \
+                                                 self._readPIDAnglesSpeedInput, self._setPIDAnglesSpeedOutput, \
+                                                 self._config[Configuration.PID_ANGLES_SPEED_DIVIDER])
+        
+        self._pidAnglesStage = ControlStage("angles", \
+                                            self._pidAnglesKP, self._pidAnglesKI, self._pidAnglesKD, \
+                                            self._readPIDAnglesInput, self._setPIDAnglesOutput, \
+                                            self._config[Configuration.PID_ANGLES_DIVIDER])
+        
+        self._pidAccelStage = ControlStage("accel", \
+                                           self._pidAccelKP, self._pidAccelKI, self._pidAccelKD, \
+                                           self._readPIDAccelInput, self._setPIDAccelOutput, \
+                                           self._config[Configuration.PID_ACCEL_DIVIDER])
         
-        self._pid = PID(FlightController.PID_PERIOD, \
-                        self._pidKP, self._pidKI, self._pidKD, \
-                        self._readPIDInput, self._setPIDOutput, \
-                        "stabilization-pid")
-        self._pid.setTargets([0.0]*len(self._pidKP))        
+        if scheduler == None:
+            scheduler = FlightController.createScheduler(self._pidPeriod)
+        
+        self._pid = ControllerGraph(self._pidPeriod, self._readPIDInput, self._setPIDOutput, \
+                                    "stabilization-pid", scheduler)
+        self._pid.addStage(self._pidAnglesSpeedStage)\
+            .addStage(self._pidAnglesStage)\
+            .addStage(self._pidAccelStage)
+        
+        #The angles' output is the angle-speeds' target for the axes X and Y
+        self._pid.connect(self._pidAnglesStage, self._pidAnglesSpeedStage, [(0, 0), (1, 1)])
+        
+        if acquisitionMode == "":
+            acquisitionMode = self._config[Configuration.KEY_SENSOR_ACQUISITION]
+        self._createAcquisition(acquisitionMode)
+        
+        self._verticalEstimator = VerticalEstimator(self._pidPeriod) \
+            if self._config[Configuration.KEY_VERTICAL_ESTIMATOR] else None
+        self._createAltimeter(self._config[Configuration.KEY_ALTIMETER_CLASS])
 
         self._isRunning = False
         
@@ -99,7 +153,7 @@ class FlightController(object):
 
         if imuClass == Configuration.VALUE_IMU_CLASS_3000:
             
-            self._sensor = Sensor()
+            self._sensor = Sensor(AttitudeEstimator.create(self._config[Configuration.KEY_ATTITUDE_ESTIMATOR]))
             
 #         elif imuClass == Configuration.VALUE_IMU_CLASS_REMOTE:
 #             
@@ -109,24 +163,106 @@ class FlightController(object):
 
         elif imuClass == Configuration.VALUE_IMU_CLASS_3000EMU:
             
-            self._sensor = Imu3000Emulated()
+            self._sensor = Imu3000Emulated(AttitudeEstimator.create(self._config[Configuration.KEY_ATTITUDE_ESTIMATOR]))
             
         elif imuClass == Configuration.VALUE_IMU_CLASS_6050:
             
-            self._sensor = Imu6050Dmp()
+            self._sensor = Imu6050Dmp(self._createImuInterrupt())
             
         elif imuClass == Configuration.VALUE_IMU_CLASS_EMULATION:
             
             self._sensor = EmulatedSensor(EmulatedDrone.REALISTIC_FLIGHT)
             
+        elif imuClass == Configuration.VALUE_IMU_CLASS_REPLAY:
+            
+            self._sensor = ReplaySensor(self._config[Configuration.KEY_SENSOR_REPLAY_FILE], \
+                                        self._config[Configuration.KEY_SENSOR_REPLAY_REAL_TIME])
+            
         else: #Dummy as default
             
             self._sensor = IMUDummy()
             
+        recordFile = self._config[Configuration.KEY_SENSOR_RECORD_FILE]
+        if recordFile:
+            
+            self._sensor = SensorRecorder(self._sensor, recordFile, self._config[Configuration.KEY_SENSOR_RECORD_RAW])
+            
+    
+    def _createImuInterrupt(self):
+        
+        interruptMode = self._config[Configuration.KEY_IMU_INTERRUPT]
+        
+        if interruptMode == Configuration.VALUE_IMU_INTERRUPT_GPIO:
+            
+            interrupt = GpioInterrupt(self._config[Configuration.KEY_IMU_INTERRUPT_GPIO])
+            
+        elif interruptMode == Configuration.VALUE_IMU_INTERRUPT_SIMULATED:
+            
+            interrupt = SimulatedInterrupt(FlightController.SIMULATED_INTERRUPT_PERIOD)
+            
+        else: #Polling as default
+            
+            interrupt = None
+            
+        return interrupt
+    
+    
+    def _createAltimeter(self, altimeterClass):
+        
+        if altimeterClass == Configuration.VALUE_ALTIMETER_CLASS_EMULATION:
+            
+            self._altimeter = EmulatedAltimeter()
+            
+        else: #No altimeter as default
+            
+            self._altimeter = None
+    
+    
+    def _createAcquisition(self, acquisitionMode):
+        
+        if acquisitionMode == Configuration.VALUE_SENSOR_ACQUISITION_THREADED:
+            
+            #Samples are timestamped with the PID's clock in order to measure the latency
+            clock = self._pid.getScheduler().now
+            ring = SampleRing(SensorAcquisition.SAMPLE_WIDTH)
+            
+            self._acquisition = SensorAcquisition(self._sensor, ring, self._pidPeriod, clock)
+            self._inputSensor = SampledSensor(ring, clock, self._pidPeriod)
+            
+        else: #Synchronous as default
+            
+            self._acquisition = None
+            self._inputSensor = self._sensor
+            
+    
+    @staticmethod
+    def createScheduler(period):
+        '''
+        Creates the PID's scheduler according to the configuration
+        
+        @param period: Period of the PID in seconds
+        '''
+        
+        config = Configuration.getInstance().getConfig()
+        
+        if config[Configuration.KEY_LOOP_SCHEDULER] == Configuration.VALUE_LOOP_SCHEDULER_SLEEP:
+            
+            scheduler = SleepScheduler(period)
+            
+        else: #Deadline as default
+            
+            scheduler = DeadlineScheduler(period, \
+                                          config[Configuration.KEY_LOOP_SPIN_TIME], \
+                                          config[Configuration.KEY_LOOP_PRIORITY], \
+                                          config[Configuration.KEY_LOOP_CPU], \
+                                          config[Configuration.KEY_LOOP_LOCK_MEMORY])
+            
+        return scheduler
+    
     
     def _readPIDAnglesSpeedInput(self):
 
-        inputData = self._sensor.readAngleSpeeds()
+        inputData = self._inputSensor.readAngleSpeeds()
 
         logging.debug("PID-angles-speed input: {0}".format(inputData))
         
@@ -135,24 +271,18 @@ class FlightController(object):
 
     def _setPIDAnglesSpeedOutput(self, output):
         
-        #angle X
-        #Moving the drone along Y-direction makes it turning on X-axis 
-        #Caution! Angle around X-axis as positive sense means moving backwards
-        self._driver.shiftY(-output[0])
-        
-        #angle Y
-        #Moving the drone along X-direction makes it turning on Y-axis
-        self._driver.shiftX(output[1])
-        
-        #angle-speed Z
-        self._driver.spin(output[2])
+        #The command is sent to the driver at once when the tick is finished
+        #angle X, angle Y, angle-speed Z
+        self._attitudeCommand[0] = output[0]
+        self._attitudeCommand[1] = output[1]
+        self._attitudeCommand[2] = output[2]
         
         logging.debug("PID-angles-speed output: {0}".format(output))
     
     
     def _readPIDAnglesInput(self):
 
-        angles = self._sensor.readDeviceAngles()
+        angles = self._inputSensor.readDeviceAngles()[0:2]
         
         logging.debug("PID-angles input: {0}".format(angles))
 
@@ -161,16 +291,13 @@ class FlightController(object):
 
     def _setPIDAnglesOutput(self, output):
        
-        if self._flightMode == FlightController.FLIGHT_MODE_ANGLE:
-            self._pid.setTarget(output[0], 0) #angle-speed X
-            self._pid.setTarget(output[1], 1) #angle-speed Y
-                        
-            logging.debug("PID-angles output: {0}".format(output))
+        #The angle-speed targets are set by the graph's connection
+        logging.debug("PID-angles output: {0}".format(output))
     
     
     def _readPIDAccelInput(self):
         
-        inputData = self._sensor.readAccels()
+        inputData = self._inputSensor.readAccels()
 
         logging.debug("PID-accel input: {0}".format(inputData))
 
@@ -191,29 +318,17 @@ class FlightController(object):
 
     def _readPIDInput(self):
         
-        logging.debug("Targets: {0}".format(self._pid.getTargets()))
-        
-        self._sensor.refreshState()
-        anglesSpeedInput = self._readPIDAnglesSpeedInput()
-        anglesInput = self._readPIDAnglesInput()[0:2]
-        accelInput = self._readPIDAccelInput()
+        self._inputSensor.refreshState()
         
-        pidInput = anglesSpeedInput + anglesInput + accelInput
-        
-        return pidInput         
+        if self._verticalEstimator != None:
+            altitude = self._altimeter.readAltitude() if self._altimeter != None else None
+            self._verticalEstimator.update(self._inputSensor.readAccels()[2], altitude)
     
     
-    def _setPIDOutput(self, output):
-        
-        anglesSpeedOutput = output[0:3]
-        anglesOutput = output[3:5]
-        accelOutput = output[5:8]
-        
-        self._setPIDAnglesSpeedOutput(anglesSpeedOutput)
-        self._setPIDAnglesOutput(anglesOutput)
-        self._setPIDAccelOutput(accelOutput)
+    def _setPIDOutput(self):
         
-        self._driver.commitIncrements()
+        command = self._attitudeCommand
+        self._driver.commitIncrements(command[0], command[1], command[2])
         
     
     def addThrottle(self, increment):
@@ -260,10 +375,10 @@ class FlightController(object):
         #inputs[3] * Dispatcher.MAX_ACCEL_Z / 100.0]
 
 
-        self._pid.setTarget(targets[0], 3) #angle X
-        self._pid.setTarget(targets[1], 4) #angle Y
-        self._pid.setTarget(targets[2], 2) #angle speed Z
-        #self._pid.setTarget(targets[3], 7) #accel Z
+        self._pidAnglesStage.setTarget(targets[0], 0) #angle X
+        self._pidAnglesStage.setTarget(targets[1], 1) #angle Y
+        self._pidAnglesSpeedStage.setTarget(targets[2], 2) #angle speed Z
+        #self._pidAccelStage.setTarget(targets[3], 2) #accel Z
 
 
     
@@ -274,22 +389,27 @@ class FlightController(object):
         '''
         
         if self._flightMode == FlightController.FLIGHT_MODE_ANGLE:
-            self._pid.setTarget(targets[0], 3) #angle X
-            self._pid.setTarget(targets[1], 4) #angle Y
+            self._pidAnglesStage.setTarget(targets[0], 0) #angle X
+            self._pidAnglesStage.setTarget(targets[1], 1) #angle Y
         elif self._flightMode == FlightController.FLIGHT_MODE_ANGLE_SPEED:
-            self._pid.setTarget(targets[0], 0) #angle-speed X
-            self._pid.setTarget(targets[1], 1) #angle-speed Y
+            self._pidAnglesSpeedStage.setTarget(targets[0], 0) #angle-speed X
+            self._pidAnglesSpeedStage.setTarget(targets[1], 1) #angle-speed Y
         else: #TODO: FlightController.FLIGHT_MODE_ACCEL
             raise Exception("Flight mode accel not implemented!")
         
-        self._pid.setTarget(targets[2], 2) #angle speed Z
-        self._pid.setTarget(targets[3], 7) #accel Z
+        self._pidAnglesSpeedStage.setTarget(targets[2], 2) #angle speed Z
+        self._pidAccelStage.setTarget(targets[3], 2) #accel Z
         
         
     def setFlightMode(self, flightMode):
     
         self._flightMode = flightMode
-        self._pid.setTargets([0.0]*len(self._pidKP))
+        
+        #The angles' stage only runs in angle mode, otherwise it would override the angle-speed targets
+        self._pidAnglesStage.setEnabled(flightMode == FlightController.FLIGHT_MODE_ANGLE)
+        
+        for stage in self._pid.getStages():
+            stage.setTargets([0.0] * len(stage.getTargets()))
         
      
 #     def enableIntegrals(self):
@@ -322,16 +442,48 @@ class FlightController(object):
 
             self._sensor.resetGyroReadTime()
             
-            time.sleep(FlightController.PID_PERIOD)            
-            self._sensor.refreshState()
+            if self._acquisition != None:
+                self._inputSensor.reset()
+                self._acquisition.start()
+            
+            if self._pid.getScheduler().isThreaded():
+                time.sleep(self._pidPeriod)
+            self._inputSensor.refreshState()
+            
+            if self._verticalEstimator != None:
+                self._verticalEstimator.reset()
             
             self._pid.start()
             
     
+    def step(self):
+        '''
+        Runs a single PID iteration within the calling thread. Time advances even if the PID is stopped.
+        Only for non-threaded schedulers (see SimulatedScheduler).
+        '''
+        
+        self._pid.step()
+        
+    
     def _stopPid(self):
         
         self._pid.stop()
         
+        if self._acquisition != None and self._acquisition.isRunning():
+            
+            self._acquisition.stop()
+            
+            message = "Sensor samples: {0}; missed: {1}".format(self._inputSensor.getLatencyStatistics(), \
+                                                                self._inputSensor.getMissedSamples())
+            print(message)
+            logging.info(message)
+        
+        if self._verticalEstimator != None and self._verticalEstimator.getStatistics().getCount() != 0:
+            
+            message = str(self._verticalEstimator.getStatistics())
+            print(message)
+            logging.info(message)
+        
         print("PID finished.")
         logging.info("PID finished.")
                 
@@ -365,20 +517,23 @@ class FlightController(object):
         
         if axisIndex < len(self._pidAnglesSpeedKP):
             
-            self._pidKP[axisIndex] = valueP / FlightController.ANGLE_SPEED_FACTOR
-            self._pidKI[axisIndex] = valueI / FlightController.ANGLE_SPEED_FACTOR
-            self._pidKD[axisIndex] = valueD / FlightController.ANGLE_SPEED_FACTOR
+            self._pidAnglesSpeedKP[axisIndex] = valueP / FlightController.ANGLE_SPEED_FACTOR
+            self._pidAnglesSpeedKI[axisIndex] = valueI / FlightController.ANGLE_SPEED_FACTOR
+            self._pidAnglesSpeedKD[axisIndex] = valueD / FlightController.ANGLE_SPEED_FACTOR
+            
+            self._pidAnglesSpeedStage.setConstants(axisIndex, self._pidAnglesSpeedKP[axisIndex], \
+                                                   self._pidAnglesSpeedKI[axisIndex], self._pidAnglesSpeedKD[axisIndex])
         
 
     def alterPidAnglesConstants(self, axisIndex, valueP, valueI, valueD):
         
         if axisIndex < len(self._pidAnglesKP):
 
-            axisIndex += 3
-                        
-            self._pidKP[axisIndex] = valueP
-            self._pidKI[axisIndex] = valueI
-            self._pidKD[axisIndex] = valueD
+            self._pidAnglesKP[axisIndex] = valueP
+            self._pidAnglesKI[axisIndex] = valueI
+            self._pidAnglesKD[axisIndex] = valueD
+            
+            self._pidAnglesStage.setConstants(axisIndex, valueP, valueI, valueD)
             
             print("constantes: {0}".format([valueP, valueI, valueD]))
             
@@ -387,11 +542,11 @@ class FlightController(object):
         
         if axisIndex < len(self._pidAccelKP):
             
-            axisIndex += 5
+            self._pidAccelKP[axisIndex] = valueP
+            self._pidAccelKI[axisIndex] = valueI
+            self._pidAccelKD[axisIndex] = valueD
             
-            self._pidKP[axisIndex] = valueP
-            self._pidKI[axisIndex] = valueI
-            self._pidKD[axisIndex] = valueD
+            self._pidAccelStage.setConstants(axisIndex, valueP, valueI, valueD)
 
 
     def isRunning(self):
@@ -404,9 +559,13 @@ class FlightController(object):
         state = State()
         
         state._throttles = self._driver.getThrottles()
-        state._angles = self._sensor.readDeviceAngles()
-        state._angles[2] = self._sensor.readAngleSpeeds()[2]
-        state._accels = self._sensor.readAccels()
+        #The sensor may return buffers which are reused on each tick (see SampledSensor)
+        state._angles = list(self._inputSensor.readDeviceAngles())
+        state._angles[2] = self._inputSensor.readAngleSpeeds()[2]
+        state._accels = list(self._inputSensor.readAccels())
+        if self._verticalEstimator != None:
+            state._speeds = [0.0, 0.0, self._verticalEstimator.getSpeed()]
+            state._height = self._verticalEstimator.getHeight()
         state._currentPeriod = self._pid.getCurrentPeriod()
         
         return state
@@ -6,6 +6,7 @@ Created on 06/04/2015
 @author: david
 '''
 
+from array import array
 import logging
 from os import system
 from os.path import exists
@@ -13,24 +14,29 @@ import sys
 from threading import Lock
 
 from config import Configuration
+from flight.driving.mixer import Mixer
 from flight.driving.motor import Motor
 from flight.driving.motor_dummy import MotorDummy
+from emulation.drone import EmulatedDrone
 from emulation.motor import EmulatedMotor
 
 
 class Driver(object):
     '''
     Controls a motor set
-    '''
     
-    NUM_MOTORS = 4
+    The attitude corrections are accumulated as a (roll, pitch, yaw) command, which is translated
+    into the throttle of each motor by the frame's mixer when the increments are committed.
+    '''
     
-    def __init__(self, motorType=""):
+    def __init__(self, motorType="", frame=""):
         '''
         Constructor
 
         @param motorType: String with the type of the motor to implement. See Configuration.VALUE_MOTOR_CLASS_*
         If motorType value is not provided, the configuration will be used.
+        @param frame: Frame of the multirotor. See Mixer.FRAME_*
+        If frame value is not provided, the configuration will be used.
         '''
         
         self._lock = Lock()
@@ -38,16 +44,46 @@ class Driver(object):
         self._config = Configuration.getInstance().getConfig()        
         self._motors = []
         self._baseThrottle = 0.0
-        self._motorIncrements = [0.0] * Driver.NUM_MOTORS
+        self._command = array("d", [0.0, 0.0, 0.0]) #roll, pitch, yaw
 
         if motorType == "":
             motorType = self._config[Configuration.KEY_MOTOR_CLASS]
+            
+        if frame == "":
+            frame = self._config[Configuration.KEY_FRAME]
+
+        matrix = Mixer.getMatrix(frame)
+        maxMotorCount = Driver._getMaxMotorCount(motorType)
+        if maxMotorCount != None and len(matrix) > maxMotorCount:
+            raise Exception("The frame \"{0}\" needs {1} motors, but the \"{2}\" motor type only has {3}" \
+                            .format(frame, len(matrix), motorType, maxMotorCount))
 
-        for motorId in range(Driver.NUM_MOTORS):
+        for motorId in range(len(matrix)):
             motor = self._createMotor(motorId, motorType)
-            self._motors.append(motor)            
+            self._motors.append(motor)
+            
+        self._mixer = Mixer(matrix, 0.0, self._maxMotorThrottle)
             
     
+    @staticmethod
+    def _getMaxMotorCount(motorClass):
+        '''
+        @param motorClass: Type of the motors. See Configuration.VALUE_MOTOR_CLASS_*
+        @return: Number of motors the type supports, or None if there isn't any limit
+        '''
+
+        if motorClass == Configuration.VALUE_MOTOR_CLASS_LOCAL:
+            count = Motor.getPinCount()
+
+        elif motorClass == Configuration.VALUE_MOTOR_CLASS_EMULATION:
+            count = EmulatedDrone.getInstance().getPropellerCount()
+
+        else:
+            count = None
+
+        return count
+
+
     def _createMotor(self, motorId, motorClass):
         '''
         Creates a new motor instance
@@ -96,7 +132,7 @@ class Driver(object):
         
         with self._lock:
             self._baseThrottle = 0.0
-            self._motorIncrements = [0.0] * Driver.NUM_MOTORS
+            self._resetCommand()
             for motor in self._motors:
                 motor.standBy()
             
@@ -105,7 +141,7 @@ class Driver(object):
         
         with self._lock:
             self._baseThrottle = 0.0
-            self._motorIncrements = [0.0] * Driver.NUM_MOTORS
+            self._resetCommand()
             for motor in self._motors:
                 motor.idle()
             
@@ -114,7 +150,7 @@ class Driver(object):
 
         with self._lock:        
             self._baseThrottle = 0.0
-            self._motorIncrements = [0.0] * Driver.NUM_MOTORS
+            self._resetCommand()
             for motor in self._motors:
                 motor.stop()
             
@@ -127,50 +163,63 @@ class Driver(object):
             #    motor.addThrottle(increment)            
                         
     
+    def _resetCommand(self):
+        
+        command = self._command
+        command[0] = 0.0
+        command[1] = 0.0
+        command[2] = 0.0
+        
+        
+    def getMotorCount(self):
+        
+        return len(self._motors)
+    
+    
     def shiftX(self, increment): 
         
         with self._lock:
-            self._motorIncrements[0] += -increment
-            #self._motorIncrements[1] += -increment
-
-            self._motorIncrements[2] += increment
-            #self._motorIncrements[3] += increment
+            #Moving along X-direction makes the drone turning on Y-axis
+            self._command[Mixer.PITCH] += increment
 
     
     def shiftY(self, increment):
     
         with self._lock:
-            #self._motorIncrements[0] += -increment
-            self._motorIncrements[3] += -increment
-        
-            self._motorIncrements[1] += increment
-            #self._motorIncrements[2] += increment
+            #Caution! Angle around X-axis as positive sense means moving backwards
+            self._command[Mixer.ROLL] -= increment
 
 
     def spin(self, increment): 
         
         with self._lock:
-   
-            self._motorIncrements[0] += -increment
-            self._motorIncrements[2] += -increment
+            self._command[Mixer.YAW] += increment
 
-            self._motorIncrements[1] += increment
-            self._motorIncrements[3] += increment
 
-
-    def commitIncrements(self):
+    def commitIncrements(self, roll=0.0, pitch=0.0, yaw=0.0):
+        '''
+        Sets the motors' throttle according to the accumulated increments.
+        The control loop can pass its whole command at once, therefore the lock is taken only once per tick.
+        
+        @param roll: Correction around the X-axis added to the accumulated one
+        @param pitch: Correction around the Y-axis added to the accumulated one
+        @param yaw: Correction around the Z-axis added to the accumulated one
+        '''
 
         with self._lock:
             try:
-                for index in range(Driver.NUM_MOTORS):
-                    increment = self._motorIncrements[index]                    
-                    self._motors[index].setThrottle(self._baseThrottle + increment)
+                command = self._command
+                throttles = self._mixer.mix(command[0] + roll, command[1] + pitch, command[2] + yaw, \
+                                            self._baseThrottle)
+                
+                for index in range(len(self._motors)):
+                    self._motors[index].setThrottle(throttles[index])
                         
             except Exception as ex:
                 logging.warning("Driver commit exception: {0}".format(str(ex)))
                 
             finally:
-                self._motorIncrements = [0.0] * Driver.NUM_MOTORS
+                self._resetCommand()
                 
                 
     def getThrottles(self):
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from array import array
+from math import cos, radians, sin
+
+
+try:
+    import numpy
+
+except ImportError:
+
+    numpy = None
+
+
+class Mixer(object):
+    '''
+    Translates an attitude command (roll, pitch, yaw) and a throttle into the throttle of each motor
+    by means of a mixing matrix. Each row of the matrix holds the factors of a motor for
+    roll, pitch, yaw and throttle, in this order.
+
+    Roll is the correction around the X-axis, pitch around the Y-axis and yaw around the Z-axis.
+    '''
+
+    FRAME_QUAD_PLUS = "quad+"
+    FRAME_QUAD_X = "quadX"
+    FRAME_HEX_X = "hexX"
+    FRAME_OCTO_X = "octoX"
+
+    ROLL = 0
+    PITCH = 1
+    YAW = 2
+    THROTTLE = 3
+
+    @staticmethod
+    def _createRadialMatrix(motorCount, offset):
+        '''
+        Creates the matrix of a flat multirotor whose motors are equally spaced around its center.
+        Motors are counted clockwise from the front and they spin alternately.
+
+        @param motorCount: Number of motors
+        @param offset: Angle in degrees of the first motor from the front
+        '''
+
+        matrix = []
+        for index in range(motorCount):
+            angle = radians(offset + index * 360.0 / motorCount)
+            yaw = -1.0 if index % 2 == 0 else 1.0
+            #Adding zero avoids negative zeros
+            matrix.append([round(-sin(angle), 6) + 0.0, round(-cos(angle), 6) + 0.0, yaw, 1.0])
+
+        return matrix
+
+
+    @staticmethod
+    def getMatrix(frame):
+        '''
+        @param frame: See Mixer.FRAME_*
+        @return: Mixing matrix of the frame
+        '''
+
+        #The quad+ layout is the one of the former Driver: motor 0 at the front
+        if frame == Mixer.FRAME_QUAD_PLUS:
+            matrix = Mixer._createRadialMatrix(4, 0.0)
+        elif frame == Mixer.FRAME_QUAD_X:
+            matrix = Mixer._createRadialMatrix(4, -45.0)
+        elif frame == Mixer.FRAME_HEX_X:
+            matrix = Mixer._createRadialMatrix(6, -30.0)
+        elif frame == Mixer.FRAME_OCTO_X:
+            matrix = Mixer._createRadialMatrix(8, -22.5)
+        else:
+            raise Exception("Unknown frame \"{0}\"".format(frame))
+
+        return [list(row) for row in matrix]
+
+
+    @staticmethod
+    def create(frame, minThrottle, maxThrottle):
+        '''
+        Creates the mixer of a known frame
+
+        @param frame: See Mixer.FRAME_*
+        @param minThrottle: Min. throttle of any motor
+        @param maxThrottle: Max. throttle of any motor
+        '''
+
+        return Mixer(Mixer.getMatrix(frame), minThrottle, maxThrottle)
+
+
+    def __init__(self, matrix, minThrottle, maxThrottle):
+        '''
+        Constructor
+
+        @param matrix: List of rows [roll, pitch, yaw, throttle], one per motor
+        @param minThrottle: Min. throttle of any motor
+        @param maxThrottle: Max. throttle of any motor
+        '''
+
+        self._motorCount = len(matrix)
+        self._indexes = range(self._motorCount)
+
+        self._roll = array("d", [row[Mixer.ROLL] for row in matrix])
+        self._pitch = array("d", [row[Mixer.PITCH] for row in matrix])
+        self._yaw = array("d", [row[Mixer.YAW] for row in matrix])
+        self._throttle = array("d", [row[Mixer.THROTTLE] for row in matrix])
+
+        self._minThrottle = minThrottle
+        self._maxThrottle = maxThrottle
+
+        self._corrections = array("d", [0.0]) * self._motorCount
+        self._outputs = array("d", [0.0]) * self._motorCount
+
+
+    def getMotorCount(self):
+
+        return self._motorCount
+
+
+    def mix(self, roll, pitch, yaw, throttle):
+        '''
+        Calculates the throttle of each motor.
+
+        Motors are kept within the throttle range. If the corrections don't fit into the range, they are
+        scaled down. Then, the throttle is shifted the least needed, hence the attitude takes
+        priority over the throttle.
+
+        @return: Array of throttles. It will be overwritten by the next call.
+        '''
+
+        corrections = self._corrections
+        outputs = self._outputs
+
+        low = float("inf")
+        high = float("-inf")
+        for i in self._indexes:
+            correction = self._roll[i] * roll + self._pitch[i] * pitch + self._yaw[i] * yaw
+            corrections[i] = correction
+            if correction < low:
+                low = correction
+            if correction > high:
+                high = correction
+
+        #Scale the corrections down when their spread is wider than the throttle range
+        throttleRange = self._maxThrottle - self._minThrottle
+        spread = high - low
+        if spread > throttleRange:
+            scale = throttleRange / spread
+            for i in self._indexes:
+                corrections[i] *= scale
+            low *= scale
+            high *= scale
+
+        #Shift the throttle in order to fit the corrections into the range
+        if throttle + high > self._maxThrottle:
+            throttle = self._maxThrottle - high
+        if throttle + low < self._minThrottle:
+            throttle = self._minThrottle - low
+
+        for i in self._indexes:
+            outputs[i] = self._throttle[i] * throttle + corrections[i]
+
+        return outputs
+
+
+class NumpyMixer(object):
+    '''
+    Mixer of many multirotors of the same frame at once using NumPy (i.e. batch simulations)
+    '''
+
+    def __init__(self, matrix, minThrottle, maxThrottle):
+        '''
+        Constructor
+
+        See Mixer
+        '''
+
+        self._matrix = numpy.array(matrix, dtype=float)
+        self._minThrottle = minThrottle
+        self._maxThrottle = maxThrottle
+
+
+    def getMotorCount(self):
+
+        return self._matrix.shape[0]
+
+
+    def mix(self, roll, pitch, yaw, throttle):
+        '''
+        Calculates the throttle of each motor of each multirotor. See Mixer.mix
+
+        @param roll: Array of roll corrections, one per multirotor
+        @param pitch: Array of pitch corrections, one per multirotor
+        @param yaw: Array of yaw corrections, one per multirotor
+        @param throttle: Throttle. Either a number or an array with one value per multirotor.
+        @return: Array of throttles with shape (multirotors, motors)
+        '''
+
+        matrix = self._matrix
+
+        corrections = numpy.outer(roll, matrix[:, Mixer.ROLL])
+        corrections += numpy.outer(pitch, matrix[:, Mixer.PITCH])
+        corrections += numpy.outer(yaw, matrix[:, Mixer.YAW])
+
+        low = corrections.min(axis=1)
+        high = corrections.max(axis=1)
+
+        throttleRange = self._maxThrottle - self._minThrottle
+        scale = throttleRange / numpy.maximum(high - low, throttleRange)
+        corrections *= scale[:, None]
+        low *= scale
+        high *= scale
+
+        throttle = numpy.minimum(throttle, self._maxThrottle - high)
+        throttle = numpy.maximum(throttle, self._minThrottle - low)
+
+        corrections += numpy.outer(throttle, matrix[:, Mixer.THROTTLE])
+
+        return corrections
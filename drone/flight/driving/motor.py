@@ -6,8 +6,8 @@ Created on 06/04/2015
 @author: david
 """
 import logging
-from os import system
-from os.path import exists
+from os.path import exists, join
+from subprocess import call
 
 from flight.driving.sysfs_writer import SysfsWriter
 
@@ -27,6 +27,8 @@ class Motor(object):
              {KEY_PWM_ID: 4, KEY_PIN_ID: "P9.16"},
              {KEY_PWM_ID: 3, KEY_PIN_ID: "P9.14"}]
     
+    PWM_SYSFS_ROOT = "/sys/class/pwm"
+    
     PERIOD = 20000000 #nanoseconds = 50Hz
     
     MIN_DUTY = 1000000 #nanoseconds    
@@ -37,11 +39,21 @@ class Motor(object):
     MAX_THROTTLE = 80.0 #percentage
 
 
-    def __init__(self, motorId):
+    @staticmethod
+    def getPinCount():
+        '''
+        @return: Number of motors which can be wired
+        '''
+
+        return len(Motor._pins)
+
+
+    def __init__(self, motorId, sysfsRoot=PWM_SYSFS_ROOT):
         """
         Constructor
         
         @param motorId: Identificator of the motor. A number between 0 to 3 (in case of quadcopter)  
+        @param sysfsRoot: Directory of the PWM sysfs interface
         """
         
         pinIndex = motorId
@@ -50,8 +62,12 @@ class Motor(object):
         
         self._motorId = motorId
         
+        self._sysfsRoot = sysfsRoot
+        self._pwmPath = join(sysfsRoot, "pwm{0}".format(self._pwmId))
+        
         self._throttle = 0.0
         self._duty = 0
+        self._sysfsWriter = None
         
     
     def start(self):
@@ -59,17 +75,20 @@ class Motor(object):
         Starts the motor up
         """
         
-        if not exists("/sys/class/pwm/pwm{0}".format(self._pwmId)):
-            system("config-pin {0} pwm".format(self._pinId))
-            #SysfsWriter.writeOnce("pwm", "/sys/devices/ocp.*/{0}_pinmux.*/state".format(self._pinId))
-            SysfsWriter.writeOnce(str(self._pwmId), "/sys/class/pwm/export")
+        if not exists(self._pwmPath):
+            try:
+                call(["config-pin", self._pinId, "pwm"])
+            except OSError as ex:
+                logging.warning("motor {0}: config-pin not available ({1})".format(self._motorId, ex))
+            SysfsWriter.writeOnce(self._pwmId, join(self._sysfsRoot, "export"))
         
-        SysfsWriter.writeOnce("0", "/sys/class/pwm/pwm{0}/duty_ns".format(self._pwmId))
-        SysfsWriter.writeOnce("0", "/sys/class/pwm/pwm{0}/run".format(self._pwmId))
-        SysfsWriter.writeOnce(str(Motor.PERIOD), "/sys/class/pwm/pwm{0}/period_ns".format(self._pwmId))
-        SysfsWriter.writeOnce("1", "/sys/class/pwm/pwm{0}/run".format(self._pwmId))
+        SysfsWriter.writeOnce(0, join(self._pwmPath, "duty_ns"))
+        SysfsWriter.writeOnce(0, join(self._pwmPath, "run"))
+        SysfsWriter.writeOnce(Motor.PERIOD, join(self._pwmPath, "period_ns"))
+        SysfsWriter.writeOnce(1, join(self._pwmPath, "run"))
         
-        self._sysfsWriter = SysfsWriter("/sys/class/pwm/pwm{0}/duty_ns".format(self._pwmId))
+        #The duty's attribute is kept open, since it is written within the control loop
+        self._sysfsWriter = SysfsWriter(join(self._pwmPath, "duty_ns"))
         
         logging.info("motor {0}: started".format(self._motorId))
         
@@ -88,7 +107,7 @@ class Motor(object):
             self._duty = int((Motor.RANGE_DUTY * self._throttle) + Motor.MIN_DUTY)
             #logging.debug("motor {0}: duty={1}; throttle={2}".format(self._motorId, self._duty, self._throttle))
         
-            self._sysfsWriter.write(str(self._duty))
+            self._sysfsWriter.write(self._duty)
 
         #else:
         #    logging.debug("motor {0}: duty={1}; throttle={2} (virtual)".format(self._motorId, self._duty, self._throttle))
@@ -119,7 +138,7 @@ class Motor(object):
         self._throttle = 100.0
         self._duty = Motor.MAX_DUTY
 
-        self._sysfsWriter.write(str(Motor.MAX_DUTY))
+        self._sysfsWriter.write(Motor.MAX_DUTY)
         
         
     def setMinThrottle(self):
@@ -132,7 +151,7 @@ class Motor(object):
         self._throttle = 0.0
         self._duty = Motor.MIN_DUTY
         
-        self._sysfsWriter.write(str(Motor.MIN_DUTY))
+        self._sysfsWriter.write(Motor.MIN_DUTY)
 
         
     def standBy(self):
@@ -154,7 +173,7 @@ class Motor(object):
         self._throttle = 0.0
         self._duty = 0
         
-        self._sysfsWriter.write("0")
+        self._sysfsWriter.write(0)
         
         
     def stop(self):
@@ -168,7 +187,7 @@ class Motor(object):
         self._duty = 0
         
         self._sysfsWriter.close()
-        SysfsWriter.writeOnce("0", "/sys/class/pwm/pwm{0}/run".format(self._pwmId))
+        SysfsWriter.writeOnce(0, join(self._pwmPath, "run"))
         
     
         
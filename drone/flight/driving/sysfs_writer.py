@@ -5,35 +5,98 @@ Created on 06/04/2015
 
 @author: david
 '''
-from os import system
+import os
 
 
 class SysfsWriter(object):
-    
+    '''
+    Writes values into a sysfs attribute through a file descriptor which is kept open.
+    Values are written as a single unbuffered syscall and only when they change.
+    '''
+
+    #Max. number of encoded values kept in memory
+    ENCODING_CACHE_SIZE = 4096
+
+    _encodings = {}
+
     @staticmethod
-    def writeOnce(text, path):
+    def _encode(value):
+
+        data = SysfsWriter._encodings.get(value)
+        if data == None:
+            if len(SysfsWriter._encodings) >= SysfsWriter.ENCODING_CACHE_SIZE:
+                SysfsWriter._encodings.clear()
+            data = str(value).encode("ascii")
+            SysfsWriter._encodings[value] = data
+
+        return data
+
+
+    @staticmethod
+    def writeOnce(value, path):
         '''
-        writer = SysfsWriter(path)
-        writer.write(text)
-        writer.close()
+        Opens the attribute, writes the value and closes it
+
+        @param value: Value to write
+        @param path: Path of the attribute
         '''
-        system("echo {0} > {1}".format(text, path))
+
+        fd = os.open(path, os.O_WRONLY | os.O_TRUNC)
+        try:
+            os.write(fd, SysfsWriter._encode(value))
+        finally:
+            os.close(fd)
+
 
     def __init__(self, path):
         '''
         Constructor
+
+        @param path: Path of the attribute
         '''
-        
-        self._file = open(path, "a")
-        
-        
-    def write(self, text):
-        
-        self._file.write(text)
-        self._file.flush()
-        
-        
+
+        self._fd = os.open(path, os.O_WRONLY)
+        self._lastValue = None
+
+
+    if hasattr(os, "pwrite"):
+
+        def _writeData(self, data):
+
+            os.pwrite(self._fd, data, 0)
+
+    else:
+
+        #Python 2 has no pwrite
+        def _writeData(self, data):
+
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, data)
+
+
+    def write(self, value):
+        '''
+        Writes a value, unless it is the same as the last one
+
+        @param value: Value to write. Numbers and strings are accepted.
+        '''
+
+        if value != self._lastValue:
+            self._writeData(SysfsWriter._encode(value))
+            self._lastValue = value
+
+
+    def invalidate(self):
+        '''
+        Forces writing the next value, even if it is not changed
+        '''
+
+        self._lastValue = None
+
+
     def close(self):
-        
-        self._file.close()
-        
+
+        if self._fd != None:
+            os.close(self._fd)
+            self._fd = None
+
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from array import array
+
+from flight.stabilization.control_loop import ControlLoop
+from flight.stabilization.scheduler import LoopStatistics
+
+
+class SensorAcquisition(ControlLoop):
+    '''
+    Reads the sensor on its own thread and publishes its state into a sample ring.
+
+    Sample layout: angle speeds (3), device angles (3), accels (3)
+    '''
+
+    ANGLE_SPEEDS = 0
+    ANGLES = 3
+    ACCELS = 6
+    SAMPLE_WIDTH = 9
+
+    def __init__(self, sensor, ring, period, clock, scheduler=None):
+        '''
+        Constructor
+
+        @param sensor: Sensor to read
+        @param ring: SampleRing whose width is SAMPLE_WIDTH
+        @param period: Acquisition period in seconds
+        @param clock: Function returning the current time. It must be the same clock used by the consumer.
+        @param scheduler: See ControlLoop
+        '''
+
+        ControlLoop.__init__(self, period, "sensor-acquisition", scheduler)
+
+        self._sensor = sensor
+        self._ring = ring
+        self._clock = clock
+
+
+    def _update(self, dt):
+
+        sensor = self._sensor
+
+        sensor.refreshState()
+        timestamp = self._clock()
+
+        self._ring.publishParts((sensor.readAngleSpeeds(), sensor.readDeviceAngles(), sensor.readAccels()), timestamp)
+
+
+class SampledSensor(object):
+    '''
+    Sensor facade for the control thread. The state is taken from the newest sample of the ring
+    instead of reading the device, and the latency of each sample is recorded.
+
+    The readings are returned within preallocated lists, which are refreshed on each refreshState.
+    '''
+
+    def __init__(self, ring, clock, period):
+        '''
+        Constructor
+
+        @param ring: SampleRing fed by a SensorAcquisition
+        @param clock: Function returning the current time. It must be the same clock used by the producer.
+        @param period: Expected period of the samples, for statistics purposes
+        '''
+
+        self._ring = ring
+        self._clock = clock
+        self._sample = array("d", [0.0]) * SensorAcquisition.SAMPLE_WIDTH
+
+        self._angleSpeeds = [0.0] * 3
+        self._deviceAngles = [0.0] * 3
+        self._accels = [0.0] * 3
+        self._fields = [(self._angleSpeeds, SensorAcquisition.ANGLE_SPEEDS), \
+                        (self._deviceAngles, SensorAcquisition.ANGLES), \
+                        (self._accels, SensorAcquisition.ACCELS)]
+
+        self._lastSequence = 0
+        self._missedSamples = 0
+        self._latencyStatistics = LoopStatistics(period, label="Latency")
+
+
+    def refreshState(self):
+
+        sequence, timestamp = self._ring.readLatest(self._sample)
+
+        if sequence != 0:
+
+            #A sample is considered missed when it was published but never consumed
+            if self._lastSequence != 0 and sequence - self._lastSequence > 1:
+                self._missedSamples += sequence - self._lastSequence - 1
+            self._lastSequence = sequence
+
+            sample = self._sample
+            for field, offset in self._fields:
+                field[0] = sample[offset]
+                field[1] = sample[offset + 1]
+                field[2] = sample[offset + 2]
+
+            self._latencyStatistics.add(self._clock() - timestamp, False)
+
+
+    def readAngleSpeeds(self):
+
+        return self._angleSpeeds
+
+
+    def readDeviceAngles(self):
+
+        return self._deviceAngles
+
+
+    def readAccels(self):
+
+        return self._accels
+
+
+    def getLatencyStatistics(self):
+
+        return self._latencyStatistics
+
+
+    def getMissedSamples(self):
+
+        return self._missedSamples
+
+
+    def reset(self):
+
+        self._lastSequence = self._ring.getSequence()
+        self._missedSamples = 0
+        self._latencyStatistics.reset()
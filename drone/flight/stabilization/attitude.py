@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from math import asin, atan2, cos, degrees, radians, sin, sqrt
+
+
+class AttitudeEstimator(object):
+    '''
+    Quaternion-based attitude estimation from gyro and accelerometer samples.
+
+    It should be updated at the sensor's rate (see SensorAcquisition), which doesn't need to be the PID's rate.
+    The quaternion rotates from the sensor's frame to the world's frame. Angles are degrees [x, y, z], applied on X,
+    then Y, then Z, as Vector.rotateVector3D does.
+
+    All state is kept in preallocated floats. The output lists are reused on each update, hence the caller must
+    copy them if they are kept between updates.
+    '''
+
+    MAHONY = "mahony"
+    MADGWICK = "madgwick"
+
+    @staticmethod
+    def create(name):
+        '''
+        @param name: See AttitudeEstimator.MAHONY and AttitudeEstimator.MADGWICK
+        @return: Estimator or None if the name is unknown (i.e. the complementary filter is used)
+        '''
+
+        if name == AttitudeEstimator.MAHONY:
+            estimator = MahonyEstimator()
+        elif name == AttitudeEstimator.MADGWICK:
+            estimator = MadgwickEstimator()
+        else:
+            estimator = None
+
+        return estimator
+
+
+    def __init__(self):
+
+        self._q0 = 1.0
+        self._q1 = 0.0
+        self._q2 = 0.0
+        self._q3 = 0.0
+
+        self._gravity = 0.0
+
+        self._angles = [0.0] * 3
+        self._angleSpeeds = [0.0] * 3
+        self._accels = [0.0] * 3
+
+
+    def reset(self, angles=None):
+        '''
+        Sets the attitude
+
+        @param angles: Angles as degrees [x, y, z]. By default, level.
+        '''
+
+        halfX = radians(angles[0]) / 2.0 if angles != None else 0.0
+        halfY = radians(angles[1]) / 2.0 if angles != None else 0.0
+        halfZ = radians(angles[2]) / 2.0 if angles != None and len(angles) > 2 else 0.0
+
+        cosx = cos(halfX)
+        sinx = sin(halfX)
+        cosy = cos(halfY)
+        siny = sin(halfY)
+        cosz = cos(halfZ)
+        sinz = sin(halfZ)
+
+        self._q0 = cosz * cosy * cosx + sinz * siny * sinx
+        self._q1 = cosz * cosy * sinx - sinz * siny * cosx
+        self._q2 = cosz * siny * cosx + sinz * cosy * sinx
+        self._q3 = sinz * cosy * cosx - cosz * siny * sinx
+
+        self._resetFeedback()
+        self._updateAngles()
+
+
+    def _resetFeedback(self):
+        pass
+
+
+    def setGravity(self, gravity):
+        '''
+        @param gravity: Gravity as measured by the accelerometer at rest, in the same units as the accelerations
+        '''
+
+        self._gravity = gravity
+
+
+    def update(self, angleSpeeds, accels, dt):
+        '''
+        Integrates a sample
+
+        @param angleSpeeds: Gyro readings as degrees/s
+        @param accels: Accelerometer readings. Any unit, only their direction is used for the attitude.
+        @param dt: Time since the previous sample in seconds
+        '''
+
+        if dt > 0.0:
+            self._updateQuaternion(radians(angleSpeeds[0]), radians(angleSpeeds[1]), radians(angleSpeeds[2]), \
+                                   accels[0], accels[1], accels[2], dt)
+
+        self._updateAngles()
+        self._updateAccels(accels)
+
+
+    def _updateQuaternion(self, gx, gy, gz, ax, ay, az, dt):
+        '''
+        @param gx, gy, gz: Angle speeds as radians/s
+        @param ax, ay, az: Accelerations
+        @param dt: Time since the previous sample in seconds
+        '''
+
+        raise NotImplementedError()
+
+
+    def _integrate(self, qDot0, qDot1, qDot2, qDot3, dt):
+        '''
+        Integrates the quaternion's derivative and normalizes the result
+        '''
+
+        q0 = self._q0 + qDot0 * dt
+        q1 = self._q1 + qDot1 * dt
+        q2 = self._q2 + qDot2 * dt
+        q3 = self._q3 + qDot3 * dt
+
+        norm = sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        if norm > 0.0:
+            self._q0 = q0 / norm
+            self._q1 = q1 / norm
+            self._q2 = q2 / norm
+            self._q3 = q3 / norm
+
+
+    def _updateAngles(self):
+
+        q0 = self._q0
+        q1 = self._q1
+        q2 = self._q2
+        q3 = self._q3
+
+        #Rounding errors might lead out of the domain of asin at ±90º
+        sinY = 2.0 * (q0 * q2 - q3 * q1)
+        sinY = 1.0 if sinY > 1.0 else -1.0 if sinY < -1.0 else sinY
+
+        angles = self._angles
+        angles[0] = degrees(atan2(2.0 * (q0 * q1 + q2 * q3), 1.0 - 2.0 * (q1 * q1 + q2 * q2)))
+        angles[1] = degrees(asin(sinY))
+        angles[2] = degrees(atan2(2.0 * (q0 * q3 + q1 * q2), 1.0 - 2.0 * (q2 * q2 + q3 * q3)))
+
+
+    def _updateAccels(self, accels):
+        '''
+        Rotates the accelerations to the world's frame and removes the gravity
+        '''
+
+        q0 = self._q0
+        q1 = self._q1
+        q2 = self._q2
+        q3 = self._q3
+        ax, ay, az = accels
+
+        #v' = v + 2w(q × v) + 2q × (q × v)
+        tx = 2.0 * (q2 * az - q3 * ay)
+        ty = 2.0 * (q3 * ax - q1 * az)
+        tz = 2.0 * (q1 * ay - q2 * ax)
+
+        worldAccels = self._accels
+        worldAccels[0] = ax + q0 * tx + q2 * tz - q3 * ty
+        worldAccels[1] = ay + q0 * ty + q3 * tx - q1 * tz
+        worldAccels[2] = az + q0 * tz + q1 * ty - q2 * tx - self._gravity
+
+
+    def getQuaternion(self):
+        '''
+        @return: Tuple (w, x, y, z)
+        '''
+
+        return (self._q0, self._q1, self._q2, self._q3)
+
+
+    def getAngles(self):
+        '''
+        @return: Angles as degrees [x, y, z]
+        '''
+
+        return self._angles
+
+
+    def getAngleSpeeds(self):
+        '''
+        @return: Angle speeds as degrees/s, corrected by the estimator if it is able to
+        '''
+
+        return self._angleSpeeds
+
+
+    def getAccels(self):
+        '''
+        @return: Accelerations within the world's frame without the gravity
+        '''
+
+        return self._accels
+
+
+class MahonyEstimator(AttitudeEstimator):
+    '''
+    Mahony's complementary filter on SO(3): the error between the measured and the estimated gravity directions
+    is fed back to the gyro through a PI controller. The integral term estimates the gyro's bias.
+    '''
+
+    KP = 1.0
+    #Critically damped with KP
+    KI = 0.25
+
+    def __init__(self, kp=KP, ki=KI):
+        '''
+        Constructor
+
+        @param kp: Proportional gain of the feedback
+        @param ki: Integral gain of the feedback
+        '''
+
+        AttitudeEstimator.__init__(self)
+
+        self._kp = kp
+        self._ki = ki
+
+        self._integralX = 0.0
+        self._integralY = 0.0
+        self._integralZ = 0.0
+
+
+    def _resetFeedback(self):
+
+        self._integralX = 0.0
+        self._integralY = 0.0
+        self._integralZ = 0.0
+
+
+    def getBias(self):
+        '''
+        @return: Estimated gyro's bias as degrees/s
+        '''
+
+        return [-degrees(self._integralX), -degrees(self._integralY), -degrees(self._integralZ)]
+
+
+    def _updateQuaternion(self, gx, gy, gz, ax, ay, az, dt):
+
+        q0 = self._q0
+        q1 = self._q1
+        q2 = self._q2
+        q3 = self._q3
+
+        norm = sqrt(ax * ax + ay * ay + az * az)
+        if norm > 0.0:
+
+            ax /= norm
+            ay /= norm
+            az /= norm
+
+            #Estimated direction of the gravity within the sensor's frame
+            vx = 2.0 * (q1 * q3 - q0 * q2)
+            vy = 2.0 * (q0 * q1 + q2 * q3)
+            vz = q0 * q0 - q1 * q1 - q2 * q2 + q3 * q3
+
+            #Error is the cross product between the measured and estimated directions
+            ex = ay * vz - az * vy
+            ey = az * vx - ax * vz
+            ez = ax * vy - ay * vx
+
+            if self._ki > 0.0:
+                self._integralX += self._ki * ex * dt
+                self._integralY += self._ki * ey * dt
+                self._integralZ += self._ki * ez * dt
+
+            gx += self._kp * ex
+            gy += self._kp * ey
+            gz += self._kp * ez
+
+        gx += self._integralX
+        gy += self._integralY
+        gz += self._integralZ
+
+        angleSpeeds = self._angleSpeeds
+        angleSpeeds[0] = degrees(gx)
+        angleSpeeds[1] = degrees(gy)
+        angleSpeeds[2] = degrees(gz)
+
+        self._integrate(0.5 * (-q1 * gx - q2 * gy - q3 * gz), \
+                        0.5 * (q0 * gx + q2 * gz - q3 * gy), \
+                        0.5 * (q0 * gy - q1 * gz + q3 * gx), \
+                        0.5 * (q0 * gz + q1 * gy - q2 * gx), dt)
+
+
+class MadgwickEstimator(AttitudeEstimator):
+    '''
+    Madgwick's gradient-descent filter: the gyro's integration is corrected by a step along the gradient
+    of the error between the measured and the estimated gravity directions.
+    '''
+
+    BETA = 0.1
+
+    def __init__(self, beta=BETA):
+        '''
+        Constructor
+
+        @param beta: Gain of the gradient-descent step (radians/s)
+        '''
+
+        AttitudeEstimator.__init__(self)
+
+        self._beta = beta
+
+
+    def _updateQuaternion(self, gx, gy, gz, ax, ay, az, dt):
+
+        q0 = self._q0
+        q1 = self._q1
+        q2 = self._q2
+        q3 = self._q3
+
+        angleSpeeds = self._angleSpeeds
+        angleSpeeds[0] = degrees(gx)
+        angleSpeeds[1] = degrees(gy)
+        angleSpeeds[2] = degrees(gz)
+
+        #Rate of change of the quaternion from the gyro
+        qDot0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+        qDot1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+        qDot2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+        qDot3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+
+        norm = sqrt(ax * ax + ay * ay + az * az)
+        if norm > 0.0:
+
+            ax /= norm
+            ay /= norm
+            az /= norm
+
+            q0q0 = q0 * q0
+            q1q1 = q1 * q1
+            q2q2 = q2 * q2
+            q3q3 = q3 * q3
+
+            #Gradient of the objective function
+            s0 = 4.0 * q0 * q2q2 + 2.0 * q2 * ax + 4.0 * q0 * q1q1 - 2.0 * q1 * ay
+            s1 = 4.0 * q1 * q3q3 - 2.0 * q3 * ax + 4.0 * q0q0 * q1 - 2.0 * q0 * ay - 4.0 * q1 \
+                + 8.0 * q1 * q1q1 + 8.0 * q1 * q2q2 + 4.0 * q1 * az
+            s2 = 4.0 * q0q0 * q2 + 2.0 * q0 * ax + 4.0 * q2 * q3q3 - 2.0 * q3 * ay - 4.0 * q2 \
+                + 8.0 * q2 * q1q1 + 8.0 * q2 * q2q2 + 4.0 * q2 * az
+            s3 = 4.0 * q1q1 * q3 - 2.0 * q1 * ax + 4.0 * q2q2 * q3 - 2.0 * q2 * ay
+
+            sNorm = sqrt(s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3)
+            if sNorm > 0.0:
+                step = self._beta / sNorm
+                qDot0 -= step * s0
+                qDot1 -= step * s1
+                qDot2 -= step * s2
+                qDot3 -= step * s3
+
+        self._integrate(qDot0, qDot1, qDot2, qDot3, dt)
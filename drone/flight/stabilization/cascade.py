@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from flight.stabilization.control_loop import ControlLoop
+from flight.stabilization.pid_engine import PidEngine
+
+
+class ControlStage(object):
+    '''
+    Node of a controller graph. Each stage is a multi-axis PID which runs once every "divider" ticks of the graph.
+    '''
+
+    def __init__(self, name, kp, ki, kd, readInputDelegate, setOutputDelegate=None, divider=1, \
+                 integralLimits=None, derivativeOnMeasurement=False, derivativeFilter=1.0):
+        '''
+        Constructor
+
+        @param name: Name of the stage
+        @param kp: Proportional constants, one per axis
+        @param ki: Integral constants, one per axis
+        @param kd: Derivative constants, one per axis
+        @param readInputDelegate: Function returning the current values of the axes
+        @param setOutputDelegate: Function receiving the output of the stage. It can be None if the stage
+            only feeds other stages.
+        @param divider: The stage runs once every this number of ticks of the graph
+        @param integralLimits: See PidEngine.create
+        @param derivativeOnMeasurement: See PidEngine.create
+        @param derivativeFilter: See PidEngine.create
+        '''
+
+        self._name = name
+        self._engine = PidEngine.create(kp, ki, kd, integralLimits, derivativeOnMeasurement, derivativeFilter)
+
+        self._readInput = readInputDelegate
+        self._setOutput = setOutputDelegate
+
+        self._divider = max(1, int(divider))
+        self._tickCount = 0
+        self._elapsedTime = 0.0
+
+        self._isEnabled = True
+        self._links = []
+
+
+    def getName(self):
+
+        return self._name
+
+
+    def getDivider(self):
+
+        return self._divider
+
+
+    def link(self, targetStage, mapping):
+        '''
+        Feeds the targets of another stage with the output of this stage
+
+        @param targetStage: Stage whose targets will be set
+        @param mapping: List of pairs (output index of this stage, target index of the other stage)
+        '''
+
+        self._links.append((targetStage, tuple(mapping)))
+
+
+    def unlink(self, targetStage):
+
+        self._links = [link for link in self._links if link[0] != targetStage]
+
+
+    def getLinkedStages(self):
+
+        return [targetStage for targetStage, _ in self._links]
+
+
+    def setEnabled(self, enabled):
+        '''
+        A disabled stage neither calculates nor feeds its linked stages
+        '''
+
+        if enabled and not self._isEnabled:
+            self.reset()
+
+        self._isEnabled = enabled
+
+
+    def isEnabled(self):
+
+        return self._isEnabled
+
+
+    def reset(self):
+
+        self._engine.reset()
+        self._tickCount = 0
+        self._elapsedTime = 0.0
+
+
+    def setConstants(self, index, kp, ki, kd):
+
+        self._engine.setConstants(index, kp, ki, kd)
+
+
+    def setTarget(self, target, index):
+
+        self._engine.setTarget(target, index)
+
+
+    def setTargets(self, targets):
+
+        self._engine.setTargets(targets)
+
+
+    def getTargets(self):
+
+        return self._engine.getTargets()
+
+
+    def tick(self, dt):
+        '''
+        Advances the stage a tick of the graph. The stage calculates only when its divider is reached.
+
+        @param dt: Elapsed time in seconds since the previous tick of the graph
+        '''
+
+        if self._isEnabled:
+
+            self._elapsedTime += dt
+            self._tickCount += 1
+
+            if self._tickCount == self._divider:
+
+                outputs = self._engine.calculate(self._readInput(), self._elapsedTime)
+                self._tickCount = 0
+                self._elapsedTime = 0.0
+
+                for targetStage, mapping in self._links:
+                    for outputIndex, targetIndex in mapping:
+                        targetStage.setTarget(outputs[outputIndex], targetIndex)
+
+                if self._setOutput != None:
+                    self._setOutput(outputs)
+
+
+class ControllerGraph(ControlLoop):
+    '''
+    Cascaded controller made of stages. Stages which feed others are always evaluated before them
+    within the same tick, hence an outer loop's output is used by the inner loop immediately.
+    '''
+
+    def __init__(self, period, refreshInputDelegate=None, commitOutputDelegate=None, pidName="", scheduler=None):
+        '''
+        Constructor
+
+        @param period: Period in seconds of the fastest stage (divider 1)
+        @param refreshInputDelegate: Function called at the beginning of each tick, before any stage reads its input
+        @param commitOutputDelegate: Function called at the end of each tick, after all stages set their output
+        @param pidName: Name of the loop for logging purposes
+        @param scheduler: See ControlLoop
+        '''
+
+        ControlLoop.__init__(self, period, pidName, scheduler)
+
+        self._refreshInput = refreshInputDelegate
+        self._commitOutput = commitOutputDelegate
+
+        self._stages = []
+        self._evaluationOrder = []
+
+
+    def addStage(self, stage):
+
+        self._stages.append(stage)
+        self._sortStages()
+
+        return self
+
+
+    def connect(self, sourceStage, targetStage, mapping):
+        '''
+        Feeds the targets of a stage with the output of another one
+
+        @param sourceStage: Outer stage
+        @param targetStage: Inner stage
+        @param mapping: List of pairs (output index of the source, target index of the target)
+        '''
+
+        sourceStage.link(targetStage, mapping)
+        try:
+            self._sortStages()
+        except Exception:
+            sourceStage.unlink(targetStage)
+            raise
+
+        return self
+
+
+    def getStages(self):
+
+        return self._stages
+
+
+    def _sortStages(self):
+
+        #Topological order: a stage goes after every stage feeding it
+        order = []
+        visited = set()
+
+        def visit(stage, path):
+
+            if stage in path:
+                raise Exception("Controller graph contains a cycle at stage \"{0}\"".format(stage.getName()))
+
+            if stage not in visited:
+                path.add(stage)
+                for source in self._stages:
+                    if stage in source.getLinkedStages():
+                        visit(source, path)
+                path.remove(stage)
+                visited.add(stage)
+                order.append(stage)
+
+        for stage in self._stages:
+            visit(stage, set())
+
+        self._evaluationOrder = order
+
+
+    def _update(self, dt):
+
+        if self._refreshInput != None:
+            self._refreshInput()
+
+        for stage in self._evaluationOrder:
+            stage.tick(dt)
+
+        if self._commitOutput != None:
+            self._commitOutput()
+
+
+    def _reset(self):
+
+        for stage in self._stages:
+            stage.reset()
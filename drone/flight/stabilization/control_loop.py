@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import logging
+from threading import Thread
+
+from flight.stabilization.scheduler import SleepScheduler
+
+
+class ControlLoop(object):
+    '''
+    Periodic control loop running on its own thread, or stepped by the caller if the scheduler is not threaded.
+    Subclasses implement the calculation of each iteration within the _update method.
+    '''
+    
+    #Period range to be considered as correct loop rate
+    PERIOD_RANGE_MARGIN = 0.1
+    
+    def __init__(self, period, pidName = "", scheduler = None):
+        '''
+        Constructor
+        
+        @param period: Loop period in seconds
+        @param pidName: Name of the loop for logging purposes
+        @param scheduler: Object which paces the loop. See flight.stabilization.scheduler.
+            If it is not provided, the loop will be paced by sleeping the remaining time of each period.
+        '''
+        
+        self._pidName = pidName
+        
+        self._period = period        
+        self._minPeriod = period * (1.0 - ControlLoop.PERIOD_RANGE_MARGIN)
+        self._maxPeriod = period * (1.0 + ControlLoop.PERIOD_RANGE_MARGIN)
+        
+        self._scheduler = scheduler if scheduler != None else SleepScheduler(period)
+        
+        self._lastTime = self._scheduler.now()
+        self._currentPeriod = period
+        
+        self._isRunning = False
+        self._thread = None
+        
+        self._deltaTimeSum = 0.0
+        self._iterationCount = 0
+        
+        
+    def _update(self, dt):
+        '''
+        Performs the calculation of an iteration
+        
+        @param dt: Elapsed time in seconds since the previous iteration
+        '''
+        
+        raise NotImplementedError()
+    
+    
+    def _reset(self):
+        '''
+        Resets the calculation state before the loop starts
+        '''
+        
+        pass
+    
+    
+    def _calculate(self):
+        
+        currentTime = self._scheduler.now()
+        dt = currentTime - self._lastTime
+        self._lastTime = currentTime
+        
+        self._update(dt)
+        
+        self._currentPeriod = dt
+        self._deltaTimeSum += dt
+        self._iterationCount += 1
+        
+    
+    def getCurrentPeriod(self):
+        
+        return self._currentPeriod
+    
+    
+    def getScheduler(self):
+        
+        return self._scheduler
+    
+    
+    def _do(self): 
+        
+        iterCount = 0        
+        underFreq = 0
+        overFreq = 0
+        rightFreq = 0
+        acceptableFreq = 0
+        
+        minFreq = 1.0/self._maxPeriod
+        message = "Minimal freq. is {0:.3f}Hz.".format(minFreq)
+        print(message)
+        logging.info(message)
+        
+        self._lastTime = self._scheduler.now()
+        self._scheduler.start()
+        while self._isRunning:
+        
+            self._calculate()
+            
+            iterCount += 1
+                 
+            if self._currentPeriod < self._minPeriod:
+                overFreq += 1
+            elif self._currentPeriod >= self._minPeriod and self._currentPeriod <= self._period:
+                rightFreq += 1
+            elif self._currentPeriod > self._period and self._currentPeriod <= self._maxPeriod:
+                acceptableFreq += 1
+            else:
+                underFreq += 1
+
+            self._scheduler.waitNext()
+
+        self._scheduler.stop()
+        
+        if iterCount != 0:
+            underFreqPerc = underFreq * 100.0 / iterCount
+            overFreqPerc = overFreq * 100.0 / iterCount
+            rightFreqPerc = rightFreq * 100.0 / iterCount
+            acceptableFreqPerc = acceptableFreq * 100.0 / iterCount       
+            message = "In freq: {0:.3f}%; Acceptable: {1:.3f}%; Under f.: {2:.3f}%; Over f.: {3:.3f}%"\
+                .format(rightFreqPerc, acceptableFreqPerc, underFreqPerc, overFreqPerc)
+            logging.info(message)
+            print(message)
+        
+        message = "PID-\"{0}\" {1}".format(self._pidName, self._scheduler.getStatistics())
+        logging.info(message)
+        print(message)
+        
+    
+    def step(self):
+        '''
+        Runs a single iteration within the calling thread. The scheduler is advanced even if the loop is stopped.
+        It is only allowed with non-threaded schedulers (i.e. lockstep simulation).
+        '''
+        
+        if self._isRunning:
+            self._calculate()
+            
+        self._scheduler.waitNext()
+        
+    
+    def start(self):
+        
+        if not self._scheduler.isThreaded():
+            
+            if not self._isRunning:
+                
+                self._deltaTimeSum = 0.0
+                self._iterationCount = 0
+                
+                self._reset()
+                
+                self._isRunning = True
+                self._lastTime = self._scheduler.now()
+                self._scheduler.start()
+        
+        elif self._thread == None or not self._thread.is_alive():
+            
+            logging.info("Starting PID-\"{0}\"".format(self._pidName))
+
+            self._deltaTimeSum = 0.0
+            self._iterationCount = 0
+            
+            self._reset()
+            
+            self._isRunning = True
+            self._thread = Thread(target=self._do)
+            self._thread.start()
+            
+        
+    def stop(self):
+        
+        self._isRunning = False        
+        if self._thread != None and self._thread.is_alive():
+            
+            self._thread.join()
+            
+            if self._iterationCount != 0 and self._deltaTimeSum:
+                
+                averageDeltaTime = self._deltaTimeSum * 1000.0/ self._iterationCount
+                averageFrequency = self._iterationCount / self._deltaTimeSum
+                
+            else:
+                
+                averageDeltaTime = 0.0
+                averageFrequency = float("inf")
+                
+            message = "PID-\"{0}\" - Avg. time: {1:.3f}ms - Avg. freq: {2:.3f}Hz".format(self._pidName, averageDeltaTime, averageFrequency)
+            print(message)
+            logging.info(message)
+                
+    
+    def isRunning(self):
+        
+        return self._isRunning
@@ -4,6 +4,10 @@ Created on 20/04/2015
 @author: david
 '''
 
+from array import array
+from bisect import bisect_left, insort
+
+
 class DataSmoothWindow(object):
     
     def __init__(self, size):
@@ -58,5 +62,218 @@ class DataSmoothWindow(object):
         
     def average(self):
         
-        return self._sum / self._count
+        return self._sum / self._count if self._count != 0 else 0.0
+
+
+class DataStatisticsWindow(object):
+    '''
+    Sliding window of multi-channel samples (i.e. the 3 axes of the gyro or the accelerometer).
+
+    A whole sample is pushed at once. The mean and the variance of each channel are kept by Welford's
+    algorithm, updated as values get in and out the window, and each channel keeps its values sorted
+    for the median. Values are stored in preallocated arrays. The output lists are reused, hence the
+    caller must copy them if they are kept between pushes.
+    '''
+    
+    def __init__(self, channels, size):
+        '''
+        Constructor
+        
+        @param channels: Number of values of each sample
+        @param size: Maximum number of samples within the window
+        '''
+        
+        self._channels = channels
+        self._size = size
+        self._indexes = range(channels)
+        
+        self._data = array("d", [0.0]) * (channels * size)
+        self._sorted = [array("d") for _ in self._indexes]
+        
+        self._means = [0.0] * channels
+        self._squares = [0.0] * channels
+        
+        self._variances = [0.0] * channels
+        self._medians = [0.0] * channels
+        self._filtered = [0.0] * channels
+        
+        self.reset()
+        
+    
+    def reset(self):
+        
+        self._writeIndex = 0
+        self._readIndex = 0
+        self._count = 0
+        
+        for channel in self._indexes:
+            self._means[channel] = 0.0
+            self._squares[channel] = 0.0
+            del self._sorted[channel][:]
+        
     
+    def push(self, sample):
+        '''
+        Adds a sample. If the window is full, the oldest one is dropped.
+        
+        @param sample: One value for each channel
+        '''
+        
+        data = self._data
+        means = self._means
+        squares = self._squares
+        writeOffset = self._writeIndex * self._channels
+        
+        if self._count == self._size:
+            
+            #The oldest value is replaced by the new one
+            for channel in self._indexes:
+                
+                value = sample[channel]
+                oldValue = data[writeOffset + channel]
+                oldMean = means[channel]
+                mean = oldMean + (value - oldValue) / self._count
+                
+                means[channel] = mean
+                squares[channel] += (value - oldValue) * (value - mean + oldValue - oldMean)
+                data[writeOffset + channel] = value
+                
+                values = self._sorted[channel]
+                del values[bisect_left(values, oldValue)]
+                insort(values, value)
+            
+            self._readIndex = (self._readIndex + 1) % self._size
+            
+        else:
+            
+            self._count += 1
+            for channel in self._indexes:
+                
+                value = sample[channel]
+                delta = value - means[channel]
+                means[channel] += delta / self._count
+                squares[channel] += delta * (value - means[channel])
+                data[writeOffset + channel] = value
+                
+                insort(self._sorted[channel], value)
+        
+        self._writeIndex = (self._writeIndex + 1) % self._size
+        
+    
+    def pop(self):
+        '''
+        Removes the oldest sample
+        
+        @return: The oldest sample or None if the window is empty
+        '''
+        
+        if self._count != 0:
+            
+            readOffset = self._readIndex * self._channels
+            sample = list(self._data[readOffset:readOffset + self._channels])
+            
+            self._readIndex = (self._readIndex + 1) % self._size
+            self._count -= 1
+            
+            for channel in self._indexes:
+                
+                value = sample[channel]
+                if self._count != 0:
+                    oldMean = self._means[channel]
+                    mean = oldMean + (oldMean - value) / self._count
+                    self._means[channel] = mean
+                    self._squares[channel] -= (value - oldMean) * (value - mean)
+                else:
+                    self._means[channel] = 0.0
+                    self._squares[channel] = 0.0
+                
+                values = self._sorted[channel]
+                del values[bisect_left(values, value)]
+            
+        else:
+            sample = None
+            
+        return sample
+    
+    
+    def count(self):
+        
+        return self._count
+    
+    
+    def getSize(self):
+        
+        return self._size
+    
+    
+    def getChannels(self):
+        
+        return self._channels
+    
+    
+    def getMeans(self):
+        '''
+        @return: Mean of each channel. Zeros if the window is empty.
+        '''
+        
+        return self._means
+    
+    
+    def getVariances(self):
+        '''
+        @return: Population variance of each channel
+        '''
+        
+        for channel in self._indexes:
+            #Rounding errors might lead to tiny negative values
+            variance = self._squares[channel] / self._count if self._count != 0 else 0.0
+            self._variances[channel] = variance if variance > 0.0 else 0.0
+        
+        return self._variances
+    
+    
+    def getMedians(self):
+        '''
+        @return: Median of each channel. Zeros if the window is empty.
+        '''
+        
+        half = self._count // 2
+        for channel in self._indexes:
+            
+            values = self._sorted[channel]
+            if self._count == 0:
+                median = 0.0
+            elif self._count % 2 == 1:
+                median = values[half]
+            else:
+                median = (values[half - 1] + values[half]) / 2.0
+            
+            self._medians[channel] = median
+        
+        return self._medians
+    
+    
+    def rejectSpikes(self, sample, deviations):
+        '''
+        Replaces the values too far from the window's median. The sample isn't pushed.
+        
+        @param sample: One value for each channel
+        @param deviations: Maximum distance to the median as number of standard deviations
+        @return: The sample with the median instead of each spike
+        '''
+        
+        medians = self.getMedians()
+        variances = self.getVariances()
+        filtered = self._filtered
+        limitFactor = deviations * deviations
+        
+        for channel in self._indexes:
+            
+            value = sample[channel]
+            distance = value - medians[channel]
+            if self._count > 1 and distance * distance > limitFactor * variances[channel]:
+                filtered[channel] = medians[channel]
+            else:
+                filtered[channel] = value
+        
+        return filtered
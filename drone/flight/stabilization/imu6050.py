@@ -42,9 +42,12 @@ class Imu6050(I2CSensor):
     #CALIBRATION_FILE_PATH = "../calibration.config.json"
     
 
-    def __init__(self):
+    def __init__(self, estimator=None):
         '''
         Constructor
+        
+        @param estimator: Attitude estimator (see flight.stabilization.attitude). If None, the angles are calculated
+            by the complementary filter.
         '''
         
         self._setAddress(Imu6050.ADDRESS)
@@ -66,6 +69,8 @@ class Imu6050(I2CSensor):
         self._angSpeed = [0.0]*2
         self._localGravity = 0.0
         
+        self._estimator = estimator
+        
         self._state = SensorState()
     
     
@@ -210,6 +215,20 @@ class Imu6050(I2CSensor):
         self._state.accels = accels
     
     
+    def _estimate(self):
+        
+        accels = [self._readRawAccelX() * Imu6050.ACCEL2MS2, \
+                  self._readRawAccelY() * Imu6050.ACCEL2MS2, \
+                  self._readRawAccelZ() * Imu6050.ACCEL2MS2]
+        
+        currentTime = time.time()
+        self._estimator.update(self._state.angleSpeeds, accels, currentTime - self._gyroReadTime)
+        self._gyroReadTime = currentTime
+        
+        self._state.angles = list(self._estimator.getAngles())
+        self._state.accels = list(self._estimator.getAccels())
+    
+    
     def readQuaternions(self):
         #TODO
         pass
@@ -223,8 +242,11 @@ class Imu6050(I2CSensor):
     def refreshState(self):
         
         self._readAngleSpeeds()
-        self._readAngles()
-        self._readAccels()
+        if self._estimator != None:
+            self._estimate()
+        else:
+            self._readAngles()
+            self._readAccels()
         
     
     def start(self):
@@ -301,6 +323,10 @@ class Imu6050(I2CSensor):
         angles = [math.radians(angle) for angle in self._accAnglesOffset]
         accels = [accel * Imu6050.ACCEL2MS2 for accel in self._accOffset]       
         self._localGravity = Vector.rotateVector3D(accels, angles + [0.0])[2]
+        
+        if self._estimator != None:
+            self._estimator.reset(self._accAnglesOffset + [0.0])
+            self._estimator.setGravity(self._localGravity)
     
     
     def getMaxErrorZ(self):
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from flight.stabilization.scheduler import LoopStatistics, monotonic
+
+
+class KalmanFilter(object):
+    '''
+    Linear Kalman filter of fixed size.
+
+    The transition, control and process-noise terms are constant, hence they are given once and the non-zero
+    terms of the transition are precomputed. All buffers are preallocated, so predicting and updating neither
+    allocate nor invert matrices: measurements are scalar, and several measurements are fused as sequential
+    scalar updates (which is equivalent when their noises are independent).
+    '''
+
+    def __init__(self, transition, processNoise, control=None, covariance=None):
+        '''
+        Constructor
+
+        @param transition: State transition matrix (F) as rows
+        @param processNoise: Process-noise covariance matrix (Q) as rows
+        @param control: Control vector (B) of a scalar input. By default, the filter has no input.
+        @param covariance: Initial covariance matrix (P) as rows. By default, the identity.
+        '''
+
+        size = len(transition)
+        self._size = size
+        self._indexes = range(size)
+
+        #Non-zero terms of each row of the transition
+        self._transition = [[(column, value) for column, value in enumerate(row) if value != 0.0] \
+                            for row in transition]
+        self._processNoise = [list(row) for row in processNoise]
+        self._control = list(control) if control != None else None
+
+        self._state = [0.0] * size
+        self._covariance = [[0.0] * size for _ in self._indexes]
+        self._initialCovariance = [list(row) for row in covariance] if covariance != None \
+            else [[1.0 if row == column else 0.0 for column in self._indexes] for row in self._indexes]
+
+        #Buffers of the intermediate results
+        self._predictedState = [0.0] * size
+        self._product = [[0.0] * size for _ in self._indexes]
+        self._gain = [0.0] * size
+        self._projection = [0.0] * size
+
+        self.reset()
+
+
+    def reset(self, state=None):
+        '''
+        Restores the initial covariance
+
+        @param state: Initial state. By default, zeros.
+        '''
+
+        for row in self._indexes:
+            self._state[row] = state[row] if state != None else 0.0
+            self._covariance[row][:] = self._initialCovariance[row]
+
+
+    def predict(self, controlInput=0.0):
+        '''
+        Advances the state one step
+
+        @param controlInput: Scalar input of the control vector
+        '''
+
+        indexes = self._indexes
+        transition = self._transition
+        state = self._state
+        predictedState = self._predictedState
+        covariance = self._covariance
+        product = self._product
+
+        #x = F·x + B·u
+        for row in indexes:
+            value = 0.0
+            for column, factor in transition[row]:
+                value += factor * state[column]
+            predictedState[row] = value
+
+        if self._control != None:
+            for row in indexes:
+                predictedState[row] += self._control[row] * controlInput
+
+        state[:] = predictedState
+
+        #P = F·P·Fᵀ + Q
+        for row in indexes:
+            productRow = product[row]
+            terms = transition[row]
+            for column in indexes:
+                value = 0.0
+                for inner, factor in terms:
+                    value += factor * covariance[inner][column]
+                productRow[column] = value
+
+        for row in indexes:
+            productRow = product[row]
+            covarianceRow = covariance[row]
+            noiseRow = self._processNoise[row]
+            for column in indexes:
+                value = noiseRow[column]
+                for inner, factor in transition[column]:
+                    value += productRow[inner] * factor
+                covarianceRow[column] = value
+
+
+    def update(self, measurement, observation, variance):
+        '''
+        Corrects the state with a scalar measurement
+
+        @param measurement: Measured value (z)
+        @param observation: Observation row (H), which projects the state onto the measurement
+        @param variance: Variance of the measurement's noise (R)
+        '''
+
+        indexes = self._indexes
+        state = self._state
+        covariance = self._covariance
+        projection = self._projection
+        gain = self._gain
+
+        #P·Hᵀ
+        for row in indexes:
+            covarianceRow = covariance[row]
+            value = 0.0
+            for column in indexes:
+                value += covarianceRow[column] * observation[column]
+            projection[row] = value
+
+        innovationVariance = variance
+        innovation = measurement
+        for row in indexes:
+            innovationVariance += observation[row] * projection[row]
+            innovation -= observation[row] * state[row]
+
+        if innovationVariance > 0.0:
+
+            for row in indexes:
+                gain[row] = projection[row] / innovationVariance
+                state[row] += gain[row] * innovation
+
+            #P = P - K·H·P, where H·P = (P·Hᵀ)ᵀ because P is symmetric
+            for row in indexes:
+                covarianceRow = covariance[row]
+                rowGain = gain[row]
+                for column in indexes:
+                    covarianceRow[column] -= rowGain * projection[column]
+
+
+    def updateBatch(self, measurements, observations, variances):
+        '''
+        Corrects the state with several independent scalar measurements
+
+        @param measurements: Measured values
+        @param observations: Observation row of each measurement
+        @param variances: Variance of each measurement's noise
+        '''
+
+        for measurement, observation, variance in zip(measurements, observations, variances):
+            self.update(measurement, observation, variance)
+
+
+    def getState(self):
+        '''
+        @return: State vector. It is reused on each step.
+        '''
+
+        return self._state
+
+
+    def getCovariance(self):
+        '''
+        @return: Covariance matrix as rows. It is reused on each step.
+        '''
+
+        return self._covariance
+
+
+class VerticalEstimator(object):
+    '''
+    Estimates the height and the vertical speed.
+
+    The vertical acceleration (world's frame and without gravity, as readAccels returns) drives the prediction,
+    while the accelerometer's bias is estimated as part of the state. An optional altimeter (barometer or sonar)
+    corrects the drift of the integration. Without altimeter the height is dead reckoning only.
+
+    The cost of each update is measured in order to check that it fits within the control loop's budget.
+    '''
+
+    HEIGHT = 0
+    SPEED = 1
+    ACCEL_BIAS = 2
+
+    ACCEL_NOISE = 0.1 #m/s²
+    ACCEL_BIAS_WALK = 0.002 #m/s² per √s
+    ALTIMETER_NOISE = 0.1 #m
+
+    #Fraction of the period the estimation is allowed to take
+    BUDGET_RATIO = 0.05
+
+    ALTIMETER_OBSERVATION = [1.0, 0.0, 0.0]
+
+    def __init__(self, period, accelNoise=ACCEL_NOISE, accelBiasWalk=ACCEL_BIAS_WALK, \
+                 altimeterNoise=ALTIMETER_NOISE, budget=None, clock=monotonic):
+        '''
+        Constructor
+
+        @param period: Time between updates in seconds
+        @param accelNoise: Standard deviation of the accelerometer's noise
+        @param accelBiasWalk: Random walk of the accelerometer's bias as standard deviation per square root of second
+        @param altimeterNoise: Standard deviation of the altimeter's noise
+        @param budget: Time in seconds an update is allowed to take. By default, a fraction of the period.
+        @param clock: Clock of the cost's measurement
+        '''
+
+        dt = period
+        halfDt2 = dt * dt / 2.0
+        accelVariance = accelNoise * accelNoise
+
+        #The bias is subtracted from the measured acceleration
+        transition = [[1.0, dt, -halfDt2], \
+                      [0.0, 1.0, -dt], \
+                      [0.0, 0.0, 1.0]]
+        control = [halfDt2, dt, 0.0]
+
+        #The accelerometer's noise enters as the control input
+        processNoise = [[control[row] * control[column] * accelVariance for column in range(3)] for row in range(3)]
+        processNoise[2][2] = accelBiasWalk * accelBiasWalk * dt
+
+        self._filter = KalmanFilter(transition, processNoise, control, \
+                                    [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.01]])
+        self._altimeterVariance = altimeterNoise * altimeterNoise
+
+        self._budget = budget if budget != None else period * VerticalEstimator.BUDGET_RATIO
+        self._clock = clock
+        self._statistics = LoopStatistics(period, label="Vertical estimation cost")
+
+
+    def reset(self, height=0.0):
+        '''
+        @param height: Initial height in meters
+        '''
+
+        self._filter.reset([height, 0.0, 0.0])
+        self._statistics.reset()
+
+
+    def update(self, accelZ, altitude=None):
+        '''
+        Runs an estimation step
+
+        @param accelZ: Vertical acceleration in m/s² without gravity
+        @param altitude: Height measured by the altimeter in meters, or None if there isn't a new measurement
+        '''
+
+        startTime = self._clock()
+
+        self._filter.predict(accelZ)
+        if altitude != None:
+            self._filter.update(altitude, VerticalEstimator.ALTIMETER_OBSERVATION, self._altimeterVariance)
+
+        cost = self._clock() - startTime
+        self._statistics.add(cost, cost > self._budget)
+
+
+    def getHeight(self):
+
+        return self._filter.getState()[VerticalEstimator.HEIGHT]
+
+
+    def getSpeed(self):
+
+        return self._filter.getState()[VerticalEstimator.SPEED]
+
+
+    def getAccelBias(self):
+
+        return self._filter.getState()[VerticalEstimator.ACCEL_BIAS]
+
+
+    def getStatistics(self):
+        '''
+        @return: Cost of the updates. The overruns are the updates beyond the budget.
+        '''
+
+        return self._statistics
@@ -4,238 +4,68 @@ Created on 11/04/2015
 @author: david
 '''
 
-import logging
-from threading import Thread
-import time
+from flight.stabilization.control_loop import ControlLoop
+from flight.stabilization.pid_engine import PidEngine
 
 
-class PID(object):
+class PID(ControlLoop):
     '''
     Proportional Integrative Derivative stabilizer
     '''
     
-    #Period range to be considered as correct loop rate
-    PERIOD_RANGE_MARGIN = 0.1
-
-    def __init__(self, period, kpMatrix, kiMatrix, kdMatrix, readInputDelegate, setOutputDelegate, pidName = ""):
+    def __init__(self, period, kpMatrix, kiMatrix, kdMatrix, readInputDelegate, setOutputDelegate, pidName = "", scheduler = None, \
+                 integralLimits = None, derivativeOnMeasurement = False, derivativeFilter = 1.0):
         '''
         Constructor
-        '''
-        
-        self._pidName = pidName
-        
-        length = len(kpMatrix)
         
-        self._targets = [0.0] * length        
-        
-        #self._previousErrors = [0.0] * length #Not used currently since not using derivative component
-        self._integrals = [0.0] * length
-        self._lastErrors = [0.0] * length
-        
-        self._period = period        
-        self._minPeriod = period * (1.0 - PID.PERIOD_RANGE_MARGIN)
-        self._maxPeriod = period * (1.0 + PID.PERIOD_RANGE_MARGIN)
-        self._periodTarget = (self._minPeriod + self._period) / 2.0 
+        @param scheduler: Object which paces the loop. See flight.stabilization.scheduler.
+            If it is not provided, the loop will be paced by sleeping the remaining time of each period.
+        @param integralLimits: Absolute limit of the integral term per axis (anti-windup). None means no limits.
+        @param derivativeOnMeasurement: Calculates the derivative from the input values instead of the error
+        @param derivativeFilter: Low-pass filter constant of the derivative term. 1.0 means no filter.
+        '''
         
-        self._lastTime = time.time()
-        self._currentPeriod = period
+        ControlLoop.__init__(self, period, pidName, scheduler)
         
-        self._kp = kpMatrix
-        self._ki = kiMatrix
-        self._kd = kdMatrix
+        self._engine = PidEngine.create(kpMatrix, kiMatrix, kdMatrix, \
+                                        integralLimits, derivativeOnMeasurement, derivativeFilter)
         
         self._readInput = readInputDelegate
         self._setOutput = setOutputDelegate
     
-        self._isRunning = False
-        self._thread = None
-        
-        self._length = length
         
-#         self._integralsEnabled = True
-        
-        self._deltaTimeSum = 0.0
-        self._iterationCount = 0
-    
-        
-    def _calculate(self):
-        
-        outputArray = [0.0]*self._length
+    def _update(self, dt):
         
         currentValues  = self._readInput()        
-        currentTime = time.time()
-        dt = currentTime - self._lastTime
-                
-        for i in range(self._length):
-            
-            error = self._targets[i] - currentValues[i]
-            
-            #if self._integralsEnabled:
-            self._integrals[i] += error * dt
-#             else:
-#                 self._integrals[i] = 0.0
-#                         
-            result = \
-                self._kp[i] * error \
-                + self._ki[i] * self._integrals[i] \
-                + (self._kd[i] * (error - self._lastErrors[i]) / dt)
-            self._lastErrors[i] = error
-            
-            outputArray[i] = result            
-
-        self._lastTime = currentTime
+        outputArray = self._engine.calculate(currentValues, dt)
         self._setOutput(outputArray)
         
-        self._currentPeriod = dt
-        self._deltaTimeSum += dt
-        self._iterationCount += 1
+        
+    def _reset(self):
+        
+        self._engine.reset()
     
     
     def setTarget(self, target, index):
         
-        self._targets[index] = target
+        self._engine.setTarget(target, index)
         
     
     def setTargets(self, targets):
         
-        self._targets = targets
+        self._engine.setTargets(targets)
         
         
     def getTarget(self, index):
         
-        return self._targets[index]
+        return self._engine.getTarget(index)
     
     
     def getTargets(self):
         
-        return self._targets
-        
-        
-    def getCurrentPeriod(self):
-        
-        return self._currentPeriod
-    
-    
-    def _do(self): 
-        
-        #dtSum = 0.0
-        iterCount = 0        
-        underFreq = 0
-        overFreq = 0
-        rightFreq = 0
-        acceptableFreq = 0
-        
-        diff = 0.0
-        
-        minFreq = 1.0/self._maxPeriod
-        message = "Minimal freq. is {0:.3f}Hz.".format(minFreq)
-        print(message)
-        logging.info(message)
-        
-        self._lastTime = time.time()
-        time.sleep(self._period)
-        while self._isRunning:
-        
-            t0 = time.time()
-        
-            self._calculate()
-            
-            calculationTime = time.time() - t0
-            #dtSum += calculationTime
-            iterCount += 1
-                 
-            if self._currentPeriod < self._minPeriod:
-                overFreq += 1
-            elif self._currentPeriod >= self._minPeriod and self._currentPeriod <= self._period:
-                rightFreq += 1
-            elif self._currentPeriod > self._period and self._currentPeriod <= self._maxPeriod:
-                acceptableFreq += 1
-            else:
-                underFreq += 1
-
-            diff += self._periodTarget - self._currentPeriod
-            sleepTime = self._period - calculationTime + 0.1 * diff
-            if sleepTime > 0.0:            
-                time.sleep(sleepTime)
-            else:
-                time.sleep(0.001)
-
-        '''        
-        if dtSum != 0.0 and iterCount != 0:
-            tAvg = dtSum * 1000.0 / iterCount
-            fAvg = float(iterCount) / dtSum
-        else:
-            tAvg = 0.0
-            fAvg = float("inf")
-            
-        message = "PID-\"{0}\" (net values) t: {1:.3f}ms; f: {2:.3f}Hz".format(self._pidName, tAvg, fAvg)
-        logging.info(message)
-        print(message)
-        '''
-        
-        underFreqPerc = underFreq * 100.0 / iterCount
-        overFreqPerc = overFreq * 100.0 / iterCount
-        rightFreqPerc = rightFreq * 100.0 / iterCount
-        acceptableFreqPerc = acceptableFreq * 100.0 / iterCount       
-        message = "In freq: {0:.3f}%; Acceptable: {1:.3f}%; Under f.: {2:.3f}%; Over f.: {3:.3f}%"\
-            .format(rightFreqPerc, acceptableFreqPerc, underFreqPerc, overFreqPerc)
-        logging.info(message)
-        print(message)
-        
+        return self._engine.getTargets()
     
-    def start(self):
-        
-        if self._thread == None or not self._thread.isAlive():
-            
-            logging.info("Starting PID-\"{0}\"".format(self._pidName))
-
-            self._deltaTimeSum = 0.0
-            self._iterationCount = 0
-            
-            #Reset PID variables
-            length = len(self._kp)
-            self._integrals = [0.0] * length
-            self._lastErrors = [0.0] * length
-            
-            self._isRunning = True
-            self._thread = Thread(target=self._do)
-            self._thread.start()
-            
-        
-    def stop(self):
-        
-        self._isRunning = False        
-        if self._thread != None and self._thread.isAlive():
-            
-            self._thread.join()
-            
-            if self._iterationCount != 0 and self._deltaTimeSum:
-                
-                averageDeltaTime = self._deltaTimeSum * 1000.0/ self._iterationCount
-                averageFrequency = self._iterationCount / self._deltaTimeSum
-                
-            else:
-                
-                averageDeltaTime = 0.0
-                averageFrequency = float("inf")
-                
-            message = "PID-\"{0}\" - Avg. time: {1:.3f}ms - Avg. freq: {2:.3f}Hz".format(self._pidName, averageDeltaTime, averageFrequency)
-            print(message)
-            logging.info(message)
-                
     
-    def isRunning(self):
+    def setConstants(self, index, kp, ki, kd):
         
-        return self._isRunning
-    
-    
-#     def disableIntegrals(self):
-#         
-#         self._integralsEnabled = False
-#         
-#         
-#     def enableIntegrals(self):
-#         
-#         self._integralsEnabled = True
-       
-    
\ No newline at end of file
+        self._engine.setConstants(index, kp, ki, kd)
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from array import array
+
+
+try:
+    import numpy
+
+except ImportError:
+
+    numpy = None
+
+
+class PidEngine(object):
+    '''
+    Multi-axis PID calculation backed by preallocated arrays
+
+    All buffers are allocated at construction, so the calculation doesn't allocate within the control loop.
+    The output array is reused on each calculation, hence the caller must not keep it between iterations.
+    '''
+    
+    #Below this number of axes, NumPy's call overhead is greater than the plain loop's cost
+    NUMPY_MIN_LENGTH = 16
+
+    @staticmethod
+    def create(kp, ki, kd, integralLimits=None, derivativeOnMeasurement=False, derivativeFilter=1.0):
+        '''
+        Creates the fastest engine available on the current platform
+
+        @param kp: Proportional constants, one per axis
+        @param ki: Integral constants, one per axis
+        @param kd: Derivative constants, one per axis
+        @param integralLimits: Absolute limit of the integral term per axis (anti-windup).
+            Non-positive values or None mean no limit.
+        @param derivativeOnMeasurement: Calculates the derivative from the measured values instead of the error.
+            This avoids the derivative kick when the target changes.
+        @param derivativeFilter: Low-pass filter constant of the derivative term in range (0..1]. 1 means no filter.
+        '''
+
+        engineClass = NumpyPidEngine if numpy != None and len(kp) >= PidEngine.NUMPY_MIN_LENGTH else PidEngine
+
+        return engineClass(kp, ki, kd, integralLimits, derivativeOnMeasurement, derivativeFilter)
+
+
+    def __init__(self, kp, ki, kd, integralLimits=None, derivativeOnMeasurement=False, derivativeFilter=1.0):
+        '''
+        Constructor
+
+        See PidEngine.create for the parameters' description
+        '''
+
+        length = len(kp)
+
+        self._length = length
+        self._indexes = range(length)
+
+        self._kp = array("d", kp)
+        self._ki = array("d", ki)
+        self._kd = array("d", kd)
+
+        limits = integralLimits if integralLimits != None else [0.0] * length
+        self._integralLimits = array("d", [limit if limit > 0.0 else float("inf") for limit in limits])
+
+        self._derivativeOnMeasurement = derivativeOnMeasurement
+        self._derivativeFilter = derivativeFilter
+
+        self._targets = array("d", [0.0]) * length
+        self._integrals = array("d", [0.0]) * length
+        self._lastErrors = array("d", [0.0]) * length
+        self._lastValues = array("d", [0.0]) * length
+        self._derivatives = array("d", [0.0]) * length
+        self._outputs = array("d", [0.0]) * length
+
+        #The derivative on measurement has no previous value at the first calculation
+        self._firstCalculation = True
+
+
+    def getLength(self):
+
+        return self._length
+
+
+    def reset(self):
+        '''
+        Resets the integrals and the derivative history
+        '''
+
+        for i in self._indexes:
+            self._integrals[i] = 0.0
+            self._lastErrors[i] = 0.0
+            self._lastValues[i] = 0.0
+            self._derivatives[i] = 0.0
+
+        self._firstCalculation = True
+
+
+    def setConstants(self, index, kp, ki, kd):
+
+        self._kp[index] = kp
+        self._ki[index] = ki
+        self._kd[index] = kd
+
+
+    def setIntegralLimit(self, index, limit):
+
+        self._integralLimits[index] = limit if limit > 0.0 else float("inf")
+
+
+    def setTarget(self, target, index):
+
+        self._targets[index] = target
+
+
+    def setTargets(self, targets):
+
+        for i in self._indexes:
+            self._targets[i] = targets[i]
+
+
+    def getTarget(self, index):
+
+        return self._targets[index]
+
+
+    def getTargets(self):
+
+        return self._targets
+
+
+    def calculate(self, currentValues, dt):
+        '''
+        Calculates the output of all axes
+
+        @param currentValues: Current measured value of each axis
+        @param dt: Elapsed time in seconds since the previous calculation
+        @return: Output array. It will be overwritten by the next calculation.
+        '''
+
+        targets = self._targets
+        integrals = self._integrals
+        lastErrors = self._lastErrors
+        lastValues = self._lastValues
+        derivatives = self._derivatives
+        limits = self._integralLimits
+        kp = self._kp
+        ki = self._ki
+        kd = self._kd
+        outputs = self._outputs
+        onMeasurement = self._derivativeOnMeasurement
+        alpha = self._derivativeFilter
+
+        if self._firstCalculation:
+            if onMeasurement:
+                for i in self._indexes:
+                    lastValues[i] = currentValues[i]
+            self._firstCalculation = False
+
+        for i in self._indexes:
+
+            value = currentValues[i]
+            error = targets[i] - value
+
+            integral = integrals[i] + error * dt
+            limit = limits[i]
+            if integral > limit:
+                integral = limit
+            elif integral < -limit:
+                integral = -limit
+            integrals[i] = integral
+
+            if dt > 0.0:
+                if onMeasurement:
+                    derivative = (lastValues[i] - value) / dt
+                else:
+                    derivative = (error - lastErrors[i]) / dt
+                derivatives[i] += alpha * (derivative - derivatives[i])
+
+            lastErrors[i] = error
+            lastValues[i] = value
+
+            outputs[i] = kp[i] * error + ki[i] * integral + kd[i] * derivatives[i]
+
+        return outputs
+
+
+class NumpyPidEngine(PidEngine):
+    '''
+    Multi-axis PID calculation using NumPy. All axes are calculated at once.
+    '''
+
+    def __init__(self, kp, ki, kd, integralLimits=None, derivativeOnMeasurement=False, derivativeFilter=1.0):
+        '''
+        Constructor
+
+        See PidEngine.create for the parameters' description
+        '''
+
+        length = len(kp)
+
+        self._length = length
+        self._indexes = range(length)
+
+        self._kp = numpy.array(kp, dtype=float)
+        self._ki = numpy.array(ki, dtype=float)
+        self._kd = numpy.array(kd, dtype=float)
+
+        limits = numpy.array(integralLimits if integralLimits != None else [0.0] * length, dtype=float)
+        limits[limits <= 0.0] = numpy.inf
+        self._integralLimits = limits
+        self._negativeIntegralLimits = -limits
+
+        self._derivativeOnMeasurement = derivativeOnMeasurement
+        self._derivativeFilter = derivativeFilter
+
+        self._values = numpy.zeros(length)
+        self._targets = numpy.zeros(length)
+        self._errors = numpy.zeros(length)
+        self._integrals = numpy.zeros(length)
+        self._lastErrors = numpy.zeros(length)
+        self._lastValues = numpy.zeros(length)
+        self._derivative = numpy.zeros(length)
+        self._derivatives = numpy.zeros(length)
+        self._term = numpy.zeros(length)
+        self._outputs = numpy.zeros(length)
+
+        self._firstCalculation = True
+
+
+    def reset(self):
+
+        self._integrals.fill(0.0)
+        self._lastErrors.fill(0.0)
+        self._lastValues.fill(0.0)
+        self._derivatives.fill(0.0)
+
+        self._firstCalculation = True
+
+
+    def setIntegralLimit(self, index, limit):
+
+        self._integralLimits[index] = limit if limit > 0.0 else numpy.inf
+        self._negativeIntegralLimits[index] = -self._integralLimits[index]
+
+
+    def setTargets(self, targets):
+
+        self._targets[:] = targets
+
+
+    def calculate(self, currentValues, dt):
+
+        values = self._values
+        errors = self._errors
+        derivative = self._derivative
+        term = self._term
+        outputs = self._outputs
+
+        values[:] = currentValues
+        numpy.subtract(self._targets, values, out=errors)
+
+        if self._firstCalculation:
+            if self._derivativeOnMeasurement:
+                self._lastValues[:] = values
+            self._firstCalculation = False
+
+        #Integral with anti-windup
+        numpy.multiply(errors, dt, out=term)
+        self._integrals += term
+        numpy.clip(self._integrals, self._negativeIntegralLimits, self._integralLimits, out=self._integrals)
+
+        if dt > 0.0:
+            if self._derivativeOnMeasurement:
+                numpy.subtract(self._lastValues, values, out=derivative)
+            else:
+                numpy.subtract(errors, self._lastErrors, out=derivative)
+            derivative /= dt
+            derivative -= self._derivatives
+            derivative *= self._derivativeFilter
+            self._derivatives += derivative
+
+        self._lastErrors[:] = errors
+        self._lastValues[:] = values
+
+        numpy.multiply(self._kp, errors, out=outputs)
+        numpy.multiply(self._ki, self._integrals, out=term)
+        outputs += term
+        numpy.multiply(self._kd, self._derivatives, out=term)
+        outputs += term
+
+        return outputs
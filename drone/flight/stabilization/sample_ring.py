@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from array import array
+
+
+class SampleRing(object):
+    '''
+    Single-producer/single-consumer ring of timestamped samples.
+
+    The slots are preallocated, hence neither the producer nor the consumer allocate memory.
+    Instead of locks, a sequence counter tells the consumer which slots are published: the producer
+    writes a slot before increasing the counter, and the consumer checks after reading that the slot
+    was not overwritten meanwhile. The consumer never blocks the producer.
+    '''
+
+    DEFAULT_CAPACITY = 64
+
+    def __init__(self, width, capacity=DEFAULT_CAPACITY):
+        '''
+        Constructor
+
+        @param width: Number of values of each sample
+        @param capacity: Number of slots. One of them is always reserved for the producer.
+        '''
+
+        self._width = width
+        self._capacity = capacity
+        self._indexes = range(width)
+
+        self._values = array("d", [0.0]) * (width * capacity)
+        self._timestamps = array("d", [0.0]) * capacity
+
+        self._sequence = 0
+
+
+    def getWidth(self):
+
+        return self._width
+
+
+    def getCapacity(self):
+
+        return self._capacity
+
+
+    def getSequence(self):
+        '''
+        @return: Number of samples published so far
+        '''
+
+        return self._sequence
+
+
+    def publish(self, values, timestamp):
+        '''
+        Publishes a sample. Only the producer thread may call this method.
+
+        @param values: Sequence of values. Its length must be the ring's width.
+        @param timestamp: Time of the sample
+        '''
+
+        slot = self._sequence % self._capacity
+        base = slot * self._width
+        buffer = self._values
+
+        for i in self._indexes:
+            buffer[base + i] = values[i]
+        self._timestamps[slot] = timestamp
+
+        #The slot is visible to the consumer only after it is completely written
+        self._sequence += 1
+
+
+    def publishParts(self, parts, timestamp):
+        '''
+        Publishes a sample given in several parts, so the producer doesn't need to join them.
+        Only the producer thread may call this method.
+
+        @param parts: Sequences of values written one after another. Their total length must be the ring's width.
+        @param timestamp: Time of the sample
+        '''
+
+        slot = self._sequence % self._capacity
+        index = slot * self._width
+        buffer = self._values
+
+        for part in parts:
+            for value in part:
+                buffer[index] = value
+                index += 1
+        self._timestamps[slot] = timestamp
+
+        #The slot is visible to the consumer only after it is completely written
+        self._sequence += 1
+
+
+    def readLatest(self, out):
+        '''
+        Reads the newest sample
+
+        @param out: Preallocated sequence where the sample's values will be written
+        @return: Tuple (sequence number, timestamp). Sequence number is zero if no sample was published yet.
+        '''
+
+        width = self._width
+        buffer = self._values
+
+        while True:
+
+            sequence = self._sequence
+            if sequence == 0:
+                return (0, 0.0)
+
+            slot = (sequence - 1) % self._capacity
+            base = slot * width
+            for i in self._indexes:
+                out[i] = buffer[base + i]
+            timestamp = self._timestamps[slot]
+
+            if self._sequence - sequence < self._capacity - 1:
+                return (sequence, timestamp)
+
+
+    def readBatch(self, out, timestamps, count):
+        '''
+        Reads the newest samples, the oldest first
+
+        @param out: Preallocated sequence where the samples' values will be written one after another
+        @param timestamps: Preallocated sequence where the samples' timestamps will be written
+        @param count: Maximum number of samples to read. It is limited by the capacity minus one.
+        @return: Number of samples read
+        '''
+
+        width = self._width
+        capacity = self._capacity
+        buffer = self._values
+
+        while True:
+
+            sequence = self._sequence
+            length = min(count, sequence, capacity - 1)
+            first = sequence - length
+
+            for n in range(length):
+                slot = (first + n) % capacity
+                base = slot * width
+                outBase = n * width
+                for i in self._indexes:
+                    out[outBase + i] = buffer[base + i]
+                timestamps[n] = self._timestamps[slot]
+
+            #The oldest slot read must not have been reused by the producer meanwhile
+            if self._sequence - first < capacity:
+                return length
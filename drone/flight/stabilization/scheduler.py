@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from array import array
+import ctypes
+import ctypes.util
+import logging
+import os
+import time
+
+
+def _loadLibrary(name):
+    '''
+    @return: C library or None if it isn't available
+    '''
+
+    libraryName = ctypes.util.find_library(name)
+    try:
+        library = ctypes.CDLL(libraryName, use_errno=True) if libraryName != None else None
+    except OSError:
+        library = None
+
+    return library
+
+
+_libc = _loadLibrary("c")
+
+#Linux' constants
+CLOCK_MONOTONIC = 1
+SCHED_FIFO = 1
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+
+class _Timespec(ctypes.Structure):
+
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class _SchedParam(ctypes.Structure):
+
+    _fields_ = [("sched_priority", ctypes.c_int)]
+
+
+def _createLibcMonotonic():
+    '''
+    @return: Function reading clock_gettime(CLOCK_MONOTONIC) in seconds, or None if it isn't available
+    '''
+
+    clockFunction = None
+    #Former versions of glibc provide clock_gettime within librt
+    for library in [_libc, _loadLibrary("rt")]:
+        if library != None and hasattr(library, "clock_gettime"):
+
+            clockGettime = library.clock_gettime
+            timespec = _Timespec()
+            timespecReference = ctypes.byref(timespec)
+
+            if clockGettime(CLOCK_MONOTONIC, timespecReference) == 0:
+
+                def clockFunction():
+                    clockGettime(CLOCK_MONOTONIC, timespecReference)
+                    return timespec.tv_sec + timespec.tv_nsec * 1e-9
+
+                break
+
+    return clockFunction
+
+
+try:
+    monotonic = time.monotonic
+
+except AttributeError:
+
+    #Python 2 has no monotonic clock within the standard library
+    monotonic = _createLibcMonotonic()
+    if monotonic == None:
+        logging.warning("Monotonic clock not available. The wall clock will be used.")
+        monotonic = time.time
+
+
+class LoopStatistics(object):
+    '''
+    Per-iteration timing of a control loop.
+
+    Jitter is the wake-up delay of each iteration against its deadline. The last values are kept
+    in a preallocated ring in order to calculate percentiles without allocating within the loop.
+    '''
+
+    HISTORY_SIZE = 4096
+
+    def __init__(self, period, historySize=HISTORY_SIZE, label="Jitter"):
+
+        self._period = period
+        self._label = label
+        self._history = array("d", [0.0]) * historySize
+        self._historySize = historySize
+
+        self.reset()
+
+
+    def reset(self):
+
+        self._count = 0
+        self._overruns = 0
+        self._jitterSum = 0.0
+        self._jitterMax = 0.0
+        self._lastJitter = 0.0
+
+
+    def add(self, jitter, overrun=False):
+        '''
+        Records an iteration
+
+        @param jitter: Delay in seconds of the iteration against its deadline
+        @param overrun: Whether the iteration missed at least a whole period
+        '''
+
+        self._history[self._count % self._historySize] = jitter
+        self._count += 1
+        self._jitterSum += jitter
+        self._lastJitter = jitter
+
+        if jitter > self._jitterMax:
+            self._jitterMax = jitter
+
+        if overrun:
+            self._overruns += 1
+
+
+    def getCount(self):
+
+        return self._count
+
+
+    def getOverruns(self):
+
+        return self._overruns
+
+
+    def getLastJitter(self):
+
+        return self._lastJitter
+
+
+    def getMaxJitter(self):
+
+        return self._jitterMax
+
+
+    def getAverageJitter(self):
+
+        return self._jitterSum / self._count if self._count != 0 else 0.0
+
+
+    def getPercentile(self, percentile):
+        '''
+        Calculates the jitter percentile within the recorded history
+
+        @param percentile: Percentile as a number between 0 and 100
+        '''
+
+        length = min(self._count, self._historySize)
+        if length != 0:
+            values = sorted(self._history[:length])
+            index = int(round((length - 1) * percentile / 100.0))
+            value = values[index]
+        else:
+            value = 0.0
+
+        return value
+
+
+    def __str__(self):
+
+        return "{0} avg: {1:.3f}ms; p99: {2:.3f}ms; max: {3:.3f}ms; overruns: {4}"\
+            .format(self._label, self.getAverageJitter() * 1000.0, self.getPercentile(99.0) * 1000.0, \
+                    self._jitterMax * 1000.0, self._overruns)
+
+
+class SleepScheduler(object):
+    '''
+    Paces a loop by sleeping the remaining time of each period.
+    The sleep time is corrected by the accumulated drift against the target period.
+    '''
+
+    #Period range to be considered as correct loop rate
+    PERIOD_RANGE_MARGIN = 0.1
+
+    def __init__(self, period):
+
+        self._period = period
+        self._periodTarget = period * (1.0 - SleepScheduler.PERIOD_RANGE_MARGIN / 2.0)
+        self._statistics = LoopStatistics(period)
+
+        self._lastWakeTime = 0.0
+        self._diff = 0.0
+
+
+    def now(self):
+
+        return time.time()
+
+
+    def isThreaded(self):
+
+        return True
+
+
+    def start(self):
+
+        self._statistics.reset()
+        self._diff = 0.0
+        self._lastWakeTime = time.time()
+        time.sleep(self._period)
+
+
+    def waitNext(self):
+        '''
+        Waits until the next iteration should start
+        '''
+
+        currentTime = time.time()
+        calculationTime = currentTime - self._lastWakeTime
+
+        sleepTime = self._period - calculationTime + 0.1 * self._diff
+        if sleepTime > 0.0:
+            time.sleep(sleepTime)
+        else:
+            time.sleep(0.001)
+
+        wakeTime = time.time()
+        currentPeriod = wakeTime - self._lastWakeTime
+        self._diff += self._periodTarget - currentPeriod
+        self._lastWakeTime = wakeTime
+
+        jitter = currentPeriod - self._period
+        self._statistics.add(jitter if jitter > 0.0 else 0.0, currentPeriod >= 2.0 * self._period)
+
+
+    def stop(self):
+
+        pass
+
+
+    def getStatistics(self):
+
+        return self._statistics
+
+
+class DeadlineScheduler(object):
+    '''
+    Paces a loop against absolute deadlines of the monotonic clock.
+
+    Each iteration sleeps until shortly before its deadline and spins the rest of the time,
+    since the sleep granularity of the system is usually coarser than the required precision.
+    Optionally, the loop thread can run with real-time priority (SCHED_FIFO), be pinned to a CPU
+    and lock the process memory in order to avoid page faults.
+    '''
+
+    DEFAULT_SPIN_TIME = 0.0005 #seconds
+
+    def __init__(self, period, spinTime=DEFAULT_SPIN_TIME, priority=0, cpu=-1, lockMemory=False, \
+                 clock=monotonic, sleep=time.sleep):
+        '''
+        Constructor
+
+        @param period: Loop period in seconds
+        @param spinTime: Time in seconds before the deadline when the scheduler stops sleeping and spins
+        @param priority: SCHED_FIFO priority of the loop thread. 0 keeps the default policy.
+        @param cpu: CPU where the loop thread will be pinned. Negative values don't pin the thread.
+        @param lockMemory: Locks the current and future memory pages of the process
+        @param clock: Monotonic clock in seconds
+        @param sleep: Sleep function
+        '''
+
+        self._period = period
+        self._spinTime = spinTime
+        self._priority = priority
+        self._cpu = cpu
+        self._lockMemory = lockMemory
+        self._clock = clock
+        self._sleep = sleep
+
+        self._statistics = LoopStatistics(period)
+        self._deadline = 0.0
+
+
+    def now(self):
+
+        return self._clock()
+
+
+    def isThreaded(self):
+
+        return True
+
+
+    def _setRealTime(self):
+
+        #Python 2 doesn't provide the scheduling functions, hence they are called through the C library
+        if self._priority > 0:
+            param = _SchedParam(self._priority)
+            if _libc != None and _libc.sched_setscheduler(0, SCHED_FIFO, ctypes.byref(param)) == 0:
+                logging.info("Loop thread running as SCHED_FIFO with priority {0}".format(self._priority))
+            else:
+                logging.warning("Real-time priority not available: {0}".format(os.strerror(ctypes.get_errno())))
+
+        if self._cpu >= 0:
+            #cpu_set_t is a bit mask of 1024 CPUs
+            maskWordBits = ctypes.sizeof(ctypes.c_ulong) * 8
+            mask = (ctypes.c_ulong * (1024 // maskWordBits))()
+            mask[self._cpu // maskWordBits] = 1 << (self._cpu % maskWordBits)
+            if _libc != None and _libc.sched_setaffinity(0, ctypes.sizeof(mask), ctypes.byref(mask)) == 0:
+                logging.info("Loop thread pinned to CPU {0}".format(self._cpu))
+            else:
+                logging.warning("CPU affinity not available: {0}".format(os.strerror(ctypes.get_errno())))
+
+        if self._lockMemory:
+            if _libc != None and _libc.mlockall(MCL_CURRENT | MCL_FUTURE) == 0:
+                logging.info("Process memory locked")
+            else:
+                logging.warning("Memory locking not available: {0}".format(os.strerror(ctypes.get_errno())))
+
+
+    def start(self):
+        '''
+        Starts the scheduling. It must be called within the loop thread.
+        '''
+
+        self._setRealTime()
+        self._statistics.reset()
+
+        self._deadline = self._clock() + self._period
+        self._wait()
+
+
+    def _wait(self):
+
+        remaining = self._deadline - self._clock()
+        if remaining > self._spinTime:
+            self._sleep(remaining - self._spinTime)
+
+        wakeTime = self._clock()
+        while wakeTime < self._deadline:
+            wakeTime = self._clock()
+
+        return wakeTime
+
+
+    def waitNext(self):
+        '''
+        Waits until the next deadline. If the deadline was already missed, the missed periods are skipped.
+        '''
+
+        self._deadline += self._period
+
+        overrun = self._clock() > self._deadline
+        if overrun:
+            #Skip missed periods instead of trying to catch them up
+            currentTime = self._clock()
+            while self._deadline < currentTime:
+                self._deadline += self._period
+
+        wakeTime = self._wait()
+        self._statistics.add(wakeTime - self._deadline, overrun)
+
+
+    def stop(self):
+
+        pass
+
+
+    def getStatistics(self):
+
+        return self._statistics
+
+
+
+class SimulatedClock(object):
+    '''
+    Clock whose time only advances when it is told to
+    '''
+
+    def __init__(self, startTime=0.0):
+
+        self._time = startTime
+
+
+    def now(self):
+
+        return self._time
+
+
+    def advance(self, dt):
+
+        self._time += dt
+
+
+class SimulatedScheduler(object):
+    '''
+    Paces a loop against a simulated clock, without threads nor sleeps.
+
+    The loop doesn't run on its own thread, but it is stepped by the simulation (see ControlLoop.step).
+    Each iteration advances the clock exactly one period, hence the loop runs as fast as the CPU allows
+    and the results are reproducible.
+    '''
+
+    def __init__(self, period, clock):
+        '''
+        Constructor
+
+        @param period: Loop period in seconds
+        @param clock: SimulatedClock shared with the rest of the simulation
+        '''
+
+        self._period = period
+        self._clock = clock
+        self._statistics = LoopStatistics(period)
+
+
+    def now(self):
+
+        return self._clock.now()
+
+
+    def isThreaded(self):
+
+        return False
+
+
+    def start(self):
+
+        self._statistics.reset()
+        self._clock.advance(self._period)
+
+
+    def waitNext(self):
+
+        self._clock.advance(self._period)
+        self._statistics.add(0.0, False)
+
+
+    def stop(self):
+
+        pass
+
+
+    def getStatistics(self):
+
+        return self._statistics
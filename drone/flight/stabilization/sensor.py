@@ -7,11 +7,13 @@ Created on 11/04/2015
 from copy import deepcopy
 import logging
 import math
+import struct
 import time
 
 from flight.stabilization.state import SensorState
 import flight.stabilization.imu3000_defs as imu3000
 import flight.stabilization.kxtf9_defs as kxtf9
+from sensors.calibration import Calibration, CalibrationStore
 from sensors.vector import Vector
 
 
@@ -42,11 +44,26 @@ class Sensor(object):
     ACCEL2MS2 = ACCEL2G * GRAVITY
 
     ACCEL_LPF = 0.4 #Acceleration low-pass filter constant
+    
+    #Burst-read layouts: IMU-3000's gyro registers are big endian (H, L), KXTF9's are little endian (L, H)
+    GYRO_DECODER = struct.Struct(">hhh")
+    ACCEL_DECODER = struct.Struct("<hhh")
+    
+    SENSOR_TYPE = "imu3000-kxtf9"
+    CALIBRATION_SAMPLES = 100
+    #Samples of the stored calibration's validation
+    VALIDATION_SAMPLES = 10
+    GYRO_DRIFT_THRESHOLD = 0.5 #º/s
+    ACCEL_DRIFT_THRESHOLD = 0.02 #g
 
    
-    def __init__(self):
+    def __init__(self, estimator=None, calibrationStore=None):
         '''
         Constructor
+        
+        @param estimator: Attitude estimator (see flight.stabilization.attitude). If None, the angles are calculated
+            by the complementary filter.
+        @param calibrationStore: Store of the calibration. If None, the configured one.
         '''
         
         self._bus = smbus.SMBus(1)
@@ -66,6 +83,9 @@ class Sensor(object):
         self._angSpeed = [0.0]*2
         self._localGravity = 0.0
         
+        self._estimator = estimator
+        self._calibrationStore = calibrationStore if calibrationStore != None else CalibrationStore.getInstance()
+        
         self._state = SensorState()
         
     
@@ -110,64 +130,57 @@ class Sensor(object):
         self._writeWord(address, reg+1, reg, word)
 
     
-    def _readRawGyroX(self):
+    def _readBurst(self, address, reg, decoder):
+        '''
+        Reads consecutive registers within a single I2C transaction
         
-        return self._readWordHL(Sensor.GYRO_ADDRESS, imu3000.GYRO_XOUT)
+        @param address: Device address
+        @param reg: First register
+        @param decoder: struct.Struct decoding the read bytes
+        '''
+        
+        data = self._bus.read_i2c_block_data(address, reg, decoder.size)
+        
+        return decoder.unpack_from(bytearray(data))
     
     
-    def _readRawGyroY(self):
+    def _readRawGyros(self):
         
-        return self._readWordHL(Sensor.GYRO_ADDRESS, imu3000.GYRO_YOUT)
+        return self._readBurst(Sensor.GYRO_ADDRESS, imu3000.GYRO_XOUT, Sensor.GYRO_DECODER)
     
     
-    def _readRawGyroZ(self):
+    def _readRawAccels(self):
+        
+        rawAccels = self._readBurst(Sensor.ACC_ADDRESS, kxtf9.XOUT, Sensor.ACCEL_DECODER)
         
-        return self._readWordHL(Sensor.GYRO_ADDRESS, imu3000.GYRO_ZOUT)
+        return [rawAccel / 16 for rawAccel in rawAccels]
     
     
-    def _readAngSpeed(self, reg, index):
-
-        data = (self._readWordHL(Sensor.GYRO_ADDRESS, reg) - self._gyroOffset[index]) * Sensor.GYRO2DEG
-        return data
+    def _readRawAccelsFiltered(self):
+        
+        rawAccels = self._readRawAccels()
+        
+        for index in range(3):
+            self._accLastFilteredRawData[index] += \
+                Sensor.ACCEL_LPF * (rawAccels[index] - self._accLastFilteredRawData[index])
 
+        return self._accLastFilteredRawData
+    
 
     def readAngleSpeeds(self):
         
         return self._state.angleSpeeds
     
 
-    def _readAngleSpeeds(self):
+    def _readAngleSpeeds(self, rawGyros):
 
-        speedAX = self._readAngSpeedX()
-        speedAY = self._readAngSpeedY()        
-        speedAZ = self._readAngSpeedZ()
+        self._state.angleSpeeds = [(rawGyros[index] - self._gyroOffset[index]) * Sensor.GYRO2DEG for index in range(3)]
 
-        self._state.angleSpeeds = [speedAX, speedAY, speedAZ]
 
-
-    def _readAngSpeedX(self):
+    def _readAccAngles(self, rawAccels):
         
-        return self._readAngSpeed(imu3000.GYRO_XOUT, 0)
-
-
-    def _readAngSpeedY(self):
-        
-        return self._readAngSpeed(imu3000.GYRO_YOUT, 1)
-
-
-    def _readAngSpeedZ(self):
-        
-        return self._readAngSpeed(imu3000.GYRO_ZOUT, 2)
-
-
-    def _readAccAngles(self):
-        
-        rawAccX = self._readRawAccelFilteredX()
-        rawAccY = self._readRawAccelFilteredY()
-        rawAccZ = self._readRawAccelFilteredZ()
-        
-        accAngX = math.degrees(math.atan2(rawAccY, rawAccZ))
-        accAngY = -math.degrees(math.atan2(rawAccX, rawAccZ))
+        accAngX = math.degrees(math.atan2(rawAccels[1], rawAccels[2]))
+        accAngY = -math.degrees(math.atan2(rawAccels[0], rawAccels[2]))
         
         accAngles = [accAngX, accAngY]
         
@@ -179,11 +192,11 @@ class Sensor(object):
         return self._state.angles
     
 
-    def _readAngles(self):
+    def _readAngles(self, rawAccels):
         
-        accAngles = self._readAccAngles()
+        accAngles = self._readAccAngles(rawAccels)
         previousAngSpeeds = self._angSpeed 
-        self._angSpeed = [self._state.angleSpeeds[0],self._state.angleSpeeds[1]] #[self._readAngSpeedX(), self._readAngSpeedY()]
+        self._angSpeed = [self._state.angleSpeeds[0],self._state.angleSpeeds[1]]
         currentTime = time.time()
         dt2 = (currentTime - self._gyroReadTime) / 2.0        
         
@@ -208,62 +221,18 @@ class Sensor(object):
         return deviceAngles
 
     
-    def _readRawAccelX(self):
-        
-        return self._readWordLH(Sensor.ACC_ADDRESS, kxtf9.XOUT) / 16
-    
-    
-    def _readRawAccelY(self):
-        
-        return self._readWordLH(Sensor.ACC_ADDRESS, kxtf9.YOUT) / 16
-    
-    
-    def _readRawAccelZ(self):
-        
-        return self._readWordLH(Sensor.ACC_ADDRESS, kxtf9.ZOUT) / 16
-
-
-    def _readRawAccelFilteredX(self):
-        
-        filteredValue = self._accLastFilteredRawData[0] + \
-            Sensor.ACCEL_LPF *( self._readRawAccelX() - self._accLastFilteredRawData[0])
-        self._accLastFilteredRawData[0] = filteredValue
-
-        return filteredValue
-    
-    
-    def _readRawAccelFilteredY(self):
-        
-        filteredValue = self._accLastFilteredRawData[1] + \
-            Sensor.ACCEL_LPF *( self._readRawAccelY() - self._accLastFilteredRawData[1])
-        self._accLastFilteredRawData[1] = filteredValue
-    
-        return filteredValue
-
-    
-    def _readRawAccelFilteredZ(self):
-        
-        filteredValue = self._accLastFilteredRawData[2] + \
-            Sensor.ACCEL_LPF *( self._readRawAccelZ() - self._accLastFilteredRawData[2])
-        self._accLastFilteredRawData[2] = filteredValue
-
-        return filteredValue
-
-    
     def readAccels(self):
         
         return self._state.accels
     
     
-    def _readAccels(self):
+    def _readAccels(self, rawAccels):
 
-        accelX = self._readRawAccelFilteredX() * Sensor.ACCEL2MS2
-        accelY = self._readRawAccelFilteredY() * Sensor.ACCEL2MS2
-        accelZ = self._readRawAccelFilteredZ() * Sensor.ACCEL2MS2
+        accels = [rawAccel * Sensor.ACCEL2MS2 for rawAccel in rawAccels]
         
         angles = [math.radians(angle) for angle in self.readAngles()]
 
-        accels = Vector.rotateVector3D([accelX, accelY, accelZ], angles + [0.0])
+        accels = Vector.rotateVector3D(accels, angles + [0.0])
                   
         #Eliminate gravity acceleration
         accels[2] -= self._localGravity
@@ -271,6 +240,18 @@ class Sensor(object):
         self._state.accels = accels
         
     
+    def _estimate(self, rawAccels):
+        
+        accels = [rawAccel * Sensor.ACCEL2MS2 for rawAccel in rawAccels]
+        
+        currentTime = time.time()
+        self._estimator.update(self._state.angleSpeeds, accels, currentTime - self._gyroReadTime)
+        self._gyroReadTime = currentTime
+        
+        self._state.angles = list(self._estimator.getAngles())
+        self._state.accels = list(self._estimator.getAccels())
+        
+    
     def resetGyroReadTime(self):
         
         self._gyroReadTime = time.time()
@@ -278,9 +259,16 @@ class Sensor(object):
     
     def refreshState(self):
         
-        self._readAngleSpeeds()
-        self._readAngles()
-        self._readAccels()
+        #Each register is read once per refresh: one transaction for the gyro and another one for the accelerometer
+        rawGyros = self._readRawGyros()
+        rawAccels = self._readRawAccelsFiltered()
+        
+        self._readAngleSpeeds(rawGyros)
+        if self._estimator != None:
+            self._estimate(rawAccels)
+        else:
+            self._readAngles(rawAccels)
+            self._readAccels(rawAccels)
         
     
     def start(self):
@@ -307,7 +295,7 @@ class Sensor(object):
         self._bus.write_byte_data(Sensor.ACC_ADDRESS, kxtf9.CTRL_REG1, kxtf9.RES | kxtf9.GSEL_4G)
         self._bus.write_byte_data(Sensor.ACC_ADDRESS, kxtf9.CTRL_REG1, kxtf9.RES | kxtf9.GSEL_4G | kxtf9.PC1)
         
-        self._accLastFilteredRawData = [self._readRawAccelX(), self._readRawAccelY(), self._readRawAccelZ()]
+        self._accLastFilteredRawData = self._readRawAccels()
 
         #Wait to sensor's start-up
         time.sleep(1)
@@ -315,54 +303,110 @@ class Sensor(object):
         self.calibrate()
     
     
-    def calibrate(self):
+    def _sampleRaw(self, count):
         '''
-        Calibrates sensor
+        Averages the raw readings of the gyro and the accelerometer
+        
+        @param count: Number of samples
+        @return: Tuple (gyros, accels)
         '''
         
-        print("Calibrating accelerometer...")
-        self._accOffset = [0.0]*3
+        gyros = [0.0]*3
+        accels = [0.0]*3
         
-        i = 0
-        while i < 100:
-
-            self._accOffset[0] += self._readRawAccelX()
-            self._accOffset[1] += self._readRawAccelY()
-            self._accOffset[2] += self._readRawAccelZ()
+        for _ in range(count):
+            
+            rawGyros = self._readRawGyros()
+            rawAccels = self._readRawAccels()
+            for index in range(3):
+                gyros[index] += rawGyros[index]
+                accels[index] += rawAccels[index]
             
             time.sleep(0.01)
-            i+=1
         
-        for index in range(3): 
-            self._accOffset[index] /= float(i)
+        for index in range(3):
+            gyros[index] /= float(count)
+            accels[index] /= float(count)
+        
+        return gyros, accels
+    
+    
+    def _readTemperature(self):
+        '''
+        @return: IMU-3000's temperature in ºC
+        '''
+        
+        return 35.0 + (self._readWordHL(Sensor.GYRO_ADDRESS, imu3000.TEMP_OUT) + 13200) / 280.0
+    
+    
+    def _loadCalibration(self, temperature):
+        '''
+        Validates the stored calibration against a short burst of samples
         
+        @return: The stored calibration or None if it is missing or has drifted
+        '''
         
-        #Calibrate gyro
-        print("Calibrating gyro...")
-        self._gyroOffset = [0.0]*3
+        calibration = self._calibrationStore.load(Sensor.SENSOR_TYPE, temperature)
+        if calibration != None:
+            
+            print("Validating stored calibration...")
+            gyros, accels = self._sampleRaw(Sensor.VALIDATION_SAMPLES)
+            
+            gyroDrift = Calibration.drift(calibration.getGyroOffset(), gyros) * Sensor.GYRO2DEG
+            accelDrift = Calibration.drift(calibration.getAccelOffset(), accels) * Sensor.ACCEL2G
+            
+            if gyroDrift > Sensor.GYRO_DRIFT_THRESHOLD or accelDrift > Sensor.ACCEL_DRIFT_THRESHOLD:
+                
+                message = "Stored calibration has drifted (gyro: {0:.3f}º/s; accel: {1:.3f}g)"\
+                    .format(gyroDrift, accelDrift)
+                print(message)
+                logging.info(message)
+                
+                calibration = None
         
-        i = 0
-        while i < 100:
+        return calibration
+    
+    
+    def calibrate(self):
+        '''
+        Calibrates sensor. The stored calibration of the current temperature is used while it is still valid.
+        '''
+        
+        temperature = self._readTemperature()
+        calibration = self._loadCalibration(temperature)
+        
+        if calibration != None:
             
-            self._gyroOffset[0] += self._readRawGyroX()
-            self._gyroOffset[1] += self._readRawGyroY()
-            self._gyroOffset[2] += self._readRawGyroZ()
+            self._gyroOffset = calibration.getGyroOffset()
+            self._accOffset = calibration.getAccelOffset()
+            self._accAnglesOffset = calibration.getAngles()[0:2]
+            self._localGravity = calibration.getGravity()
             
-            time.sleep(0.01)
-            i += 1
+        else:
             
-        for index in range(3):
-            self._gyroOffset[index] /= float(i) 
+            print("Calibrating accelerometer and gyro...")
+            self._gyroOffset, self._accOffset = self._sampleRaw(Sensor.CALIBRATION_SAMPLES)
+            
+            #Calculate sensor installation angles
+            self._accAnglesOffset[0] = math.degrees(math.atan2(self._accOffset[1], self._accOffset[2]))
+            self._accAnglesOffset[1] = -math.degrees(math.atan2(self._accOffset[0], self._accOffset[2]))
+            
+            #Calculate local gravity
+            angles = [math.radians(angle) for angle in self._accAnglesOffset]
+            accels = [accel * Sensor.ACCEL2MS2 for accel in self._accOffset]       
+            self._localGravity = Vector.rotateVector3D(accels, angles + [0.0])[2]
             
-       
-        #Calculate sensor installation angles
-        self._accAnglesOffset[0] = self._previousAngles[0] = math.degrees(math.atan2(self._accOffset[1], self._accOffset[2]))
-        self._accAnglesOffset[1] = self._previousAngles[1] = -math.degrees(math.atan2(self._accOffset[0], self._accOffset[2]))
-        
-        #Calculate local gravity
-        angles = [math.radians(angle) for angle in self._accAnglesOffset]
-        accels = [accel * Sensor.ACCEL2MS2 for accel in self._accOffset]       
-        self._localGravity = Vector.rotateVector3D(accels, angles + [0.0])[2]
+            self._calibrationStore.save(Sensor.SENSOR_TYPE, \
+                                        Calibration(self._gyroOffset, self._accOffset, self._accAnglesOffset, \
+                                                    self._localGravity), \
+                                        temperature)
+        
+        self._previousAngles[0] = self._accAnglesOffset[0]
+        self._previousAngles[1] = self._accAnglesOffset[1]
+        
+        if self._estimator != None:
+            self._estimator.reset(self._accAnglesOffset + [0.0])
+            self._estimator.setGravity(self._localGravity)
             
         #TODO Calculate accel-Z error
         
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import json
+import logging
+from math import floor
+import os
+
+from config import Configuration
+
+
+class Calibration(object):
+    '''
+    Calibration values of a sensor. Units and meaning depend on the sensor, as long as it reads its own values.
+    '''
+
+    def __init__(self, gyroOffset=None, accelOffset=None, angles=None, gravity=0.0):
+        '''
+        Constructor
+
+        @param gyroOffset: Gyro's bias of each axis
+        @param accelOffset: Accelerometer's offset of each axis
+        @param angles: Installation angles
+        @param gravity: Local gravity
+        '''
+
+        self._gyroOffset = list(gyroOffset) if gyroOffset != None else [0.0] * 3
+        self._accelOffset = list(accelOffset) if accelOffset != None else [0.0] * 3
+        self._angles = list(angles) if angles != None else [0.0] * 3
+        self._gravity = gravity
+
+
+    @staticmethod
+    def fromDict(values):
+
+        return Calibration(values["gyro-offset"], values["accel-offset"], values["angles"], values["gravity"])
+
+
+    def toDict(self):
+
+        return {"gyro-offset": self._gyroOffset, "accel-offset": self._accelOffset, \
+                "angles": self._angles, "gravity": self._gravity}
+
+
+    @staticmethod
+    def drift(storedValues, values):
+        '''
+        @return: Maximum difference between the stored values and the current ones
+        '''
+
+        return max([abs(value - storedValue) for storedValue, value in zip(storedValues, values)])
+
+
+    def getGyroOffset(self):
+
+        return self._gyroOffset
+
+
+    def getAccelOffset(self):
+
+        return self._accelOffset
+
+
+    def getAngles(self):
+
+        return self._angles
+
+
+    def getGravity(self):
+
+        return self._gravity
+
+
+class CalibrationStore(object):
+    '''
+    Persists the calibration of each sensor type within temperature bands, since the sensor's bias changes
+    with the temperature. The file is read once and written on each save.
+    '''
+
+    #Calibrations of sensors without thermometer. They are valid for any temperature band.
+    NO_TEMPERATURE = "any"
+
+    #Former files only contain the installation angles of the IMU-6050 (DMP)
+    FORMER_FILE_SENSOR_TYPE = "imu6050-dmp"
+
+    _instance = None
+
+    @staticmethod
+    def getInstance():
+
+        if CalibrationStore._instance == None:
+            config = Configuration.getInstance().getConfig()
+            CalibrationStore._instance = CalibrationStore(config[Configuration.KEY_CALIBRATION_FILE], \
+                                                          config[Configuration.KEY_CALIBRATION_TEMPERATURE_BAND])
+
+        return CalibrationStore._instance
+
+
+    def __init__(self, filePath, temperatureBand):
+        '''
+        Constructor
+
+        @param filePath: File of the stored calibrations
+        @param temperatureBand: Width of each temperature band in ºC
+        '''
+
+        self._filePath = filePath
+        self._temperatureBand = temperatureBand
+        self._calibrations = None
+
+
+    def _getBandKey(self, temperature):
+
+        if temperature != None:
+            bandKey = "{0:.1f}".format(floor(temperature / self._temperatureBand) * self._temperatureBand)
+        else:
+            bandKey = CalibrationStore.NO_TEMPERATURE
+
+        return bandKey
+
+
+    def _read(self):
+
+        self._calibrations = {}
+
+        if os.path.exists(self._filePath):
+
+            with open(self._filePath, "r") as calibrationFile:
+                serializedCalibrations = " ".join(calibrationFile.readlines())
+                calibrationFile.close()
+
+            calibrations = json.loads(serializedCalibrations)
+
+            if isinstance(calibrations, dict):
+                self._calibrations = calibrations
+            else:
+                logging.info("Converting former calibration file: {0}".format(self._filePath))
+                self._calibrations = {CalibrationStore.FORMER_FILE_SENSOR_TYPE: \
+                                      {CalibrationStore.NO_TEMPERATURE: Calibration(angles=calibrations).toDict()}}
+
+
+    def load(self, sensorType, temperature=None):
+        '''
+        @param sensorType: Name of the sensor's type
+        @param temperature: Current temperature of the sensor in ºC, or None if it is unknown
+        @return: Stored calibration or None if there isn't any for the temperature band, nor for any temperature
+        '''
+
+        if self._calibrations == None:
+            self._read()
+
+        bands = self._calibrations.get(sensorType, {})
+        values = bands.get(self._getBandKey(temperature), bands.get(CalibrationStore.NO_TEMPERATURE))
+
+        return Calibration.fromDict(values) if values != None else None
+
+
+    def save(self, sensorType, calibration, temperature=None):
+        '''
+        Stores a calibration, replacing the former one of the same temperature band
+
+        @param sensorType: Name of the sensor's type
+        @param calibration: Calibration
+        @param temperature: Temperature of the sensor in ºC during the calibration, or None if it is unknown
+        '''
+
+        if self._calibrations == None:
+            self._read()
+
+        self._calibrations.setdefault(sensorType, {})[self._getBandKey(temperature)] = calibration.toDict()
+
+        #The former file is replaced at once, hence it is never left half-written
+        temporaryFilePath = self._filePath + ".tmp"
+        serializedCalibrations = json.dumps(self._calibrations)
+        with open(temporaryFilePath, "w+") as calibrationFile:
+            calibrationFile.write(serializedCalibrations + "\n")
+            calibrationFile.close()
+
+        os.rename(temporaryFilePath, self._filePath)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from collections import namedtuple
+from math import atan, atan2, sqrt
+import struct
+
+
+#Decoded DMP packet. Quaternion components are unitless, gyro is raw and accels are g.
+DmpFrame = namedtuple("DmpFrame", ["qw", "qx", "qy", "qz", "gyroX", "gyroY", "gyroZ", "accelX", "accelY", "accelZ"])
+
+
+class DmpPacketDecoder(object):
+    '''
+    Decodes the MPU-6050's DMP packets (MotionApps v2.0, 42 bytes) without copying nor modifying the source buffer.
+
+    Each value of the packet is a 32-bit big endian word, but only its 16 most significant bits are used:
+
+        [0..15] quaternion w, x, y, z
+        [16..27] gyro x, y, z
+        [28..39] accel x, y, z
+        [40..41] unused
+    '''
+
+    PACKET_SIZE = 42
+
+    LAYOUT = struct.Struct(">h2xh2xh2xh2x" + "h2xh2xh2x" + "h2xh2xh2x" + "2x")
+
+    QUATERNION_SCALE = 1.0 / 16384.0
+    ACCEL_SCALE = 1.0 / 8192.0
+
+
+    @staticmethod
+    def decode(buffer, offset=0):
+        '''
+        Decodes a packet
+
+        @param buffer: bytes, bytearray or any object supporting the buffer interface
+        @param offset: Position of the packet within the buffer
+        @return: DmpFrame
+        '''
+
+        qw, qx, qy, qz, gx, gy, gz, ax, ay, az = DmpPacketDecoder.LAYOUT.unpack_from(buffer, offset)
+
+        qScale = DmpPacketDecoder.QUATERNION_SCALE
+        aScale = DmpPacketDecoder.ACCEL_SCALE
+
+        return DmpFrame(qw * qScale, qx * qScale, qy * qScale, qz * qScale, gx, gy, gz, \
+                        ax * aScale, ay * aScale, az * aScale)
+
+
+    @staticmethod
+    def decodeLatest(buffer):
+        '''
+        Decodes the newest complete packet of a buffer which may contain several ones
+
+        @param buffer: Buffer as read from the FIFO
+        @return: DmpFrame or None if the buffer doesn't contain any complete packet
+        '''
+
+        if buffer != None and len(buffer) >= DmpPacketDecoder.PACKET_SIZE:
+            offset = (len(buffer) // DmpPacketDecoder.PACKET_SIZE - 1) * DmpPacketDecoder.PACKET_SIZE
+            frame = DmpPacketDecoder.decode(buffer, offset)
+        else:
+            frame = None
+
+        return frame
+
+
+    @staticmethod
+    def getGravity(frame):
+        '''
+        Gravity direction within the device's reference system
+
+        @param frame: DmpFrame
+        @return: Tuple (x, y, z) as g
+        '''
+
+        return (2.0 * (frame.qx * frame.qz - frame.qw * frame.qy),
+                2.0 * (frame.qw * frame.qx + frame.qy * frame.qz),
+                frame.qw * frame.qw - frame.qx * frame.qx - frame.qy * frame.qy + frame.qz * frame.qz)
+
+
+    @staticmethod
+    def getYawPitchRoll(frame, gravity):
+        '''
+        @param frame: DmpFrame
+        @param gravity: Gravity as returned by getGravity
+        @return: Tuple (yaw, pitch, roll) as radians
+        '''
+
+        qw, qx, qy, qz = frame.qw, frame.qx, frame.qy, frame.qz
+        gx, gy, gz = gravity
+
+        yaw = -atan2(2.0 * qx * qy - 2.0 * qw * qz, 2.0 * qw * qw + 2.0 * qx * qx - 1.0)
+        pitch = atan(gy / sqrt(gx * gx + gz * gz))
+        roll = -atan(gx / sqrt(gy * gy + gz * gz))
+
+        return (yaw, pitch, roll)
+
+
+    @staticmethod
+    def getLinearAccel(frame, gravity):
+        '''
+        Acceleration without gravity within the device's reference system
+
+        @return: List [x, y, z] as g
+        '''
+
+        return [frame.accelX - gravity[0], frame.accelY - gravity[1], frame.accelZ - gravity[2]]
@@ -28,9 +28,12 @@ class Imu3000Emulated(object):
     #CALIBRATION_FILE_PATH = "../calibration.config.json"
    
    
-    def __init__(self):
+    def __init__(self, estimator=None):
         '''
         Constructor
+        
+        @param estimator: Attitude estimator (see flight.stabilization.attitude). If None, the angles are calculated
+            by the complementary filter.
         '''
         
         self._gyroOffset = [0]*3
@@ -45,6 +48,8 @@ class Imu3000Emulated(object):
         
         self._lastReadAccRawData = [0]*3
         self._accLastFilteredRawData = [0]*3
+        
+        self._estimator = estimator
 
     
     def _readRawGyroX(self):
@@ -109,8 +114,24 @@ class Imu3000Emulated(object):
         return accAngles
 
 
+    def _estimate(self):
+        
+        angleSpeeds = [self._readAngSpeedX(), self._readAngSpeedY(), self._readAngSpeedZ()]
+        accels = [self._readRawAccelFilteredX() * Imu3000Emulated.ACCEL2MS2, \
+                  self._readRawAccelFilteredY() * Imu3000Emulated.ACCEL2MS2, \
+                  self._readRawAccelFilteredZ() * Imu3000Emulated.ACCEL2MS2]
+        
+        currentTime = time.time()
+        self._estimator.update(angleSpeeds, accels, currentTime - self._gyroReadTime)
+        self._gyroReadTime = currentTime
+        
+
     def readAngles(self):
         
+        if self._estimator != None:
+            #The estimator runs once per refreshState
+            return list(self._estimator.getAngles())
+        
         accAngles = self._readAccAngles()        
         angSpeed = [self._readAngSpeedX(), self._readAngSpeedY()]
         currentTime = time.time()
@@ -133,7 +154,7 @@ class Imu3000Emulated(object):
         angles = self.readAngles()
 
         angles[0] -= self._accAnglesOffset[0]
-        angles[1] -= self._accAnglesOffset[2]
+        angles[1] -= self._accAnglesOffset[1]
 
         return angles
 
@@ -182,6 +203,10 @@ class Imu3000Emulated(object):
 
     def readAccels(self):
 
+        if self._estimator != None:
+            #The estimator runs once per refreshState
+            return list(self._estimator.getAccels())
+        
         accelX = self._readRawAccelFilteredX() * Imu3000Emulated.ACCEL2MS2
         accelY = self._readRawAccelFilteredY() * Imu3000Emulated.ACCEL2MS2
         accelZ = self._readRawAccelFilteredZ() * Imu3000Emulated.ACCEL2MS2
@@ -209,7 +234,9 @@ class Imu3000Emulated(object):
         self._gyroReadTime = time.time()
     
     def refreshState(self):
-        pass
+        
+        if self._estimator != None:
+            self._estimate()
     
     def start(self):
         '''        
@@ -269,6 +296,12 @@ class Imu3000Emulated(object):
         #Calculate sensor installation angles
         self._accAnglesOffset[0] = self._previousAngles[0] = math.degrees(math.atan2(self._accOffset[1], self._accOffset[2]))
         self._accAnglesOffset[1] = self._previousAngles[1] = -math.degrees(math.atan2(self._accOffset[0], self._accOffset[2]))
+        
+        if self._estimator != None:
+            self._estimator.reset(self._accAnglesOffset + [0.0])
+            #Gravity as measured at rest
+            self._estimator.setGravity(math.sqrt(sum([accel * accel for accel in self._accOffset])) \
+                                       * Imu3000Emulated.ACCEL2MS2)
             
         #self._writeCalibrationFile()
             
@@ -5,14 +5,13 @@ Created on 04/03/2016
 @author: david
 '''
 
-from copy import deepcopy
-import json
 import logging
-from math import degrees
-from os import path
+from math import atan2, cos, degrees, radians, sin
 from threading import Thread, Lock
 import time
 
+from sensors.calibration import Calibration, CalibrationStore
+from sensors.dmp_packet import DmpPacketDecoder
 from sensors.pycomms.mpu6050 import MPU6050
 from sensors.vector import Vector
 
@@ -22,12 +21,33 @@ class Imu6050Dmp(object):
     IMU-6050 using the DMP (digital motion processing) feature
     '''
 
-    CALIBRATION_FILE_PATH = "./sensor-calibration.json"
+    SENSOR_TYPE = CalibrationStore.FORMER_FILE_SENSOR_TYPE
     GRAVITY = 9.807
+    
+    #Time the DMP needs to settle after its initialization
+    SETTLING_TIME = 20.0 #seconds
+    #Time to wait before the burst of the stored calibration's validation
+    VALIDATION_TIME = 0.5 #seconds
+    #Frames averaged at rest
+    BURST_SAMPLES = 20
+    BURST_INTERVAL = 0.01 #seconds
+    ANGLE_DRIFT_THRESHOLD = radians(1.0)
+    
+    FIFO_SIZE = 1024
+    INTERRUPT_TIMEOUT = 0.1 #seconds
 
-    def __init__(self):
+    def __init__(self, interrupt=None, calibrationStore=None):
+        '''
+        Constructor
+        
+        @param interrupt: Source of the MPU's INT signal (see sensors.interrupt). 
+            If None, the interrupt status register is polled.
+        @param calibrationStore: Store of the calibration. If None, the configured one.
+        '''
         
         self._imu = MPU6050(channel=1)
+        self._interrupt = interrupt
+        self._calibrationStore = calibrationStore if calibrationStore != None else CalibrationStore.getInstance()
 
         self._packetSize = 0
         self._angleOffset = [0.0]*3 #radians
@@ -55,6 +75,7 @@ class Imu6050Dmp(object):
         self._maxErrorAccelZ = 0.1
         
         self._packet = None
+        self._rawFrame = None
         self._isRunning = False
         self._packetReadingThread = Thread(target=self._doPacketReading)
         self._packetLock = Lock()
@@ -137,51 +158,96 @@ class Imu6050Dmp(object):
         
 
     def _readPacket(self):
+        
+        if self._interrupt != None:
+            self._readPacketOnInterrupt()
+        else:
+            self._readPacketPolling()
+            
+            
+    def _readPacketPolling(self):
     
         while self._imu.getIntStatus() < 2:
             time.sleep(0.001)
 
         fifoCount = self._imu.getFIFOCount()
         
-        if fifoCount == 1024:
+        if fifoCount == Imu6050Dmp.FIFO_SIZE:
             self._imu.resetFIFO()
             fifoCount = 0
         
         while fifoCount < self._packetSize:
             fifoCount = self._imu.getFIFOCount()
         
-        with self._packetLock:
-            self._packet = self._imu.getFIFOBlock()
+        self._publishPackets(fifoCount)
+        
+        
+    def _readPacketOnInterrupt(self):
+        
+        #The thread sleeps until the DMP signals a new packet
+        if self._interrupt.wait(Imu6050Dmp.INTERRUPT_TIMEOUT):
+            
             fifoCount = self._imu.getFIFOCount()
-            while fifoCount > 0:
-                self._packet += self._imu.getFIFOBlock()
-                fifoCount = self._imu.getFIFOCount()
+            
+            if fifoCount == Imu6050Dmp.FIFO_SIZE:
+                #Overflow. The packets' alignment is lost.
+                self._imu.resetFIFO()
+                
+            elif fifoCount >= self._packetSize:
+                self._publishPackets(fifoCount)
+                
+                
+    def _publishPackets(self, fifoCount):
+        
+        #Only whole packets are read. The remaining bytes will be read within the next iteration.
+        #The FIFO is read as a buffer, since the decoder can't unpack the list returned by getFIFOBytes
+        length = fifoCount - fifoCount % self._packetSize
+        packet = self._imu.i2c.readBlockData(MPU6050.MPU6050_RA_FIFO_R_W, length, False)
+        
+        if len(packet) == length:
+            #The buffer is replaced but never modified, hence readers can use it without copying
+            with self._packetLock:
+                self._packet = packet
+                
+        else:
+            #The bytes read were taken out of the FIFO, so the packets' alignment is lost
+            logging.warning("Short FIFO read ({0} of {1} bytes). Resetting FIFO.".format(len(packet), length))
+            self._imu.resetFIFO()
     
 
     def refreshState(self):
         
         with self._packetLock:
-            packet = deepcopy(self._packet)
-        
-        q = self._imu.dmpGetQuaternion(packet)
-        g = self._imu.dmpGetGravity(q)
-        
-        ypr = self._imu.dmpGetYawPitchRoll(q, g)
-        previousAngles = self._angles
-        self._angles = [ypr["pitch"], ypr["roll"], ypr["yaw"]]
+            packet = self._packet
         
-        previousTime = self._readTime
-        self._readTime = time.time()
-        dt = self._readTime - previousTime        
-        
-        for index in range(3):
-            self._angleSpeeds[index] = (self._angles[index] - previousAngles[index]) / dt #self._imu.dmpGetGyro(packet)
+        self._rawFrame = packet
+        frame = DmpPacketDecoder.decodeLatest(packet)
+        if frame != None:
+            
+            g = DmpPacketDecoder.getGravity(frame)
+            yaw, pitch, roll = DmpPacketDecoder.getYawPitchRoll(frame, g)
+            
+            previousAngles = self._angles
+            self._angles = [pitch, roll, yaw]
+            
+            previousTime = self._readTime
+            self._readTime = time.time()
+            dt = self._readTime - previousTime        
+            
+            for index in range(3):
+                self._angleSpeeds[index] = (self._angles[index] - previousAngles[index]) / dt
+            
+            linearAccel = DmpPacketDecoder.getLinearAccel(frame, g)
+            self._accels = Vector.rotateVector3D(linearAccel, self._angles)
 
-        accelRaw = self._imu.dmpGetAccel(packet)
-        linearAccel = self._imu.dmpGetLinearAccel(accelRaw, g)        
+    
+    def getRawFrame(self):
+        '''
+        @return: FIFO bytes used by the last refresh
+        '''
         
-        self._accels = Vector.rotateVector3D(linearAccel, self._angles)
-
+        return self._rawFrame
+    
     
     def start(self):
 
@@ -196,49 +262,143 @@ class Imu6050Dmp(object):
         # Get expected DMP packet size for later comparison
         self._packetSize = self._imu.dmpGetFIFOPacketSize()
         
+        if self._interrupt != None:
+            self._interrupt.open()
+        
         self._isRunning = True
         self._packetReadingThread.start()
         
         self.calibrate()
 
     
-    def calibrate(self):
+    def _readTemperature(self):
+        '''
+        @return: MPU-6050's temperature in ºC
+        '''
+        
+        return self._imu.i2c.readS16(MPU6050.MPU6050_RA_TEMP_OUT_H) / 340.0 + 36.53
     
-        print("Calibrating...")
-        time.sleep(20)        
-        self._imu.resetFIFO()
+    
+    def _readBurst(self, delay):
+        '''
+        Averages a burst of frames at rest
         
-        #Wait for next packet
-        time.sleep(0.05)
+        @param delay: Time to wait in seconds before the burst
+        @return: Tuple (angles [pitch, roll, yaw] as radians, linear accelerations as g) or None if there isn't
+            any packet
+        '''
         
-        with self._packetLock:
-            packet = deepcopy(self._packet)
+        self._imu.resetFIFO()
+        time.sleep(delay)
         
-        q = self._imu.dmpGetQuaternion(packet)
-        g = self._imu.dmpGetGravity(q)
+        count = 0
+        angles = [0.0]*2
+        yawSin = 0.0
+        yawCos = 0.0
+        linearAccels = [0.0]*3
         
-        if path.exists(Imu6050Dmp.CALIBRATION_FILE_PATH):
-                        
-            with open(Imu6050Dmp.CALIBRATION_FILE_PATH, "r") as calibrationFile:
-                serializedCalibration = " ".join(calibrationFile.readlines())
-                calibrationFile.close()
+        for _ in range(Imu6050Dmp.BURST_SAMPLES):
+            
+            with self._packetLock:
+                packet = self._packet
+            
+            frame = DmpPacketDecoder.decodeLatest(packet)
+            if frame != None:
+                
+                g = DmpPacketDecoder.getGravity(frame)
+                yaw, pitch, roll = DmpPacketDecoder.getYawPitchRoll(frame, g)
+                linearAccel = DmpPacketDecoder.getLinearAccel(frame, g)
                 
-            self._angleOffset = json.loads(serializedCalibration)
+                angles[0] += pitch
+                angles[1] += roll
+                #The yaw wraps around at ±180º
+                yawSin += sin(yaw)
+                yawCos += cos(yaw)
+                for index in range(3):
+                    linearAccels[index] += linearAccel[index]
+                count += 1
             
+            time.sleep(Imu6050Dmp.BURST_INTERVAL)
+        
+        if count != 0:
+            burst = ([angles[0] / count, angles[1] / count, atan2(yawSin, yawCos)], \
+                     [linearAccel / count for linearAccel in linearAccels])
         else:
+            burst = None
+        
+        return burst
+    
+    
+    def _settle(self):
+        '''
+        Waits until the DMP is settled
+        
+        @return: Burst as _readBurst returns
+        @raise Exception: The DMP doesn't produce any packet
+        '''
+        
+        print("Waiting for the DMP to settle...")
+        
+        burst = self._readBurst(Imu6050Dmp.SETTLING_TIME)
+        if burst == None:
+            raise Exception("The DMP isn't producing packets")
+        
+        return burst
+    
+    
+    def _getAngleDrift(self, calibration, burst):
+        '''
+        @return: Maximum difference of pitch and roll against the installation angles as radians
+        '''
+        
+        #The yaw is the heading, which changes from a flight to another
+        return Calibration.drift(calibration.getAngles()[0:2], burst[0][0:2])
+    
+    
+    def calibrate(self):
+        '''
+        Calibrates sensor. The DMP needs a long time to settle, hence its settling is skipped while the sensor's
+        readings still match the stored installation angles.
+        
+        The stored installation angles are never replaced, since a difference might be caused by the ground's
+        slope as well as by the sensor's mounting. In order to measure them again, the stored calibration must
+        be removed.
+        '''
+        
+        temperature = self._readTemperature()
+        calibration = self._calibrationStore.load(Imu6050Dmp.SENSOR_TYPE, temperature)
+        
+        if calibration != None:
+            
+            print("Validating stored calibration...")
+            burst = self._readBurst(Imu6050Dmp.VALIDATION_TIME)
+            
+            if burst == None or self._getAngleDrift(calibration, burst) > Imu6050Dmp.ANGLE_DRIFT_THRESHOLD:
                 
-            ypr = self._imu.dmpGetYawPitchRoll(q, g)
-            self._angleOffset = [ypr["pitch"], ypr["roll"], ypr["yaw"]]
+                burst = self._settle()
+                angleDrift = self._getAngleDrift(calibration, burst)
+                if angleDrift > Imu6050Dmp.ANGLE_DRIFT_THRESHOLD:
+                    
+                    message = "The drone is {0:.2f}º away from the stored installation angles. "\
+                        "Either it isn't level or the sensor's mounting has changed.".format(degrees(angleDrift))
+                    print(message)
+                    logging.warning(message)
+            
+            self._angleOffset = list(calibration.getAngles())
+            
+        else:
+            
+            burst = self._settle()
+            self._angleOffset = burst[0]
             
-            #Save calibration
-            serializedCalibration = json.dumps(self._angleOffset)
-            with open(Imu6050Dmp.CALIBRATION_FILE_PATH, "w+") as calibrationFile:
-                calibrationFile.write(serializedCalibration + "\n")
-                calibrationFile.close()
+        self._gravityOffset = Vector.rotateVector3D(burst[1], self._angleOffset)
         
-        accelRaw = self._imu.dmpGetAccel(packet)
-        linearAccel = self._imu.dmpGetLinearAccel(accelRaw, g)
-        self._gravityOffset = Vector.rotateVector3D(linearAccel, self._angleOffset)
+        if calibration == None:
+            
+            self._calibrationStore.save(Imu6050Dmp.SENSOR_TYPE, \
+                                        Calibration(accelOffset=self._gravityOffset, angles=self._angleOffset, \
+                                                    gravity=Imu6050Dmp.GRAVITY), \
+                                        temperature)
 
 
     def getMaxErrorZ(self):
@@ -252,6 +412,9 @@ class Imu6050Dmp(object):
         
         if self._packetReadingThread.isAlive():
             self._packetReadingThread.join()
+            
+        if self._interrupt != None:
+            self._interrupt.close()
         
         self._imu.setDMPEnabled(False)
         self._imu.setSleepEnabled(True)
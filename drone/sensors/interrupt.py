@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import logging
+import os
+import select
+from threading import Condition, Event, Thread
+import time
+
+
+class GpioInterrupt(object):
+    '''
+    Waits for edges on a GPIO input through the sysfs interface.
+
+    The calling thread sleeps within poll() until the kernel notifies an edge on the value file,
+    so no CPU is used while waiting.
+    '''
+
+    SYSFS_ROOT = "/sys/class/gpio"
+
+    EDGE_RISING = "rising"
+    EDGE_FALLING = "falling"
+    EDGE_BOTH = "both"
+
+    def __init__(self, gpio, edge=EDGE_RISING, sysfsRoot=SYSFS_ROOT):
+        '''
+        Constructor
+
+        @param gpio: Kernel's GPIO number (i.e. P9_25 is GPIO 117 on the BeagleBone)
+        @param edge: Edge which triggers the interrupt
+        @param sysfsRoot: Directory of the GPIO sysfs interface
+        '''
+
+        self._gpio = gpio
+        self._edge = edge
+        self._sysfsRoot = sysfsRoot
+
+        self._fd = None
+        self._poll = None
+
+
+    def _getPath(self, name):
+
+        return os.path.join(self._sysfsRoot, "gpio{0}".format(self._gpio), name)
+
+
+    @staticmethod
+    def _writeFile(path, value):
+
+        with open(path, "w") as sysfsFile:
+            sysfsFile.write(value)
+
+
+    def open(self):
+
+        if not os.path.exists(self._getPath("value")):
+            GpioInterrupt._writeFile(os.path.join(self._sysfsRoot, "export"), str(self._gpio))
+
+        GpioInterrupt._writeFile(self._getPath("direction"), "in")
+        GpioInterrupt._writeFile(self._getPath("edge"), self._edge)
+
+        self._fd = os.open(self._getPath("value"), os.O_RDONLY | os.O_NONBLOCK)
+
+        #Reading the value clears any pending notification
+        os.read(self._fd, 8)
+
+        self._poll = select.poll()
+        self._poll.register(self._fd, select.POLLPRI | select.POLLERR)
+
+        logging.info("Waiting interrupts on GPIO {0} ({1} edge)".format(self._gpio, self._edge))
+
+
+    def wait(self, timeout):
+        '''
+        Waits for the next edge
+
+        @param timeout: Maximum time to wait in seconds
+        @return: True if the edge happened, False on timeout
+        '''
+
+        events = self._poll.poll(timeout * 1000.0)
+        if len(events) != 0:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.read(self._fd, 8)
+            triggered = True
+        else:
+            triggered = False
+
+        return triggered
+
+
+    def close(self):
+
+        if self._fd != None:
+            self._poll.unregister(self._fd)
+            os.close(self._fd)
+            self._fd = None
+            self._poll = None
+
+
+class SimulatedInterrupt(object):
+    '''
+    Interrupt source for testing without hardware. It can be triggered manually or periodically.
+
+    The triggers are counted, so a trigger which happens while nobody is waiting isn't lost.
+    '''
+
+    def __init__(self, period=0.0):
+        '''
+        Constructor
+
+        @param period: Period in seconds of the automatic trigger. Non-positive values disable it.
+        '''
+
+        self._period = period
+        self._condition = Condition()
+        self._pending = 0
+        self._stopEvent = Event()
+        self._thread = None
+
+
+    def open(self):
+
+        with self._condition:
+            self._pending = 0
+        self._stopEvent.clear()
+
+        if self._period > 0.0:
+            self._thread = Thread(target=self._doTrigger)
+            self._thread.daemon = True
+            self._thread.start()
+
+
+    def trigger(self):
+
+        with self._condition:
+            self._pending += 1
+            self._condition.notify()
+
+
+    def wait(self, timeout):
+        '''
+        Waits for the next trigger and consumes it
+
+        @param timeout: Maximum time to wait in seconds
+        @return: True if a trigger happened, False on timeout
+        '''
+
+        deadline = time.time() + timeout
+        with self._condition:
+            #Condition.wait doesn't tell whether it timed out on Python 2
+            remaining = timeout
+            while self._pending == 0 and remaining > 0.0:
+                self._condition.wait(remaining)
+                remaining = deadline - time.time()
+
+            triggered = self._pending != 0
+            if triggered:
+                self._pending -= 1
+
+        return triggered
+
+
+    def close(self):
+
+        self._stopEvent.set()
+        if self._thread != None:
+            self._thread.join()
+            self._thread = None
+
+
+    def _doTrigger(self):
+
+        while not self._stopEvent.wait(self._period):
+            self.trigger()
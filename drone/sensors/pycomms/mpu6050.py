@@ -588,8 +588,14 @@ class MPU6050:
     dmpPacketSize = 42
     
     # construct a new object with the I2C address of the MPU6050
+    # Registers changed by the device itself. They are never read from the register shadow.
+    VOLATILE_REGISTERS = (MPU6050_RA_I2C_MST_STATUS, MPU6050_RA_DMP_INT_STATUS, MPU6050_RA_INT_STATUS, 
+                          MPU6050_RA_MOT_DETECT_STATUS, MPU6050_RA_SIGNAL_PATH_RESET, MPU6050_RA_USER_CTRL, 
+                          MPU6050_RA_PWR_MGMT_1, MPU6050_RA_BANK_SEL, MPU6050_RA_MEM_START_ADDR, 
+                          MPU6050_RA_MEM_R_W, MPU6050_RA_FIFO_R_W)
+    
     def __init__(self, address = MPU6050_DEFAULT_ADDRESS, channel=0):
-        self.i2c = PyComms(address, channel)
+        self.i2c = PyComms(address, channel, self.VOLATILE_REGISTERS)
         self.address = address
         
     def initialize(self):
@@ -1164,7 +1170,9 @@ class MPU6050:
         self.i2c.writeBit(self.MPU6050_RA_USER_CTRL, self.MPU6050_USERCTRL_SIG_COND_RESET_BIT, True)
         
     def reset(self):
-        self.i2c.writeBit(self.MPU6050_RA_PWR_MGMT_1, self.MPU6050_PWR1_DEVICE_RESET_BIT, True)       
+        self.i2c.writeBit(self.MPU6050_RA_PWR_MGMT_1, self.MPU6050_PWR1_DEVICE_RESET_BIT, True)
+        # All registers go back to their default values
+        self.i2c.invalidateShadow()
         
     def getSleepEnabled(self):
         return self.i2c.readBit(self.MPU6050_RA_PWR_MGMT_1, self.MPU6050_PWR1_SLEEP_BIT)
@@ -1249,15 +1257,7 @@ class MPU6050:
         return self.i2c.readBlock(self.MPU6050_RA_FIFO_R_W)
     
     def getFIFOBytes(self, length):
-        
-        data = []
-        
-        i = length
-        while i > 0:
-            data.append(self.getFIFOByte())
-            i -= 1
-            
-        return data
+        return self.i2c.readBytes(self.MPU6050_RA_FIFO_R_W, length)
 
     def setFIFOByte(self, data):
         self.i2c.write8(self.MPU6050_RA_FIFO_R_W, data)
@@ -1423,38 +1423,41 @@ class MPU6050:
         pass
 
     def writeMemoryBlock(self, data, dataSize, bank = 0, address = 0, verify = False):
+        # Writes in chunks. The memory address auto-increments within each bank, hence
+        # a chunk never crosses a bank boundary.
         self.setMemoryBank(bank)
         self.setMemoryStartAddress(address)
         
         i = 0
-        while i < dataSize:  
-            self.i2c.write8(self.MPU6050_RA_MEM_R_W, data[i])
+        while i < dataSize:
+            chunkSize = min(self.MPU6050_DMP_MEMORY_CHUNK_SIZE, dataSize - i, 256 - address)
+            chunk = list(data[i:i + chunkSize])
+            
+            self.i2c.writeList(self.MPU6050_RA_MEM_R_W, chunk)
 
             # Verify
             if verify:
                 self.setMemoryBank(bank)
                 self.setMemoryStartAddress(address)
-                result = self.i2c.readU8(self.MPU6050_RA_MEM_R_W)
+                result = self.i2c.readBytes(self.MPU6050_RA_MEM_R_W, chunkSize)
                 
-                if result != data[i]:
-                    print(data[i]),
+                if result != chunk:
+                    print(chunk),
                     print(result),
                     print(address)
+            
+            i += chunkSize
+            address += chunkSize
                     
             # reset adress to 0 after reaching 255
-            if address == 255:
+            if address >= 256:
                 address = 0
                 bank += 1
 
                 self.setMemoryBank(bank)
-            else:
-                address += 1
             
             self.setMemoryStartAddress(address)
 
-            # increase byte index
-            i += 1
-
 
     def writeDMPConfigurationSet(self, data, dataSize, bank = 0, address = 0, verify = False):
         # config set data is a long string of blocks with the following structure:
@@ -1803,4 +1806,4 @@ class MPU6050:
         
         # Resetting FIFO and clearing INT status one last time
         self.resetFIFO()
-        self.getIntStatus()
\ No newline at end of file
+        self.getIntStatus()
\ No newline at end of file
@@ -1,6 +1,8 @@
 #!/usr/bin/python
 
 # Python Standard Library Imports
+import struct
+
 try:
     import smbus
     
@@ -16,9 +18,42 @@ except ImportError:
 # ===========================================================================
 
 class PyComms:
-    def __init__(self, address, channel = 0):
+    # Max. length of a SMBus block transaction
+    BLOCK_MAX_LENGTH = 32
+    
+    def __init__(self, address, channel = 0, volatileRegisters = ()):
+        # volatileRegisters: registers changed by the device itself (status, self-clearing bits).
+        # They are never taken from the register shadow.
         self.address = address
         self.bus = smbus.SMBus(channel)
+        self.volatileRegisters = frozenset(volatileRegisters)
+        self.shadow = {}
+        self.decoders = {}
+    
+    def invalidateShadow(self, reg = None):
+        # Forgets the last known value of a register, or all of them (i.e. after a device reset)
+        if reg == None:
+            self.shadow.clear()
+        else:
+            self.shadow.pop(reg, None)
+    
+    def readShadow(self, reg):
+        # Returns the last known value of a register, reading it from the device only when unknown
+        if reg in self.shadow:
+            return self.shadow[reg]
+        
+        b = self.readU8(reg)
+        if b >= 0 and reg not in self.volatileRegisters:
+            self.shadow[reg] = b
+        return b
+    
+    def getDecoder(self, fmt):
+        # Precompiled struct per format
+        decoder = self.decoders.get(fmt)
+        if decoder == None:
+            decoder = struct.Struct(fmt)
+            self.decoders[fmt] = decoder
+        return decoder
 
     def reverseByteOrder(self, data):
         # Reverses the byte order of an int (16-bit) or long (32-bit) value
@@ -38,7 +73,7 @@ class PyComms:
         return data
     
     def writeBit(self, reg, bitNum, data):
-        b = self.readU8(reg)
+        b = self.readShadow(reg)
         
         if data != 0:
             b = (b | (1 << bitNum))
@@ -71,7 +106,7 @@ class PyComms:
         # 10100011 original & ~mask
         # 10101011 masked | value
         
-        b = self.readU8(reg)
+        b = self.readShadow(reg)
         mask = ((1 << length) - 1) << (bitStart - length + 1)
         data <<= (bitStart - length + 1)
         data &= mask
@@ -80,35 +115,53 @@ class PyComms:
             
         return self.write8(reg, b)
 
-    def readBytes(self, reg, length):
-        output = []
+    def readBlockData(self, reg, length, autoIncrement = True):
+        # Reads a number of bytes within as few bus transactions as possible.
+        # autoIncrement: the register address advances with each byte. Otherwise the same register
+        # is read repeatedly (i.e. FIFO)
+        output = bytearray()
         
-        i = 0
-        while i < length:
-            output.append(self.readU8(reg))
-            i += 1
+        try:
+            offset = 0
+            while offset < length:
+                chunkLength = min(length - offset, self.BLOCK_MAX_LENGTH)
+                chunkReg = reg + offset if autoIncrement else reg
+                output.extend(self.bus.read_i2c_block_data(self.address, chunkReg, chunkLength))
+                offset += chunkLength
+        except (IOError):
+            print ("Error accessing 0x%02X: Check your I2C address" % self.address)
             
-        return output        
+        return output
+    
+    def readStruct(self, reg, fmt):
+        # Reads consecutive registers and decodes them according to a struct format (i.e. ">hhh")
+        decoder = self.getDecoder(fmt)
+        data = self.readBlockData(reg, decoder.size)
+        if len(data) != decoder.size:
+            return None
+        return decoder.unpack_from(data)
+    
+    def readWords(self, reg, count, signed = True, bigEndian = True):
+        # Reads a number of consecutive 16-bit values
+        fmt = (">" if bigEndian else "<") + ("h" if signed else "H") * count
+        return self.readStruct(reg, fmt)
+    
+    def readBlockList(self, reg, length, autoIncrement = True, signed = False):
+        # As readBlockData, but the bytes which couldn't be read are -1 (as readU8 does on failure)
+        data = self.readBlockData(reg, length, autoIncrement)
+        output = list(self.getDecoder("%db" % len(data)).unpack_from(data)) if signed else list(data)
+        if len(output) != length:
+            output.extend([-1] * (length - len(output)))
+        return output
+    
+    def readBytes(self, reg, length):
+        return self.readBlockList(reg, length, False)
         
     def readBytesListU(self, reg, length):
-        output = []
-        
-        i = 0
-        while i < length:
-            output.append(self.readU8(reg + i))
-            i += 1
-            
-        return output
+        return self.readBlockList(reg, length)
 
     def readBytesListS(self, reg, length):
-        output = []
-        
-        i = 0
-        while i < length:
-            output.append(self.readS8(reg + i))
-            i += 1
-            
-        return output        
+        return self.readBlockList(reg, length, signed = True)
     
     def writeList(self, reg, list):
         # Writes an array of bytes using I2C format"
@@ -126,7 +179,10 @@ class PyComms:
         # Writes an 8-bit value to the specified register/address
         try:
             self.bus.write_byte_data(self.address, reg, value)
+            if reg not in self.volatileRegisters:
+                self.shadow[reg] = value & 0xFF
         except (IOError):
+            self.shadow.pop(reg, None)
             print ("Error accessing 0x%02X: Check your I2C address" % self.address)
             return -1
 
@@ -153,22 +209,10 @@ class PyComms:
 
     def readU16(self, reg):
         # Reads an unsigned 16-bit value from the I2C device
-        try:
-            hibyte = self.bus.read_byte_data(self.address, reg)
-            result = (hibyte << 8) + self.bus.read_byte_data(self.address, reg + 1)
-            return result
-        except (IOError):
-            print ("Error accessing 0x%02X: Check your I2C address" % self.address)
-            return -1
+        result = self.readStruct(reg, ">H")
+        return result[0] if result != None else -1
 
     def readS16(self, reg):
         # Reads a signed 16-bit value from the I2C device
-        try:
-            hibyte = self.bus.read_byte_data(self.address, reg)
-            if hibyte > 127:
-                hibyte -= 256
-            result = (hibyte << 8) + self.bus.read_byte_data(self.address, reg + 1)
-            return result
-        except (IOError):
-            print ("Error accessing 0x%02X: Check your I2C address" % self.address)
-            return -1
\ No newline at end of file
+        result = self.readStruct(reg, ">h")
+        return result[0] if result != None else -1
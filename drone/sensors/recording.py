@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import logging
+import struct
+import time
+
+from flight.stabilization.scheduler import monotonic
+
+
+class SensorRecordWriter(object):
+    '''
+    Writes a sensor record file.
+
+    The file starts with a header (magic, version, sample width) followed by records. Each record starts with
+    its type and timestamp (seconds as double):
+
+    - State: Sample as float32 values. Layout: angle speeds (3), device angles (3), accels (3)
+    - Raw: Length (uint16) and bytes of a frame as read from the device (i.e. DMP packets)
+
+    All values are little endian.
+    '''
+
+    MAGIC = b"EBSR"
+    VERSION = 1
+    SAMPLE_WIDTH = 9
+
+    RECORD_STATE = 1
+    RECORD_RAW = 2
+
+    HEADER = struct.Struct("<4sHH")
+    RECORD_HEADER = struct.Struct("<Bd")
+    STATE = struct.Struct("<{0}f".format(SAMPLE_WIDTH))
+    RAW_LENGTH = struct.Struct("<H")
+
+    def __init__(self, stream):
+        '''
+        Constructor
+
+        @param stream: Binary stream to write into
+        '''
+
+        self._stream = stream
+        self._stream.write(SensorRecordWriter.HEADER.pack(SensorRecordWriter.MAGIC, SensorRecordWriter.VERSION, \
+                                                          SensorRecordWriter.SAMPLE_WIDTH))
+
+
+    def writeState(self, timestamp, sample):
+        '''
+        @param timestamp: Time of the sample in seconds
+        @param sample: List of SAMPLE_WIDTH values
+        '''
+
+        self._stream.write(SensorRecordWriter.RECORD_HEADER.pack(SensorRecordWriter.RECORD_STATE, timestamp) \
+                           + SensorRecordWriter.STATE.pack(*sample))
+
+
+    def writeRaw(self, timestamp, frame):
+        '''
+        @param timestamp: Time of the frame in seconds
+        @param frame: Bytes as read from the device, either a buffer or a list of integers
+        '''
+
+        #On Python 2, bytes(list) is the list's text
+        frame = bytes(bytearray(frame))
+        self._stream.write(SensorRecordWriter.RECORD_HEADER.pack(SensorRecordWriter.RECORD_RAW, timestamp) \
+                           + SensorRecordWriter.RAW_LENGTH.pack(len(frame)) + frame)
+
+
+    def close(self):
+
+        self._stream.close()
+
+
+class SensorRecordReader(object):
+    '''
+    Reads a whole sensor record file. See SensorRecordWriter.
+    '''
+
+    def __init__(self, data):
+        '''
+        Constructor
+
+        @param data: Content of the file
+        '''
+
+        self._states = []
+        self._rawFrames = []
+
+        magic, version, width = SensorRecordWriter.HEADER.unpack_from(data, 0)
+        if magic != SensorRecordWriter.MAGIC or version != SensorRecordWriter.VERSION \
+            or width != SensorRecordWriter.SAMPLE_WIDTH:
+            raise Exception("Unknown sensor record format")
+
+        offset = SensorRecordWriter.HEADER.size
+        length = len(data)
+        while offset < length:
+
+            recordType, timestamp = SensorRecordWriter.RECORD_HEADER.unpack_from(data, offset)
+            offset += SensorRecordWriter.RECORD_HEADER.size
+
+            if recordType == SensorRecordWriter.RECORD_STATE:
+                self._states.append((timestamp, list(SensorRecordWriter.STATE.unpack_from(data, offset))))
+                offset += SensorRecordWriter.STATE.size
+
+            elif recordType == SensorRecordWriter.RECORD_RAW:
+                frameLength = SensorRecordWriter.RAW_LENGTH.unpack_from(data, offset)[0]
+                offset += SensorRecordWriter.RAW_LENGTH.size
+                self._rawFrames.append((timestamp, data[offset:offset + frameLength]))
+                offset += frameLength
+
+            else:
+                raise Exception("Unknown sensor record type {0}".format(recordType))
+
+
+    @staticmethod
+    def readFile(filePath):
+
+        with open(filePath, "rb") as recordFile:
+            data = recordFile.read()
+
+        return SensorRecordReader(data)
+
+
+    def getStates(self):
+        '''
+        @return: List of tuples (timestamp, sample)
+        '''
+
+        return self._states
+
+
+    def getRawFrames(self):
+        '''
+        @return: List of tuples (timestamp, frame)
+        '''
+
+        return self._rawFrames
+
+
+class SensorRecorder(object):
+    '''
+    Wraps any sensor and records the state read after each refresh.
+
+    The wrapped sensor is read once per refresh, hence the readings are exactly the recorded ones.
+    Optionally, the raw frames of sensors providing them (see Imu6050Dmp.getRawFrame) are also recorded.
+    '''
+
+    def __init__(self, sensor, filePath, recordRaw=False, clock=time.time):
+        '''
+        Constructor
+
+        @param sensor: Sensor to record
+        @param filePath: Record file. It will be overwritten when the sensor starts.
+        @param recordRaw: Records the raw frames too
+        @param clock: Function returning the timestamps
+        '''
+
+        self._sensor = sensor
+        self._filePath = filePath
+        self._recordRaw = recordRaw
+        self._clock = clock
+
+        self._writer = None
+        self._lastRawFrame = None
+
+        self._angleSpeeds = [0.0] * 3
+        self._angles = [0.0] * 3
+        self._accels = [0.0] * 3
+
+
+    def refreshState(self):
+
+        sensor = self._sensor
+
+        sensor.refreshState()
+        timestamp = self._clock()
+
+        self._angleSpeeds = sensor.readAngleSpeeds()
+        self._angles = sensor.readDeviceAngles()
+        self._accels = sensor.readAccels()
+
+        if self._writer != None:
+            self._writer.writeState(timestamp, self._angleSpeeds + self._angles + self._accels)
+
+            if self._recordRaw:
+                frame = sensor.getRawFrame() if hasattr(sensor, "getRawFrame") else None
+                #The same frame might be consumed by several refreshes
+                if frame != None and frame is not self._lastRawFrame:
+                    self._writer.writeRaw(timestamp, frame)
+                    self._lastRawFrame = frame
+
+
+    def readAngleSpeeds(self):
+
+        return list(self._angleSpeeds)
+
+
+    def readAngles(self):
+
+        return self._sensor.readAngles()
+
+
+    def readDeviceAngles(self):
+
+        return list(self._angles)
+
+
+    def readAccels(self):
+
+        return list(self._accels)
+
+
+    def resetGyroReadTime(self):
+
+        self._sensor.resetGyroReadTime()
+
+
+    def start(self):
+
+        self._sensor.start()
+
+        self._writer = SensorRecordWriter(open(self._filePath, "wb"))
+
+        text = "Recording sensor into \"{0}\".".format(self._filePath)
+        print(text)
+        logging.info(text)
+
+
+    def calibrate(self):
+
+        self._sensor.calibrate()
+
+
+    def stop(self):
+
+        self._sensor.stop()
+
+        if self._writer != None:
+            self._writer.close()
+            self._writer = None
+
+
+    def getMaxErrorZ(self):
+
+        return self._sensor.getMaxErrorZ()
+
+
+class ReplaySensor(object):
+    '''
+    Feeds the states of a sensor record. Each refresh takes the next state.
+    The states are fed as fast as they are requested, or paced with the original timing.
+    When the record is finished, the last state is kept.
+    '''
+
+    MAX_ERROR_Z = 0.1
+
+    def __init__(self, filePath, realTime=False, clock=monotonic, sleep=time.sleep):
+        '''
+        Constructor
+
+        @param filePath: Record file
+        @param realTime: Waits until the original time of each state
+        @param clock: Function returning the current time in seconds for the real-time pacing
+        @param sleep: Function sleeping the given seconds for the real-time pacing
+        '''
+
+        self._filePath = filePath
+        self._states = SensorRecordReader.readFile(filePath).getStates()
+        self._realTime = realTime
+        self._clock = clock
+        self._sleep = sleep
+
+        self._reset()
+
+
+    def _reset(self):
+
+        self._index = 0
+        self._timestamp = 0.0
+        self._sample = [0.0] * SensorRecordWriter.SAMPLE_WIDTH
+        self._startTime = None
+
+
+    def refreshState(self):
+
+        if self._index < len(self._states):
+
+            self._timestamp, self._sample = self._states[self._index]
+            self._index += 1
+
+            if self._realTime:
+                now = self._clock()
+                if self._startTime == None:
+                    self._startTime = now - (self._timestamp - self._states[0][0])
+                else:
+                    delay = self._startTime + (self._timestamp - self._states[0][0]) - now
+                    if delay > 0.0:
+                        self._sleep(delay)
+
+
+    def isFinished(self):
+
+        return self._index >= len(self._states)
+
+
+    def getSampleCount(self):
+
+        return len(self._states)
+
+
+    def getTimestamp(self):
+        '''
+        @return: Original time of the current state
+        '''
+
+        return self._timestamp
+
+
+    def readAngleSpeeds(self):
+
+        return self._sample[0:3]
+
+
+    def readAngles(self):
+
+        return self._sample[3:6]
+
+
+    def readDeviceAngles(self):
+
+        return self._sample[3:6]
+
+
+    def readAccels(self):
+
+        return self._sample[6:9]
+
+
+    def resetGyroReadTime(self):
+        pass
+
+
+    def start(self):
+
+        self._reset()
+
+        text = "Replaying sensor from \"{0}\" ({1} samples).".format(self._filePath, len(self._states))
+        print(text)
+        logging.info(text)
+
+
+    def calibrate(self):
+        pass
+
+
+    def stop(self):
+        pass
+
+
+    def getMaxErrorZ(self):
+
+        return ReplaySensor.MAX_ERROR_Z
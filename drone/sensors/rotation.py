@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from collections import namedtuple
+from math import asin, atan2, cos, sin, sqrt
+
+
+try:
+    import numpy
+
+except ImportError:
+
+    numpy = None
+
+
+class Rotation(object):
+    '''
+    3D rotation as a precomputed matrix. It can be reused to rotate many vectors by the same angles.
+
+    Angles are radians [x, y, z] and rotate on the X-axis first, then on the Y-axis and finally on the Z-axis,
+    as Vector.rotateVector3D does. The matrix is the closed form of the three rotations' product.
+    '''
+
+    def __init__(self, angles):
+        '''
+        Constructor
+
+        @param angles: Rotation angles as radians [x, y, z]
+        '''
+
+        cosx = cos(angles[0])
+        sinx = sin(angles[0])
+
+        cosy = cos(angles[1])
+        siny = sin(angles[1])
+
+        cosz = cos(angles[2])
+        sinz = sin(angles[2])
+
+        sinyCosx = siny * cosx
+        sinySinx = siny * sinx
+
+        self._matrix = ((cosz * cosy, cosz * sinySinx - sinz * cosx, cosz * sinyCosx + sinz * sinx),
+                        (sinz * cosy, sinz * sinySinx + cosz * cosx, sinz * sinyCosx - cosz * sinx),
+                        (-siny, cosy * sinx, cosy * cosx))
+
+
+    @staticmethod
+    def rotate(vector, angles):
+        '''
+        Rotates a single vector
+
+        @param vector: 3D vector as [x,y,z]
+        @param angles: Rotation angles as radians [x, y, z]
+        @return: Rotated vector
+        '''
+
+        return Rotation(angles).apply(vector)
+
+
+    @staticmethod
+    def fromQuaternion(quaternion):
+        '''
+        @param quaternion: Unit quaternion
+        @return: Rotation
+        '''
+
+        rotation = Rotation.__new__(Rotation)
+        rotation._matrix = quaternion.toMatrix()
+
+        return rotation
+
+
+    def getMatrix(self):
+        '''
+        @return: Rotation matrix as a tuple of rows
+        '''
+
+        return self._matrix
+
+
+    def apply(self, vector):
+        '''
+        @param vector: 3D vector as [x,y,z]
+        @return: Rotated vector
+        '''
+
+        x, y, z = vector
+        row0, row1, row2 = self._matrix
+
+        return [row0[0] * x + row0[1] * y + row0[2] * z,
+                row1[0] * x + row1[1] * y + row1[2] * z,
+                row2[0] * x + row2[1] * y + row2[2] * z]
+
+
+    def applyInverse(self, vector):
+        '''
+        Undoes the rotation
+
+        @param vector: 3D vector as [x,y,z]
+        @return: Rotated vector
+        '''
+
+        x, y, z = vector
+        row0, row1, row2 = self._matrix
+
+        return [row0[0] * x + row1[0] * y + row2[0] * z,
+                row0[1] * x + row1[1] * y + row2[1] * z,
+                row0[2] * x + row1[2] * y + row2[2] * z]
+
+
+    def applyAll(self, vectors):
+        '''
+        Rotates several vectors by the same rotation
+
+        @param vectors: Array (N, 3) if NumPy is available, otherwise list of 3D vectors
+        @return: Rotated vectors as the same kind of container
+        '''
+
+        if numpy != None and isinstance(vectors, numpy.ndarray):
+            rotated = numpy.dot(vectors, numpy.array(self._matrix).T)
+        else:
+            rotated = [self.apply(vector) for vector in vectors]
+
+        return rotated
+
+
+    def toQuaternion(self):
+        '''
+        @return: Unit quaternion of the same rotation
+        '''
+
+        return Quaternion.fromMatrix(self._matrix)
+
+
+class Quaternion(namedtuple("Quaternion", ["w", "x", "y", "z"])):
+    '''
+    Quaternion as immutable tuple (w, x, y, z).
+
+    Euler angles follow the Rotation's convention: radians [x, y, z], applied on X, then Y, then Z.
+    '''
+
+    __slots__ = ()
+
+    @staticmethod
+    def identity():
+
+        return Quaternion(1.0, 0.0, 0.0, 0.0)
+
+
+    @staticmethod
+    def fromEuler(angles):
+        '''
+        @param angles: Rotation angles as radians [x, y, z]
+        @return: Unit quaternion
+        '''
+
+        cosx = cos(angles[0] / 2.0)
+        sinx = sin(angles[0] / 2.0)
+        cosy = cos(angles[1] / 2.0)
+        siny = sin(angles[1] / 2.0)
+        cosz = cos(angles[2] / 2.0)
+        sinz = sin(angles[2] / 2.0)
+
+        #q = qz * qy * qx
+        return Quaternion(cosz * cosy * cosx + sinz * siny * sinx,
+                          cosz * cosy * sinx - sinz * siny * cosx,
+                          cosz * siny * cosx + sinz * cosy * sinx,
+                          sinz * cosy * cosx - cosz * siny * sinx)
+
+
+    @staticmethod
+    def fromAxisAngle(axis, angle):
+        '''
+        @param axis: Unit vector of the rotation axis
+        @param angle: Angle as radians
+        @return: Unit quaternion
+        '''
+
+        halfSin = sin(angle / 2.0)
+
+        return Quaternion(cos(angle / 2.0), axis[0] * halfSin, axis[1] * halfSin, axis[2] * halfSin)
+
+
+    @staticmethod
+    def fromMatrix(matrix):
+        '''
+        @param matrix: Rotation matrix as rows
+        @return: Unit quaternion with non-negative w
+        '''
+
+        (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = matrix
+        trace = m00 + m11 + m22
+
+        #The largest component is calculated first for numerical stability
+        if trace > 0.0:
+            s = sqrt(trace + 1.0) * 2.0
+            quaternion = Quaternion(0.25 * s, (m21 - m12) / s, (m02 - m20) / s, (m10 - m01) / s)
+        elif m00 > m11 and m00 > m22:
+            s = sqrt(1.0 + m00 - m11 - m22) * 2.0
+            quaternion = Quaternion((m21 - m12) / s, 0.25 * s, (m01 + m10) / s, (m02 + m20) / s)
+        elif m11 > m22:
+            s = sqrt(1.0 + m11 - m00 - m22) * 2.0
+            quaternion = Quaternion((m02 - m20) / s, (m01 + m10) / s, 0.25 * s, (m12 + m21) / s)
+        else:
+            s = sqrt(1.0 + m22 - m00 - m11) * 2.0
+            quaternion = Quaternion((m10 - m01) / s, (m02 + m20) / s, (m12 + m21) / s, 0.25 * s)
+
+        return quaternion if quaternion.w >= 0.0 else quaternion.negate()
+
+
+    def __mul__(self, other):
+        '''
+        Hamilton product. The result rotates by other first, then by self.
+        '''
+
+        w1, x1, y1, z1 = self
+        w2, x2, y2, z2 = other
+
+        return Quaternion(w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+                          w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                          w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+                          w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2)
+
+
+    def negate(self):
+
+        return Quaternion(-self.w, -self.x, -self.y, -self.z)
+
+
+    def conjugate(self):
+
+        return Quaternion(self.w, -self.x, -self.y, -self.z)
+
+
+    def norm(self):
+
+        return sqrt(self.w * self.w + self.x * self.x + self.y * self.y + self.z * self.z)
+
+
+    def normalize(self):
+        '''
+        @return: Unit quaternion. The identity if the norm is zero.
+        '''
+
+        norm = self.norm()
+
+        return Quaternion(self.w / norm, self.x / norm, self.y / norm, self.z / norm) if norm != 0.0 \
+            else Quaternion.identity()
+
+
+    def toEuler(self):
+        '''
+        @return: Rotation angles as radians [x, y, z]
+        '''
+
+        w, x, y, z = self
+
+        #Rounding errors might lead out of the domain of asin at ±90º
+        sinY = max(-1.0, min(1.0, 2.0 * (w * y - z * x)))
+
+        return [atan2(2.0 * (w * x + y * z), 1.0 - 2.0 * (x * x + y * y)),
+                asin(sinY),
+                atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))]
+
+
+    def toMatrix(self):
+        '''
+        @return: Rotation matrix of a unit quaternion as a tuple of rows
+        '''
+
+        w, x, y, z = self
+
+        xx = x * x
+        yy = y * y
+        zz = z * z
+        xy = x * y
+        xz = x * z
+        yz = y * z
+        wx = w * x
+        wy = w * y
+        wz = w * z
+
+        return ((1.0 - 2.0 * (yy + zz), 2.0 * (xy - wz), 2.0 * (xz + wy)),
+                (2.0 * (xy + wz), 1.0 - 2.0 * (xx + zz), 2.0 * (yz - wx)),
+                (2.0 * (xz - wy), 2.0 * (yz + wx), 1.0 - 2.0 * (xx + yy)))
+
+
+    def rotate(self, vector):
+        '''
+        Rotates a vector by a unit quaternion
+
+        @param vector: 3D vector as [x,y,z]
+        @return: Rotated vector
+        '''
+
+        w, x, y, z = self
+        vx, vy, vz = vector
+
+        #v' = v + 2w(q × v) + 2q × (q × v)
+        tx = 2.0 * (y * vz - z * vy)
+        ty = 2.0 * (z * vx - x * vz)
+        tz = 2.0 * (x * vy - y * vx)
+
+        return [vx + w * tx + y * tz - z * ty,
+                vy + w * ty + z * tx - x * tz,
+                vz + w * tz + x * ty - y * tx]
+
+
+def rotateVectors(vectors, angles):
+    '''
+    Rotates N vectors, each one by its own angles
+
+    @param vectors: Array (N, 3) if NumPy is available, otherwise list of 3D vectors
+    @param angles: Array (N, 3) of rotation angles as radians [x, y, z], or the same kind of list
+    @return: Rotated vectors as the same kind of container
+    '''
+
+    if numpy != None and isinstance(vectors, numpy.ndarray):
+
+        angles = numpy.asarray(angles, dtype=float)
+        cosx, cosy, cosz = numpy.cos(angles).T
+        sinx, siny, sinz = numpy.sin(angles).T
+        x, y, z = vectors.T
+
+        sinyCosx = siny * cosx
+        sinySinx = siny * sinx
+
+        rotated = numpy.empty(vectors.shape)
+        rotated[:, 0] = cosz * cosy * x + (cosz * sinySinx - sinz * cosx) * y + (cosz * sinyCosx + sinz * sinx) * z
+        rotated[:, 1] = sinz * cosy * x + (sinz * sinySinx + cosz * cosx) * y + (sinz * sinyCosx - cosz * sinx) * z
+        rotated[:, 2] = -siny * x + cosy * sinx * y + cosy * cosx * z
+
+    else:
+        rotated = [Rotation(vectorAngles).apply(vector) for vector, vectorAngles in zip(vectors, angles)]
+
+    return rotated
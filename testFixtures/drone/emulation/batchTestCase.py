@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+
+from emulation.batch import BatchEmulatedDrone, BatchSimulation, numpy
+from emulation.drone import EmulatedDrone
+from flight.driving.mixer import Mixer, NumpyMixer
+
+
+@unittest.skipIf(numpy == None, "NumPy is not available")
+class BatchTestCase(unittest.TestCase):
+
+
+    def test_sameAsEmulatedDrone(self):
+
+        period = 0.005
+        times = [0.0]
+        drone = EmulatedDrone(lambda: times[0], period, EmulatedDrone.INTEGRATOR_TRAPEZOIDAL)
+        drone.initStateTime()
+
+        batch = BatchEmulatedDrone(2)
+
+        throttles = [[40.0, 42.0, 41.0, 39.0], [50.0, 48.0, 52.0, 51.0], [45.0, 45.5, 44.0, 46.0]]
+        for step in range(300):
+
+            stepThrottles = throttles[step % len(throttles)]
+            for index in range(4):
+                drone.getPropeller(index).setThrottle(stepThrottles[index])
+            times[0] += period
+
+            batch.setThrottles([stepThrottles, stepThrottles])
+            batch.step(period)
+
+        state = drone.getState()
+        for row in range(2):
+            for axis in range(3):
+                self.assertAlmostEqual(batch.getAngleSpeeds()[row][axis], state._angleSpeeds[axis], 6, \
+                                       "Angle-speed {0} of drone {1} differs".format(axis, row))
+                self.assertAlmostEqual(batch.getWorldAngles()[row][axis], state._angles[axis], 6, \
+                                       "Angle {0} of drone {1} differs".format(axis, row))
+                self.assertAlmostEqual(batch.getAccels()[row][axis], state._accels[axis], 6, \
+                                       "Accel {0} of drone {1} differs".format(axis, row))
+
+
+    def test_mixerSameAsMixer(self):
+
+        matrix = Mixer.getMatrix(Mixer.FRAME_HEX_X)
+        mixer = Mixer(matrix, 0.0, 80.0)
+        numpyMixer = NumpyMixer(matrix, 0.0, 80.0)
+
+        commands = [(0.0, 0.0, 0.0, 40.0), (5.0, -3.0, 1.0, 75.0), (-50.0, 60.0, -20.0, 5.0), (1.0, 2.0, 3.0, 0.0)]
+        outputs = numpyMixer.mix([c[0] for c in commands], [c[1] for c in commands], [c[2] for c in commands], \
+                                 [c[3] for c in commands])
+
+        for row, command in enumerate(commands):
+            expected = mixer.mix(*command)
+            for motor in range(len(matrix)):
+                self.assertAlmostEqual(outputs[row][motor], expected[motor], 9, \
+                                       "Motor {0} of command {1} differs".format(motor, row))
+
+
+    def test_simulationIsReproducible(self):
+
+        def simulate():
+
+            simulation = BatchSimulation(BatchEmulatedDrone.createRandomized(8, seed=3), seed=5)
+            simulation.setAnglesSpeedConstants([100.0, 100.0, 100.0], [10.0, 10.0, 10.0], [1.0, 1.0, 1.0])
+            simulation.setThrottle(50.0)
+            simulation.run(0.5)
+
+            return simulation.getDrone().getWorldAngles().copy()
+
+        angles1 = simulate()
+        angles2 = simulate()
+
+        self.assertEqual(angles1.shape, (8, 3), "Wrong shape of the state")
+        self.assertTrue(numpy.array_equal(angles1, angles2), "The same seeds must produce the same flights")
+        self.assertFalse(numpy.allclose(angles1[0], angles1[1]), "Randomized drones should fly differently")
+
+
+    def test_rejectFrameWithoutFourMotors(self):
+
+        drone = BatchEmulatedDrone(2)
+
+        self.assertRaises(Exception, BatchSimulation, drone, frame=Mixer.FRAME_HEX_X)
+        self.assertIsNotNone(BatchSimulation(drone, frame=Mixer.FRAME_QUAD_X), "Quadcopters must be accepted")
+
+
+    def test_gaussianNoise(self):
+
+        simulation = BatchSimulation(BatchEmulatedDrone(1), seed=7)
+        noise = simulation._noisify(numpy.zeros(100000), [-1.0, 3.0])
+
+        self.assertAlmostEqual(noise.mean(), 1.0, delta=0.02, msg="Wrong mean of the noise")
+        self.assertAlmostEqual(noise.std(), 4.0 / 12.0 ** 0.5, delta=0.02, msg="Wrong deviation of the noise")
+        self.assertGreater(numpy.abs(noise - 1.0).max(), 2.0, "The noise must not be bounded as the uniform one")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_sameAsEmulatedDrone']
+    unittest.main()
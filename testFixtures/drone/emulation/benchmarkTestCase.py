@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import json
+import unittest
+
+from config import Configuration
+from emulation.benchmark import ControlBenchmark, tracemalloc
+
+
+class BenchmarkTestCase(unittest.TestCase):
+
+
+    def test_lockstep(self):
+
+        #The dummy IMU sleeps on each reading
+        for imuClass, ticks in [(Configuration.VALUE_IMU_CLASS_EMULATION, 200), (Configuration.VALUE_IMU_CLASS_DUMMY, 20)]:
+
+            results = ControlBenchmark(ControlBenchmark.MODE_LOCKSTEP, imuClass=imuClass).run(ticks)
+
+            self.assertEqual(results["ticks"], ticks, "Wrong number of ticks")
+            self.assertGreater(results["loopRate"], 0.0, "Loop rate must be measured")
+            for key in ["period", "tickTime", "cpuTime"]:
+                self.assertLessEqual(results[key]["p50"], results[key]["max"], \
+                                     "Percentiles of {0} are not consistent".format(key))
+
+            #Results must be comparable between runs
+            self.assertEqual(json.loads(json.dumps(results)), results, "Results are not serializable as JSON")
+
+
+    @unittest.skipIf(tracemalloc == None, "The allocations can't be traced")
+    def test_tickAllocations(self):
+
+        results = ControlBenchmark(ControlBenchmark.MODE_LOCKSTEP, traceAllocations=True).run(50)
+
+        #Each tick allocates and frees some objects, even if the memory in use doesn't grow
+        self.assertGreater(results["tickAllocatedBytes"]["max"], 0.0, "Transient allocations must be measured")
+        self.assertFalse(tracemalloc.is_tracing(), "Tracing must stop with the benchmark")
+
+        self.assertIsNone(ControlBenchmark().run(5)["tickAllocatedBytes"], "Allocations are traced on demand")
+
+
+    def test_limitsRequired(self):
+
+        self.assertRaises(Exception, ControlBenchmark().run)
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_lockstep']
+    unittest.main()
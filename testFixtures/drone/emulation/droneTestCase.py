@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+
+from emulation.drone import EmulatedDrone
+
+
+class EmulatedDroneTestCase(unittest.TestCase):
+
+    THROTTLES = [40.0, 45.0, 50.0, 35.0]
+
+
+    def _fly(self, substep, integrator, duration, commandPeriod=0.0):
+        '''
+        Flies a drone with constant throttles
+
+        @param commandPeriod: Period of repeating the same throttles. Zero means the throttles are set only once.
+        '''
+
+        times = [0.0]
+        drone = EmulatedDrone(lambda: times[0], substep, integrator)
+        drone.initStateTime()
+
+        for index in range(4):
+            drone.getPropeller(index).setThrottle(EmulatedDroneTestCase.THROTTLES[index])
+
+        elapsedTime = 0.0
+        while elapsedTime < duration - 1e-9:
+            elapsedTime += 0.01
+            times[0] = elapsedTime
+            if commandPeriod > 0.0:
+                #A single propeller at a time must not break the physics
+                index = int(round(elapsedTime * 100)) % 4
+                drone.getPropeller(index).setThrottle(EmulatedDroneTestCase.THROTTLES[index])
+            drone.update()
+
+        return drone.getState()
+
+
+    def test_physicsIndependentOfCommands(self):
+
+        quiet = self._fly(0.002, EmulatedDrone.INTEGRATOR_TRAPEZOIDAL, 1.0)
+        chatty = self._fly(0.002, EmulatedDrone.INTEGRATOR_TRAPEZOIDAL, 1.0, 0.01)
+
+        for axis in range(3):
+            self.assertAlmostEqual(quiet._angleSpeeds[axis], chatty._angleSpeeds[axis], 9, \
+                                   "Angle-speed {0} depends on the commands' rate".format(axis))
+            self.assertAlmostEqual(quiet._speeds[axis], chatty._speeds[axis], 9, \
+                                   "Speed {0} depends on the commands' rate".format(axis))
+
+
+    def test_integratorsAccuracy(self):
+
+        reference = self._fly(0.0001, EmulatedDrone.INTEGRATOR_RK4, 1.0)
+
+        errors = {}
+        for integrator in [EmulatedDrone.INTEGRATOR_SEMI_IMPLICIT_EULER, EmulatedDrone.INTEGRATOR_RK4]:
+            state = self._fly(0.01, integrator, 1.0)
+            errors[integrator] = sum([abs(state._speeds[axis] - reference._speeds[axis]) for axis in range(3)])
+
+        self.assertLess(errors[EmulatedDrone.INTEGRATOR_RK4], 1e-6, "RK4 is not accurate enough")
+        self.assertLess(errors[EmulatedDrone.INTEGRATOR_RK4], errors[EmulatedDrone.INTEGRATOR_SEMI_IMPLICIT_EULER], \
+                        "RK4 should be more accurate than semi-implicit Euler")
+
+
+    def test_stateSnapshots(self):
+
+        times = [0.0]
+        drone = EmulatedDrone(lambda: times[0], 0.005)
+        drone.initStateTime()
+        for index in range(4):
+            drone.getPropeller(index).setThrottle(EmulatedDroneTestCase.THROTTLES[index])
+
+        state1 = drone.getState()
+        self.assertIs(drone.getState(), state1, "The state must be shared while the physics don't advance")
+        self.assertRaises(AttributeError, setattr, state1, "_angles", [0.0]*3)
+
+        times[0] = 0.002
+        self.assertIs(drone.getState(), state1, "The state must not change within a substep")
+
+        times[0] = 0.02
+        state2 = drone.getState()
+        self.assertEqual(state2.getVersion(), state1.getVersion() + 1, "A snapshot must be published once per update")
+        self.assertNotEqual(state2._angleSpeeds, state1._angleSpeeds, "The published state didn't advance")
+
+
+    def test_unknownIntegrator(self):
+
+        self.assertRaises(Exception, EmulatedDrone, integrator="unknown")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_physicsIndependentOfCommands']
+    unittest.main()
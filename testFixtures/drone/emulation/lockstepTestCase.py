@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+
+from emulation.lockstep import LockstepSimulation
+
+
+class LockstepTestCase(unittest.TestCase):
+
+
+    def _simulate(self, seed, duration):
+
+        simulation = LockstepSimulation(seed)
+        controller = simulation.getController()
+
+        for axis in range(3):
+            controller.alterPidAnglesSpeedConstants(axis, 100.0, 10.0, 1.0)
+
+        simulation.start()
+        controller.setPidThrottleThreshold(20.0)
+        controller.addThrottle(50.0)
+
+        state = simulation.run(duration)
+        simulation.stop()
+
+        return simulation, state
+
+
+    def test_simulatedTime(self):
+
+        simulation, _ = self._simulate(1, 0.6)
+
+        #The clock advances one period when the PID starts, then one per step
+        self.assertAlmostEqual(simulation.getClock().now(), 0.6 + simulation.getPeriod(), 6, \
+                               "Simulated time didn't advance as expected")
+        self.assertAlmostEqual(simulation.getController().readState()._currentPeriod, simulation.getPeriod(), 9, \
+                               "PID's period must be exactly the simulated one")
+
+
+    def test_reproducible(self):
+
+        _, state1 = self._simulate(1, 1.0)
+        _, state2 = self._simulate(1, 1.0)
+        _, state3 = self._simulate(2, 1.0)
+
+        self.assertEqual(state1._angles + state1._angleSpeeds, state2._angles + state2._angleSpeeds, \
+                         "The same seed must produce the same flight")
+        self.assertNotEqual(state1._angles + state1._angleSpeeds, state3._angles + state3._angleSpeeds, \
+                            "Different seeds should produce different flights")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_reproducible']
+    unittest.main()
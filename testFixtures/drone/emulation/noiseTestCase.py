@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+
+from emulation import noise
+from emulation.noise import NoiseStream, SensorNoiseModel
+
+
+class NoiseTestCase(unittest.TestCase):
+
+
+    def test_sameSeedSameSamples(self):
+
+        stream1 = NoiseStream(7, 16)
+        stream2 = NoiseStream(7, 16)
+        stream3 = NoiseStream(8, 16)
+
+        #Crosses several block boundaries
+        samples1 = [stream1.next() for _ in range(50)]
+        samples2 = [stream2.next() for _ in range(50)]
+        samples3 = [stream3.next() for _ in range(50)]
+
+        self.assertEqual(samples1, samples2, "The same seed must produce the same samples")
+        self.assertNotEqual(samples1, samples3, "Different seeds must produce different samples")
+
+
+    def test_fallbackWithoutNumpy(self):
+
+        numpy = noise.numpy
+        noise.numpy = None
+        try:
+            stream = NoiseStream(3, 64)
+            samples = [stream.next() for _ in range(1000)]
+
+        finally:
+            noise.numpy = numpy
+
+        mean = sum(samples) / len(samples)
+        deviation = (sum([(sample - mean) ** 2 for sample in samples]) / len(samples)) ** 0.5
+
+        self.assertAlmostEqual(mean, 0.0, delta=0.15, msg="Wrong mean of the standard normal samples")
+        self.assertAlmostEqual(deviation, 1.0, delta=0.15, msg="Wrong deviation of the standard normal samples")
+
+
+    def test_whiteNoise(self):
+
+        model = SensorNoiseModel(3, 1, whiteNoise=0.5, offset=2.0)
+        readings = [model.apply([10.0, 20.0, 30.0]) for _ in range(2000)]
+
+        for axis, value in enumerate([10.0, 20.0, 30.0]):
+            errors = [reading[axis] - value for reading in readings]
+            mean = sum(errors) / len(errors)
+            deviation = (sum([(error - mean) ** 2 for error in errors]) / len(errors)) ** 0.5
+
+            self.assertAlmostEqual(mean, 2.0, delta=0.05, msg="Wrong offset of the axis {0}".format(axis))
+            self.assertAlmostEqual(deviation, 0.5, delta=0.05, msg="Wrong deviation of the axis {0}".format(axis))
+
+
+    def test_biasWalk(self):
+
+        model = SensorNoiseModel(3, 2, biasWalk=1.0)
+
+        readings = model.apply([0.0, 0.0, 0.0], 0.0)
+        self.assertEqual(readings, [0.0, 0.0, 0.0], "The bias mustn't drift without elapsed time")
+
+        for step in range(1, 101):
+            readings = model.apply([0.0, 0.0, 0.0], step * 0.01)
+
+        self.assertEqual(readings, model.getBiases(), "Without white noise, the readings must be the biases")
+        self.assertNotEqual(readings, [0.0, 0.0, 0.0], "The bias must drift along the time")
+
+
+    def test_scaleError(self):
+
+        model = SensorNoiseModel(3, 3, scaleError=0.01)
+        readings = model.apply([100.0, 100.0, 100.0])
+
+        self.assertEqual(readings, [100.0 * scale for scale in model.getScales()], "Wrong scale-factor error")
+        self.assertEqual(readings, model.apply([100.0, 100.0, 100.0]), "The scale-factor error must be constant")
+
+
+    def test_vibration(self):
+
+        model = SensorNoiseModel(3, 4, vibration=1.0, vibrationFrequency=2.0)
+
+        model.apply([0.0, 0.0, 0.0], 0.0, [0.0] * 4)
+        readings = model.apply([0.0, 0.0, 0.0], 0.01, [0.0] * 4)
+        self.assertEqual(readings, [0.0, 0.0, 0.0], "The motors mustn't vibrate while stopped")
+
+        maxVibration = 0.0
+        for step in range(2, 100):
+            readings = model.apply([0.0, 0.0, 0.0], step * 0.01, [50.0] * 4)
+            maxVibration = max([maxVibration] + [abs(reading) for reading in readings])
+
+        self.assertGreater(maxVibration, 0.0, "The motors must vibrate while running")
+        self.assertLessEqual(maxVibration, 4 * 0.5, "The vibration must be proportional to the throttle")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from math import radians
+import unittest
+
+from emulation.drone import EmulatedDrone
+from emulation.propeller import PropellerBank
+from sensors.vector import Vector
+
+
+class PropellerBankTestCase(unittest.TestCase):
+
+
+    def test_rotateThrust(self):
+
+        for angles in [[0.0, 0.0, 0.0], [10.0, 0.0, 0.0], [0.0, -20.0, 0.0], [15.0, -30.0, 45.0], [-170.0, 80.0, -120.0]]:
+
+            expected = Vector.rotateVector3D([0.0, 0.0, 12.5], [radians(angle) for angle in angles])
+            thrust = PropellerBank.rotateThrust(12.5, angles)
+
+            for axis in range(3):
+                self.assertAlmostEqual(thrust[axis], expected[axis], places=12, \
+                                       msg="Wrong thrust on axis {0} for angles {1}".format(axis, angles))
+
+
+    def test_setThrottle(self):
+
+        drone = EmulatedDrone(lambda: 0.0)
+        bank = PropellerBank(drone, 0.04, [1.0, 0.5], [0.5, 0.5], [0, 1], 0.1)
+
+        bank.getPropeller(0).setThrottle(60.0)
+        bank.getPropeller(1).setThrottle(5.0)
+
+        self.assertEqual(bank.getThrottles(), [60.0, 5.0], "Wrong throttles")
+        self.assertAlmostEqual(bank.getPropeller(0).getThrustModule(), 50.0 * 0.04 * 9.807, places=9, \
+                               msg="Wrong thrust above the throttle threshold")
+        self.assertEqual(bank.getPropeller(1).getThrustModule(), 0.0, "Wrong thrust below the throttle threshold")
+        self.assertAlmostEqual(bank.getTorque(), 0.1 * bank.getThrustModule(), places=9, \
+                               msg="Clockwise propellers must counter-rotate positive")
+        self.assertAlmostEqual(bank.getPropeller(1).getOrtogonalAccel(), 5.0 * 0.02 * 9.807 / 0.5, places=9, \
+                               msg="Wrong orthogonal acceleration")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_rotateThrust']
+    unittest.main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from config import Configuration
+from emulation.tuning.scenario import Scenario
+from emulation.tuning.search import SearchParameter, GridSearch, CoordinateDescentSearch, CrossEntropySearch
+from emulation.tuning.tuner import GainParameter, PidTuner
+
+
+class TunerTestCase(unittest.TestCase):
+
+    OPTIMUM = [3.0, -1.5]
+
+
+    def _evaluate(self, candidates):
+
+        return [sum([(value - optimum) ** 2 for value, optimum in zip(values, TunerTestCase.OPTIMUM)]) \
+                for values in candidates]
+
+
+    def test_searches(self):
+
+        parameters = [SearchParameter("a", 0.0, 4.0), SearchParameter("b", -2.0, 2.0)]
+
+        for search, tolerance in [(GridSearch(9), 1e-9), (CoordinateDescentSearch(10), 1e-3), \
+                                  (CrossEntropySearch(15, 20, 5, seed=1), 1e-2)]:
+
+            values, cost = search.search(parameters, self._evaluate)
+
+            self.assertLess(cost, tolerance, "{0} didn't find the optimum".format(search.__class__.__name__))
+            self.assertEqual(self._evaluate([values])[0], cost, "Best values don't match the best cost")
+
+
+    def test_tuneAndWriteConfig(self):
+
+        parameters = [GainParameter(Configuration.PID_ANGLES_SPEED_KP, [0, 1], 0.0, 100.0)]
+        scenarios = [Scenario.createAngleSpeedStep(duration=0.3)]
+        tuner = PidTuner(parameters, scenarios, workers=1)
+
+        gains, cost = tuner.tune(GridSearch(2))
+
+        self.assertEqual(gains[Configuration.PID_ANGLES_SPEED_KP][0], gains[Configuration.PID_ANGLES_SPEED_KP][1], \
+                         "Axes X and Y must share the gain")
+        self.assertEqual(cost, tuner.evaluate([[gains[Configuration.PID_ANGLES_SPEED_KP][0]]])[0], \
+                         "Evaluation must be reproducible")
+
+        config = Configuration.getInstance().getConfig()
+        previousConfig = dict(config)
+        directory = tempfile.mkdtemp()
+        try:
+            filePath = os.path.join(directory, "drone.config.json")
+            PidTuner.writeConfig(gains, filePath)
+            with open(filePath, "r") as configFile:
+                storedConfig = json.load(configFile)
+
+        finally:
+            shutil.rmtree(directory)
+            config.clear()
+            config.update(previousConfig)
+
+        for key in PidTuner.GAIN_KEYS:
+            self.assertEqual(storedConfig[key], gains[key], "Gains of {0} weren't stored".format(key))
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_searches']
+    unittest.main()
@@ -96,4 +96,14 @@ class DriverTestCase(unittest.TestCase):
         throttles = self._driver.getThrottles()
 
         #Testing in +-configuration. X-configuration, will issue different result.
-        self.assertListEqual(throttles, [60.0, 40.0, 60.0, 40.0], "Driver's motors were not properly spinned")
\ No newline at end of file
+        self.assertListEqual(throttles, [60.0, 40.0, 60.0, 40.0], "Driver's motors were not properly spinned")
+
+
+    def test_tooManyMotors(self):
+
+        #The emulated drone has only four propellers
+        self.assertRaises(Exception, Driver, Configuration.VALUE_MOTOR_CLASS_EMULATION, "hexX")
+        self.assertRaises(Exception, Driver, Configuration.VALUE_MOTOR_CLASS_LOCAL, "octoX")
+
+        self.assertEqual(Driver(Configuration.VALUE_MOTOR_CLASS_DUMMY, "hexX").getMotorCount(), 6, \
+                         "The dummy motors must fit any frame")
\ No newline at end of file
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+
+from flight.driving.mixer import Mixer
+
+
+class MixerTestCase(unittest.TestCase):
+
+
+    def test_frames(self):
+
+        for frame, motorCount in [(Mixer.FRAME_QUAD_PLUS, 4), (Mixer.FRAME_QUAD_X, 4), \
+                                  (Mixer.FRAME_HEX_X, 6), (Mixer.FRAME_OCTO_X, 8)]:
+
+            mixer = Mixer.create(frame, 0.0, 100.0)
+            throttles = list(mixer.mix(0.0, 0.0, 10.0, 50.0))
+
+            self.assertEqual(mixer.getMotorCount(), motorCount, "Wrong number of motors for {0}".format(frame))
+            self.assertAlmostEqual(sum(throttles), 50.0 * motorCount, 6, \
+                                   "Yaw must not change the total thrust for {0}".format(frame))
+
+
+    def test_saturation(self):
+
+        mixer = Mixer.create(Mixer.FRAME_QUAD_PLUS, 0.0, 80.0)
+
+        throttles = list(mixer.mix(0.0, 0.0, 30.0, 75.0))
+        self.assertEqual(throttles, [20.0, 80.0, 20.0, 80.0], "Throttle was not shifted down")
+
+        throttles = list(mixer.mix(0.0, 0.0, 30.0, 5.0))
+        self.assertEqual(throttles, [0.0, 60.0, 0.0, 60.0], "Throttle was not shifted up")
+
+
+    def test_desaturation(self):
+
+        mixer = Mixer.create(Mixer.FRAME_QUAD_PLUS, 0.0, 80.0)
+
+        throttles = list(mixer.mix(0.0, 100.0, 0.0, 40.0))
+
+        self.assertEqual(throttles, [0.0, 40.0, 80.0, 40.0], "Corrections were not scaled into the range")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_frames']
+    unittest.main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from flight.driving.motor import Motor
+
+
+class MotorTestCase(unittest.TestCase):
+    '''
+    Runs the motor against a fake sysfs tree
+    '''
+
+    def setUp(self):
+
+        self._root = tempfile.mkdtemp()
+        self._pwmPath = os.path.join(self._root, "pwm6")
+        os.mkdir(self._pwmPath)
+        for name in ["duty_ns", "run", "period_ns"]:
+            self._writeAttribute(name, "")
+
+        self._motor = Motor(0, self._root)
+        self._motor.start()
+
+
+    def tearDown(self):
+
+        self._motor.stop()
+        shutil.rmtree(self._root)
+
+
+    def _writeAttribute(self, name, text):
+
+        with open(os.path.join(self._pwmPath, name), "w") as attributeFile:
+            attributeFile.write(text)
+
+
+    def _readAttribute(self, name):
+
+        with open(os.path.join(self._pwmPath, name), "r") as attributeFile:
+            return attributeFile.read()
+
+
+    def test_start(self):
+
+        self.assertEqual(self._readAttribute("run"), "1", "PWM is not running")
+        self.assertEqual(self._readAttribute("period_ns"), str(Motor.PERIOD), "Wrong PWM period")
+        self.assertEqual(self._readAttribute("duty_ns"), "0", "Wrong initial duty")
+
+
+    def test_setThrottle(self):
+
+        self._motor.setThrottle(50.0)
+
+        self.assertEqual(self._readAttribute("duty_ns"), "1500000", "Wrong duty")
+
+
+    def test_skipUnchangedDuty(self):
+
+        self._motor.setThrottle(50.0)
+        self._writeAttribute("duty_ns", "unchanged")
+        self._motor.setThrottle(50.0)
+
+        self.assertEqual(self._readAttribute("duty_ns"), "unchanged", "Unchanged duty was written again")
+
+        self._motor.setThrottle(60.0)
+
+        self.assertEqual(self._readAttribute("duty_ns")[:7], "1600000", "Changed duty was not written")
+
+
+    def test_stop(self):
+
+        self._motor.stop()
+
+        self.assertEqual(self._readAttribute("run"), "0", "PWM was not stopped")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_start']
+    unittest.main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from math import radians
+import unittest
+
+from flight.stabilization.attitude import AttitudeEstimator, MahonyEstimator, MadgwickEstimator
+from sensors.rotation import Rotation
+
+
+class AttitudeEstimatorTestCase(unittest.TestCase):
+
+    GRAVITY = 9.807
+    PERIOD = 0.005
+
+    @staticmethod
+    def _readAccels(angles):
+        '''
+        Accelerometer readings at rest
+        '''
+
+        return Rotation([radians(angle) for angle in angles]).applyInverse([0.0, 0.0, AttitudeEstimatorTestCase.GRAVITY])
+
+
+    def _checkConvergence(self, estimator):
+
+        for angles in [[20.0, 0.0, 0.0], [0.0, -30.0, 0.0], [25.0, -15.0, 0.0]]:
+
+            estimator.reset()
+            estimator.setGravity(AttitudeEstimatorTestCase.GRAVITY)
+            accels = AttitudeEstimatorTestCase._readAccels(angles)
+            #The initial error is large, while the estimators are tuned to filter the accelerometer's noise
+            for _ in range(4000):
+                estimator.update([0.0] * 3, accels, AttitudeEstimatorTestCase.PERIOD)
+
+            for axis in range(2):
+                self.assertAlmostEqual(estimator.getAngles()[axis], angles[axis], delta=0.1, \
+                                       msg="{0} didn't converge to {1}".format(estimator.__class__.__name__, angles))
+            for axis in range(3):
+                self.assertAlmostEqual(estimator.getAccels()[axis], 0.0, delta=0.05, \
+                                       msg="The gravity must be removed from the accelerations")
+
+
+    def test_create(self):
+
+        self.assertIsInstance(AttitudeEstimator.create(AttitudeEstimator.MAHONY), MahonyEstimator, \
+                              "Wrong estimator")
+        self.assertIsInstance(AttitudeEstimator.create(AttitudeEstimator.MADGWICK), MadgwickEstimator, \
+                              "Wrong estimator")
+        self.assertIsNone(AttitudeEstimator.create("complementary"), "The complementary filter has no estimator")
+
+
+    def test_gyroIntegration(self):
+
+        for estimator in [MahonyEstimator(), MadgwickEstimator()]:
+
+            estimator.reset([0.0, 0.0, 30.0])
+            #One second turning at 10º/s on X-axis, without accelerometer
+            for _ in range(200):
+                estimator.update([10.0, 0.0, 0.0], [0.0] * 3, AttitudeEstimatorTestCase.PERIOD)
+
+            angles = estimator.getAngles()
+            self.assertAlmostEqual(angles[0], 10.0, places=4, msg="Wrong angle on X-axis")
+            self.assertAlmostEqual(angles[1], 0.0, places=4, msg="Wrong angle on Y-axis")
+            self.assertAlmostEqual(angles[2], 30.0, places=4, msg="Wrong angle on Z-axis")
+
+
+    def test_mahony(self):
+
+        self._checkConvergence(MahonyEstimator())
+
+
+    def test_madgwick(self):
+
+        self._checkConvergence(MadgwickEstimator())
+
+
+    def test_mahonyBias(self):
+
+        estimator = MahonyEstimator()
+        estimator.reset([10.0, 5.0, 0.0])
+        accels = AttitudeEstimatorTestCase._readAccels([10.0, 5.0, 0.0])
+
+        for _ in range(4000):
+            estimator.update([0.5, -0.3, 0.0], accels, AttitudeEstimatorTestCase.PERIOD)
+
+        bias = estimator.getBias()
+        self.assertAlmostEqual(bias[0], 0.5, delta=0.02, msg="Wrong bias on X-axis")
+        self.assertAlmostEqual(bias[1], -0.3, delta=0.02, msg="Wrong bias on Y-axis")
+        self.assertAlmostEqual(estimator.getAngles()[0], 10.0, delta=0.1, msg="The bias must not drift the angles")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_mahony']
+    unittest.main()
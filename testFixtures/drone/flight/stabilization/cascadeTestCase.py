@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+from flight.stabilization.cascade import ControlStage, ControllerGraph
+
+class ControllerGraphTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self._outerInput = [0.0]
+        self._innerInput = [0.0]
+        self._innerOutputs = []
+        self._outerCalculations = 0
+
+        self._outer = ControlStage("outer", [2.0], [0.0], [0.0], self._readOuter, None, 5)
+        self._inner = ControlStage("inner", [1.0], [0.0], [0.0], self._readInner, self._setInner)
+
+        #Added inner first in order to test the evaluation order
+        self._graph = ControllerGraph(0.002)
+        self._graph.addStage(self._inner).addStage(self._outer)
+        self._graph.connect(self._outer, self._inner, [(0, 0)])
+
+
+    def _readOuter(self):
+
+        self._outerCalculations += 1
+        return self._outerInput
+
+
+    def _readInner(self):
+
+        return self._innerInput
+
+
+    def _setInner(self, output):
+
+        self._innerOutputs.append(output[0])
+
+
+    def test_cascade(self):
+
+        self._outer.setTarget(1.0, 0)
+        self._graph._update(0.002)
+        self._graph._update(0.002)
+        self._graph._update(0.002)
+        self._graph._update(0.002)
+        self._graph._update(0.002)
+
+        #The outer output is used by the inner stage in the same tick
+        self.assertListEqual(self._innerOutputs, [0.0, 0.0, 0.0, 0.0, 2.0], "Stages were not properly cascaded")
+
+
+    def test_divider(self):
+
+        for _ in range(20):
+            self._graph._update(0.002)
+
+        self.assertEqual(self._outerCalculations, 4, "Outer stage didn't run at its own rate")
+        self.assertEqual(len(self._innerOutputs), 20, "Inner stage didn't run at the graph's rate")
+
+
+    def test_disabledStage(self):
+
+        self._outer.setTarget(1.0, 0)
+        self._outer.setEnabled(False)
+        for _ in range(10):
+            self._graph._update(0.002)
+
+        self.assertEqual(self._outerCalculations, 0, "Disabled stage was calculated")
+        self.assertListEqual(self._innerOutputs, [0.0]*10, "Disabled stage fed the inner stage")
+
+
+    def test_cycle(self):
+
+        self.assertRaises(Exception, self._graph.connect, self._inner, self._outer, [(0, 0)])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from random import Random
+import unittest
+
+from flight.stabilization.data_structures import DataSmoothWindow, DataStatisticsWindow
+
+
+class DataStructuresTestCase(unittest.TestCase):
+
+    SIZE = 7
+
+    @staticmethod
+    def _statistics(values):
+
+        mean = sum(values) / len(values)
+        variance = sum([(value - mean) ** 2 for value in values]) / len(values)
+        ordered = sorted(values)
+        half = len(values) // 2
+        median = ordered[half] if len(values) % 2 == 1 else (ordered[half - 1] + ordered[half]) / 2.0
+
+        return mean, variance, median
+
+
+    def _assertStatistics(self, window, samples):
+
+        for channel in range(window.getChannels()):
+            mean, variance, median = DataStructuresTestCase._statistics([sample[channel] for sample in samples])
+            self.assertAlmostEqual(window.getMeans()[channel], mean, places=9, msg="Wrong mean")
+            self.assertAlmostEqual(window.getVariances()[channel], variance, places=9, msg="Wrong variance")
+            self.assertAlmostEqual(window.getMedians()[channel], median, places=9, msg="Wrong median")
+
+
+    def test_emptyAverage(self):
+
+        window = DataSmoothWindow(3)
+        self.assertEqual(window.average(), 0.0, "The average of an empty window must be zero")
+
+
+    def test_slidingStatistics(self):
+
+        window = DataStatisticsWindow(3, DataStructuresTestCase.SIZE)
+        random = Random(1)
+        samples = []
+
+        for _ in range(50):
+            sample = [random.gauss(0.0, 1.0), random.uniform(-5.0, 5.0), random.choice([1.0, 2.0, 3.0])]
+            window.push(sample)
+            samples = (samples + [sample])[-DataStructuresTestCase.SIZE:]
+
+            self.assertEqual(window.count(), len(samples), "Wrong number of samples")
+            self._assertStatistics(window, samples)
+
+        for _ in range(DataStructuresTestCase.SIZE - 1):
+            self.assertEqual(window.pop(), samples.pop(0), "The oldest sample must be popped")
+            self._assertStatistics(window, samples)
+
+        window.pop()
+        self.assertIsNone(window.pop(), "The window must be empty")
+        self.assertEqual(window.getMeans(), [0.0] * 3, "The mean of an empty window must be zero")
+
+
+    def test_rejectSpikes(self):
+
+        window = DataStatisticsWindow(2, DataStructuresTestCase.SIZE)
+        for value in [1.0, 1.1, 0.9, 1.0, 1.05, 0.95, 1.0]:
+            window.push([value, -value])
+
+        self.assertEqual(window.rejectSpikes([1.02, -9.0], 3.0), [1.02, -1.0], "Only the spike must be replaced")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_slidingStatistics']
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from random import Random
+import unittest
+
+from flight.stabilization.kalman import KalmanFilter, VerticalEstimator
+
+
+class KalmanTestCase(unittest.TestCase):
+
+    PERIOD = 0.005
+
+    def test_constantValue(self):
+
+        kalman = KalmanFilter([[1.0]], [[0.0]])
+        random = Random(1)
+
+        for _ in range(2000):
+            kalman.predict()
+            kalman.update(5.0 + random.gauss(0.0, 0.5), [1.0], 0.25)
+
+        self.assertAlmostEqual(kalman.getState()[0], 5.0, delta=0.05, msg="Wrong estimated value")
+        self.assertLess(kalman.getCovariance()[0][0], 0.25 / 1000.0, "The covariance must decrease")
+
+
+    def test_batchUpdate(self):
+
+        sequential = KalmanFilter([[1.0, 0.0], [0.0, 1.0]], [[0.0, 0.0], [0.0, 0.0]])
+        batch = KalmanFilter([[1.0, 0.0], [0.0, 1.0]], [[0.0, 0.0], [0.0, 0.0]])
+
+        observations = [[1.0, 0.0], [1.0, 1.0]]
+        measurements = [2.0, 5.0]
+        variances = [0.5, 1.0]
+
+        for measurement, observation, variance in zip(measurements, observations, variances):
+            sequential.update(measurement, observation, variance)
+        batch.updateBatch(measurements, observations, variances)
+
+        for row in range(2):
+            self.assertAlmostEqual(batch.getState()[row], sequential.getState()[row], places=12, \
+                                   msg="The batch must be the sequential updates")
+            for column in range(2):
+                self.assertAlmostEqual(batch.getCovariance()[row][column], sequential.getCovariance()[row][column], \
+                                       places=12, msg="Wrong covariance")
+
+
+    def test_verticalEstimator(self):
+
+        estimator = VerticalEstimator(KalmanTestCase.PERIOD, budget=1.0)
+        estimator.reset(1.0)
+        random = Random(2)
+
+        #Climbing at 0.5m/s from 1m with a biased accelerometer
+        height = 1.0
+        for step in range(4000):
+            height += 0.5 * KalmanTestCase.PERIOD
+            altitude = height + random.gauss(0.0, VerticalEstimator.ALTIMETER_NOISE) if step % 4 == 0 else None
+            estimator.update(0.2 + random.gauss(0.0, VerticalEstimator.ACCEL_NOISE), altitude)
+
+        self.assertAlmostEqual(estimator.getHeight(), height, delta=0.1, msg="Wrong height")
+        self.assertAlmostEqual(estimator.getSpeed(), 0.5, delta=0.1, msg="Wrong vertical speed")
+        self.assertAlmostEqual(estimator.getAccelBias(), 0.2, delta=0.05, msg="Wrong accelerometer's bias")
+
+        statistics = estimator.getStatistics()
+        self.assertEqual(statistics.getCount(), 4000, "Each update must be measured")
+        self.assertEqual(statistics.getOverruns(), 0, "No update must exceed the budget")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_verticalEstimator']
+    unittest.main()
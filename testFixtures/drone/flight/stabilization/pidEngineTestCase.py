@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+from flight.stabilization.pid_engine import PidEngine, NumpyPidEngine, numpy
+
+class PidEngineTestCase(unittest.TestCase):
+
+    def _createEngine(self, kp, ki, kd, integralLimits=None, derivativeOnMeasurement=False, derivativeFilter=1.0):
+
+        return PidEngine(kp, ki, kd, integralLimits, derivativeOnMeasurement, derivativeFilter)
+
+
+    def test_proportional(self):
+
+        engine = self._createEngine([2.0, 3.0], [0.0]*2, [0.0]*2)
+        engine.setTargets([1.0, -1.0])
+        outputs = engine.calculate([0.5, 0.0], 0.01)
+
+        self.assertAlmostEqual(outputs[0], 1.0, msg="Proportional term was not properly calculated")
+        self.assertAlmostEqual(outputs[1], -3.0, msg="Proportional term was not properly calculated")
+
+
+    def test_integral(self):
+
+        engine = self._createEngine([0.0], [1.0], [0.0])
+        engine.setTarget(1.0, 0)
+        engine.calculate([0.0], 0.5)
+        outputs = engine.calculate([0.0], 0.5)
+
+        self.assertAlmostEqual(outputs[0], 1.0, msg="Integral term was not properly calculated")
+
+
+    def test_integralLimit(self):
+
+        engine = self._createEngine([0.0], [1.0], [0.0], [0.2])
+        engine.setTarget(1.0, 0)
+        for _ in range(10):
+            outputs = engine.calculate([0.0], 0.1)
+
+        self.assertAlmostEqual(outputs[0], 0.2, msg="Integral term was not clamped")
+
+
+    def test_derivative(self):
+
+        engine = self._createEngine([0.0], [0.0], [1.0])
+        engine.calculate([0.0], 0.1)
+        outputs = engine.calculate([0.5], 0.1)
+
+        self.assertAlmostEqual(outputs[0], -5.0, msg="Derivative term was not properly calculated")
+
+
+    def test_derivativeOnMeasurement(self):
+
+        engine = self._createEngine([0.0], [0.0], [1.0], derivativeOnMeasurement=True)
+        engine.calculate([0.0], 0.1)
+        engine.setTarget(10.0, 0)
+        outputs = engine.calculate([0.0], 0.1)
+
+        self.assertAlmostEqual(outputs[0], 0.0, msg="Target change caused a derivative kick")
+
+
+    def test_derivativeOnMeasurementFirstValue(self):
+
+        engine = self._createEngine([0.0], [0.0], [1.0], derivativeOnMeasurement=True)
+        outputs = engine.calculate([5.0], 0.1)
+        self.assertAlmostEqual(outputs[0], 0.0, msg="The first value caused a derivative kick")
+
+        engine.reset()
+        outputs = engine.calculate([-3.0], 0.1)
+        self.assertAlmostEqual(outputs[0], 0.0, msg="The first value after a reset caused a derivative kick")
+
+        outputs = engine.calculate([-2.0], 0.1)
+        self.assertAlmostEqual(outputs[0], -10.0, msg="Derivative term was not properly calculated")
+
+
+    def test_derivativeFilter(self):
+
+        engine = self._createEngine([0.0], [0.0], [1.0], derivativeFilter=0.5)
+        engine.calculate([0.0], 0.1)
+        outputs = engine.calculate([0.5], 0.1)
+
+        self.assertAlmostEqual(outputs[0], -2.5, msg="Derivative term was not filtered")
+
+
+    def test_reset(self):
+
+        engine = self._createEngine([0.0], [1.0], [0.0])
+        engine.setTarget(1.0, 0)
+        engine.calculate([0.0], 1.0)
+        engine.reset()
+        outputs = engine.calculate([1.0], 1.0)
+
+        self.assertAlmostEqual(outputs[0], 0.0, msg="Engine was not properly reset")
+
+
+@unittest.skipIf(numpy == None, "NumPy not available")
+class NumpyPidEngineTestCase(PidEngineTestCase):
+
+    def _createEngine(self, kp, ki, kd, integralLimits=None, derivativeOnMeasurement=False, derivativeFilter=1.0):
+
+        return NumpyPidEngine(kp, ki, kd, integralLimits, derivativeOnMeasurement, derivativeFilter)
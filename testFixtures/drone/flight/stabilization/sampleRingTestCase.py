@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+
+from flight.stabilization.acquisition import SampledSensor, SensorAcquisition
+from flight.stabilization.sample_ring import SampleRing
+
+
+class SampleRingTestCase(unittest.TestCase):
+
+
+    def test_readLatest(self):
+
+        ring = SampleRing(2, 4)
+        out = [0.0, 0.0]
+
+        self.assertEqual(ring.readLatest(out), (0, 0.0), "Empty ring must return no sample")
+
+        for n in range(10):
+            ring.publish([n, -n], n * 0.1)
+
+        sequence, timestamp = ring.readLatest(out)
+
+        self.assertEqual(sequence, 10, "Wrong sequence number")
+        self.assertEqual(timestamp, 0.9, "Wrong timestamp")
+        self.assertEqual(out, [9.0, -9.0], "Wrong sample values")
+
+
+    def test_publishParts(self):
+
+        ring = SampleRing(5, 4)
+        out = [0.0] * 5
+
+        ring.publishParts(([1.0, 2.0], [3.0], [4.0, 5.0]), 0.5)
+
+        self.assertEqual(ring.readLatest(out), (1, 0.5), "Wrong sequence or timestamp")
+        self.assertEqual(out, [1.0, 2.0, 3.0, 4.0, 5.0], "The parts must be joined")
+
+
+    def test_readBatch(self):
+
+        ring = SampleRing(2, 4)
+        out = [0.0] * 8
+        timestamps = [0.0] * 4
+
+        for n in range(10):
+            ring.publish([n, -n], n)
+
+        length = ring.readBatch(out, timestamps, 8)
+
+        #One slot is always reserved for the producer
+        self.assertEqual(length, 3, "Batch length must be limited by the ring's capacity")
+        self.assertEqual(out[:6], [7.0, -7.0, 8.0, -8.0, 9.0, -9.0], "Samples must be sorted from the oldest")
+        self.assertEqual(timestamps[:3], [7.0, 8.0, 9.0], "Wrong timestamps")
+
+
+    def test_sampledSensor(self):
+
+        class FakeSensor(object):
+
+            def refreshState(self):
+                pass
+
+            def readAngleSpeeds(self):
+                return [1.0, 2.0, 3.0]
+
+            def readDeviceAngles(self):
+                return [4.0, 5.0, 6.0]
+
+            def readAccels(self):
+                return [7.0, 8.0, 9.0]
+
+        clock = [0.0]
+        now = lambda: clock[0]
+
+        ring = SampleRing(SensorAcquisition.SAMPLE_WIDTH)
+        acquisition = SensorAcquisition(FakeSensor(), ring, 0.01, now)
+        sensor = SampledSensor(ring, now, 0.01)
+
+        acquisition._update(0.01)
+        acquisition._update(0.01)
+        clock[0] = 0.002
+        sensor.refreshState()
+
+        self.assertEqual(sensor.readAngleSpeeds(), [1.0, 2.0, 3.0], "Wrong angle speeds")
+        self.assertEqual(sensor.readDeviceAngles(), [4.0, 5.0, 6.0], "Wrong angles")
+        self.assertEqual(sensor.readAccels(), [7.0, 8.0, 9.0], "Wrong accels")
+        self.assertEqual(sensor.getLatencyStatistics().getLastJitter(), 0.002, "Wrong latency")
+
+        angleSpeeds = sensor.readAngleSpeeds()
+        self.assertIs(sensor.readAngleSpeeds(), angleSpeeds, "The readings must not be allocated on each call")
+
+        acquisition._update(0.01)
+        acquisition._update(0.01)
+        sensor.refreshState()
+
+        self.assertEqual(sensor.getMissedSamples(), 1, "The unconsumed sample was not counted")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_readLatest']
+    unittest.main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+
+from flight.stabilization.scheduler import DeadlineScheduler, LoopStatistics
+
+
+class FakeClock(object):
+    '''
+    Clock which advances a tick on each reading and the whole time on each sleep
+    '''
+
+    TICK = 0.00001
+
+    def __init__(self):
+
+        self.time = 100.0
+        self.sleeps = []
+
+
+    def now(self):
+
+        self.time += FakeClock.TICK
+        return self.time
+
+
+    def sleep(self, delay):
+
+        self.sleeps.append(delay)
+        self.time += delay
+
+
+class LoopStatisticsTestCase(unittest.TestCase):
+
+    def test_statistics(self):
+
+        statistics = LoopStatistics(0.01, 10)
+        for jitter in range(1, 21):
+            statistics.add(jitter * 0.001, jitter > 18)
+
+        self.assertEqual(statistics.getCount(), 20, "Wrong number of iterations")
+        self.assertEqual(statistics.getOverruns(), 2, "Wrong number of overruns")
+        self.assertAlmostEqual(statistics.getAverageJitter(), 0.0105, places=9, msg="Wrong average")
+        self.assertAlmostEqual(statistics.getMaxJitter(), 0.02, places=9, msg="Wrong maximum")
+        #Only the last iterations are kept for the percentiles
+        self.assertAlmostEqual(statistics.getPercentile(0.0), 0.011, places=9, msg="Wrong minimum percentile")
+        self.assertAlmostEqual(statistics.getPercentile(100.0), 0.02, places=9, msg="Wrong maximum percentile")
+
+        statistics.reset()
+        self.assertEqual(statistics.getCount(), 0, "The statistics must be reset")
+        self.assertEqual(statistics.getPercentile(50.0), 0.0, "Empty statistics must return zero")
+
+
+class DeadlineSchedulerTestCase(unittest.TestCase):
+
+    PERIOD = 0.01
+    SPIN_TIME = 0.001
+
+    def setUp(self):
+
+        self._clock = FakeClock()
+        self._scheduler = DeadlineScheduler(DeadlineSchedulerTestCase.PERIOD, DeadlineSchedulerTestCase.SPIN_TIME, \
+                                            clock=self._clock.now, sleep=self._clock.sleep)
+
+
+    def test_deadlines(self):
+
+        startTime = self._clock.time
+        self._scheduler.start()
+
+        for iteration in range(2, 12):
+            #Some calculation within the iteration
+            self._clock.sleep(0.003)
+            self._scheduler.waitNext()
+
+            deadline = startTime + iteration * DeadlineSchedulerTestCase.PERIOD
+            self.assertGreaterEqual(self._clock.time, deadline, "The deadline must not be anticipated")
+            self.assertLess(self._clock.time - deadline, 0.0001, "The deadline must be met by spinning")
+
+        #The scheduler sleeps until the spin time before each deadline
+        for delay in self._clock.sleeps[2::2]:
+            self.assertAlmostEqual(delay, 0.006, delta=0.0001, msg="Wrong sleep time")
+
+        statistics = self._scheduler.getStatistics()
+        self.assertEqual(statistics.getCount(), 10, "Wrong number of iterations")
+        self.assertEqual(statistics.getOverruns(), 0, "No deadline was missed")
+
+
+    def test_overrun(self):
+
+        startTime = self._clock.time
+        self._scheduler.start()
+
+        #The iteration takes 3.5 periods
+        self._clock.sleep(3.5 * DeadlineSchedulerTestCase.PERIOD)
+        self._scheduler.waitNext()
+
+        #The missed deadlines are skipped
+        deadline = startTime + 5 * DeadlineSchedulerTestCase.PERIOD
+        self.assertGreaterEqual(self._clock.time, deadline, "The missed periods must be skipped")
+        self.assertLess(self._clock.time - deadline, 0.0001, "Wrong deadline after the overrun")
+        self.assertEqual(self._scheduler.getStatistics().getOverruns(), 1, "The overrun must be recorded")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_deadlines']
+    unittest.main()
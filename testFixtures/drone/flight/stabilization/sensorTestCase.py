@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import flight.stabilization.sensor as sensor
+from flight.stabilization.sensor import Sensor
+from sensors.calibration import CalibrationStore
+
+
+class FakeBus(object):
+    '''
+    SMBus replacement with the registers of each device. Registers auto-increment on block reads.
+    '''
+
+    def __init__(self):
+
+        self.registers = {Sensor.GYRO_ADDRESS: [0] * 256, Sensor.ACC_ADDRESS: [0] * 256}
+        self.blockReads = []
+        self.byteReads = 0
+
+
+    def read_byte_data(self, address, reg):
+
+        self.byteReads += 1
+        return self.registers[address][reg]
+
+
+    def write_byte_data(self, address, reg, value):
+
+        self.registers[address][reg] = value
+
+
+    def read_i2c_block_data(self, address, reg, length=32):
+
+        self.blockReads.append((address, reg, length))
+        return self.registers[address][reg:reg + length]
+
+
+class SensorTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self._bus = FakeBus()
+        self._smbus = sensor.smbus
+        bus = self._bus
+
+        class FakeSmbus(object):
+            @staticmethod
+            def SMBus(channel):
+                return bus
+
+        sensor.smbus = FakeSmbus
+
+        self._directory = tempfile.mkdtemp()
+        self._sensor = Sensor(calibrationStore=CalibrationStore(os.path.join(self._directory, "calibration.json"), 10.0))
+
+        #IMU-3000's gyro: big endian
+        self._bus.registers[Sensor.GYRO_ADDRESS][0x1D:0x23] = [0x01, 0x02, 0xFF, 0xFE, 0x80, 0x00]
+        #KXTF9: little endian and 12 bits left-justified
+        self._bus.registers[Sensor.ACC_ADDRESS][0x06:0x0C] = [0x10, 0x00, 0xF0, 0xFF, 0x00, 0x40]
+
+
+    def tearDown(self):
+
+        sensor.smbus = self._smbus
+        shutil.rmtree(self._directory)
+
+
+    def test_decoding(self):
+
+        self.assertEqual(list(self._sensor._readRawGyros()), [258, -2, -32768], "Wrong gyro decoding")
+        self.assertEqual(list(self._sensor._readRawAccels()), [1, -1, 1024], "Wrong accelerometer decoding")
+
+
+    def test_refreshTransactions(self):
+
+        self._sensor.refreshState()
+
+        self.assertEqual(sorted(self._bus.blockReads), [(Sensor.ACC_ADDRESS, 0x06, 6), (Sensor.GYRO_ADDRESS, 0x1D, 6)], \
+                         "Each device must be read within a single transaction")
+        self.assertEqual(self._bus.byteReads, 0, "Registers must not be read one by one")
+
+        angleSpeeds = self._sensor.readAngleSpeeds()
+        self.assertAlmostEqual(angleSpeeds[0], 258 * Sensor.GYRO2DEG, places=9, msg="Wrong angle speed")
+        self.assertAlmostEqual(angleSpeeds[2], -250.0, places=9, msg="Wrong angle speed")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_refreshTransactions']
+    unittest.main()
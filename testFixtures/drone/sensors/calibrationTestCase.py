@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from sensors.calibration import Calibration, CalibrationStore
+
+
+class CalibrationTestCase(unittest.TestCase):
+
+    TEMPERATURE_BAND = 10.0
+
+    def setUp(self):
+
+        self._directory = tempfile.mkdtemp()
+        self._filePath = os.path.join(self._directory, "calibration.json")
+
+
+    def tearDown(self):
+
+        shutil.rmtree(self._directory)
+
+
+    def test_persistence(self):
+
+        store = CalibrationStore(self._filePath, CalibrationTestCase.TEMPERATURE_BAND)
+        self.assertIsNone(store.load("imu", 25.0), "The store must be empty")
+
+        store.save("imu", Calibration([1.0, 2.0, 3.0], [0.1, 0.2, 0.3], [5.0, -5.0], 9.8), 25.0)
+        store.save("imu", Calibration(gravity=9.7), 35.0)
+
+        #The file is read by another store
+        store = CalibrationStore(self._filePath, CalibrationTestCase.TEMPERATURE_BAND)
+        calibration = store.load("imu", 21.0)
+        self.assertEqual(calibration.getGyroOffset(), [1.0, 2.0, 3.0], "Wrong gyro offset")
+        self.assertEqual(calibration.getAccelOffset(), [0.1, 0.2, 0.3], "Wrong accel offset")
+        self.assertEqual(calibration.getAngles(), [5.0, -5.0], "Wrong angles")
+        self.assertEqual(calibration.getGravity(), 9.8, "Wrong gravity")
+
+        self.assertEqual(store.load("imu", 39.9).getGravity(), 9.7, "Each temperature band has its own calibration")
+        self.assertIsNone(store.load("imu", 15.0), "There isn't any calibration for this temperature band")
+        self.assertIsNone(store.load("imu"), "There isn't any calibration without temperature")
+        self.assertIsNone(store.load("other", 25.0), "Each sensor type has its own calibrations")
+
+
+    def test_formerFile(self):
+
+        with open(self._filePath, "w+") as calibrationFile:
+            calibrationFile.write("[0.1, 0.2, 0.3]\n")
+
+        store = CalibrationStore(self._filePath, CalibrationTestCase.TEMPERATURE_BAND)
+        calibration = store.load(CalibrationStore.FORMER_FILE_SENSOR_TYPE, 25.0)
+        self.assertEqual(calibration.getAngles(), [0.1, 0.2, 0.3], "The former angles must be kept for any temperature")
+
+        store.save("imu", Calibration())
+        store = CalibrationStore(self._filePath, CalibrationTestCase.TEMPERATURE_BAND)
+        self.assertIsNotNone(store.load("imu"), "The former file must be replaced")
+        self.assertEqual(store.load(CalibrationStore.FORMER_FILE_SENSOR_TYPE).getAngles(), [0.1, 0.2, 0.3], \
+                         "The former angles must be converted")
+
+
+    def test_drift(self):
+
+        self.assertAlmostEqual(Calibration.drift([1.0, 2.0, 3.0], [1.1, 1.5, 3.2]), 0.5, places=9, \
+                               msg="Wrong drift")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_persistence']
+    unittest.main()
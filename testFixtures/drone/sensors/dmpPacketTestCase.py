@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import struct
+import unittest
+
+from sensors.dmp_packet import DmpPacketDecoder
+
+
+def buildPacket(quaternion, gyros, accels):
+
+    words = [int(round(value * 16384.0)) for value in quaternion] + list(gyros) \
+            + [int(round(value * 8192.0)) for value in accels]
+
+    #Only the high 16-bit of each 32-bit word are meaningful
+    packet = bytearray()
+    for word in words:
+        packet += struct.pack(">hH", word, 0xabcd)
+    packet += b"\x00\x00"
+
+    return packet
+
+
+class DmpPacketTestCase(unittest.TestCase):
+
+
+    def test_decode(self):
+
+        packet = buildPacket([0.5, -0.5, 0.25, -0.25], [1, -2, 3], [0.125, -1.0, 1.5])
+        original = bytes(packet)
+
+        frame = DmpPacketDecoder.decode(packet)
+
+        self.assertEqual(DmpPacketDecoder.PACKET_SIZE, len(packet), "Wrong packet size")
+        self.assertEqual((0.5, -0.5, 0.25, -0.25), (frame.qw, frame.qx, frame.qy, frame.qz), "Wrong quaternion")
+        self.assertEqual((1, -2, 3), (frame.gyroX, frame.gyroY, frame.gyroZ), "Wrong gyros")
+        self.assertEqual((0.125, -1.0, 1.5), (frame.accelX, frame.accelY, frame.accelZ), "Wrong accels")
+        self.assertEqual(original, bytes(packet), "The source buffer was modified")
+
+
+    def test_decodeLatest(self):
+
+        older = buildPacket([1.0, 0.0, 0.0, 0.0], [0, 0, 0], [0.0, 0.0, 1.0])
+        newer = buildPacket([0.0, 1.0, 0.0, 0.0], [0, 0, 0], [0.0, 0.0, -1.0])
+
+        frame = DmpPacketDecoder.decodeLatest(older + newer + b"\x01\x02")
+
+        self.assertEqual(1.0, frame.qx, "The newest complete packet was not decoded")
+        self.assertEqual(-1.0, frame.accelZ, "The newest complete packet was not decoded")
+        self.assertIsNone(DmpPacketDecoder.decodeLatest(older[:-1]), "An incomplete packet was decoded")
+        self.assertIsNone(DmpPacketDecoder.decodeLatest(None), "Nothing should be decoded without buffer")
+
+
+    def test_levelAttitude(self):
+
+        frame = DmpPacketDecoder.decode(buildPacket([1.0, 0.0, 0.0, 0.0], [0, 0, 0], [0.0, 0.0, 1.0]))
+
+        gravity = DmpPacketDecoder.getGravity(frame)
+        yaw, pitch, roll = DmpPacketDecoder.getYawPitchRoll(frame, gravity)
+        linearAccel = DmpPacketDecoder.getLinearAccel(frame, gravity)
+
+        self.assertEqual((0.0, 0.0, 1.0), gravity, "Wrong gravity")
+        self.assertEqual((0.0, 0.0, 0.0), (abs(yaw), abs(pitch), abs(roll)), "Level device must have null angles")
+        self.assertEqual([0.0, 0.0, 0.0], linearAccel, "Level device at rest must have no linear acceleration")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_decode']
+    unittest.main()
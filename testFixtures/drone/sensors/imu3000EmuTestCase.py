@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+
+from sensors.imu3000_emu import Imu3000Emulated
+
+
+class FakeEstimator(object):
+    '''
+    Attitude estimator which counts its updates
+    '''
+
+    def __init__(self):
+
+        self.updates = 0
+
+
+    def update(self, angleSpeeds, accels, dt):
+
+        self.updates += 1
+
+
+    def getAngles(self):
+
+        return [1.0, 2.0, 3.0]
+
+
+    def getAccels(self):
+
+        return [0.1, 0.2, 0.3]
+
+
+class Imu3000EmulatedTestCase(unittest.TestCase):
+
+    def test_estimateOncePerRefresh(self):
+
+        estimator = FakeEstimator()
+        sensor = Imu3000Emulated(estimator)
+
+        sensor.refreshState()
+        angles = sensor.readAngles()
+        accels = sensor.readAccels()
+        sensor.readDeviceAngles()
+
+        self.assertEqual(estimator.updates, 1, "The estimator must run once per refresh")
+        self.assertEqual(angles, [1.0, 2.0, 3.0], "Wrong angles")
+        self.assertEqual(accels, [0.1, 0.2, 0.3], "Wrong accels")
+
+        sensor.refreshState()
+        self.assertEqual(estimator.updates, 2, "The estimator must run on each refresh")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_estimateOncePerRefresh']
+    unittest.main()
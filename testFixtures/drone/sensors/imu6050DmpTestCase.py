@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import sensors.pycomms.pycomms as pycomms
+from sensors.calibration import Calibration, CalibrationStore
+from sensors.imu6050dmp import Imu6050Dmp
+from sensors.interrupt import SimulatedInterrupt
+from sensors.pycomms.mpu6050 import MPU6050
+from sensors.pycomms.pycomms import PyComms
+
+
+PACKET_SIZE = 42
+
+
+class FakeMpu(object):
+    '''
+    MPU-6050 replacement whose FIFO is filled by the test.
+    The FIFO is read through an actual PyComms, as MPU6050 does, hence the read data has the same types.
+    '''
+
+    def __init__(self):
+
+        self.fifo = bytearray()
+        self.intStatusReads = 0
+        self.resets = 0
+        #Number of block transactions before the bus fails
+        self.failingTransaction = None
+
+        self.i2c = PyComms(0x68, 1)
+        self.i2c.bus = self
+
+
+    def read_i2c_block_data(self, address, reg, length=32):
+
+        if self.failingTransaction != None:
+            if self.failingTransaction == 0:
+                raise IOError("Remote I/O error")
+            self.failingTransaction -= 1
+
+        data = list(self.fifo[:length])
+        del self.fifo[:length]
+        return data
+
+
+    def getIntStatus(self):
+
+        self.intStatusReads += 1
+        return 2
+
+
+    def getFIFOCount(self):
+
+        return len(self.fifo)
+
+
+    def getFIFOBytes(self, length):
+
+        return self.i2c.readBytes(MPU6050.MPU6050_RA_FIFO_R_W, length)
+
+
+    def resetFIFO(self):
+
+        self.resets += 1
+        self.fifo = bytearray()
+
+
+class Imu6050DmpTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self._smbus = pycomms.smbus
+
+        class FakeSmbus(object):
+            @staticmethod
+            def SMBus(channel):
+                return None
+
+        pycomms.smbus = FakeSmbus
+
+        self._interrupt = SimulatedInterrupt()
+        self._sensor = Imu6050Dmp(self._interrupt)
+        self._mpu = FakeMpu()
+        self._sensor._imu = self._mpu
+        self._sensor._packetSize = PACKET_SIZE
+
+
+    def tearDown(self):
+
+        pycomms.smbus = self._smbus
+
+
+    def test_readWholePacketsOnInterrupt(self):
+
+        self._mpu.fifo = bytearray(range(2 * PACKET_SIZE + 10))
+
+        self._interrupt.trigger()
+        self._sensor._readPacket()
+
+        self.assertEqual(len(self._sensor._packet), 2 * PACKET_SIZE, "Only whole packets must be read")
+        self.assertEqual(len(self._mpu.fifo), 10, "The incomplete packet must remain within the FIFO")
+        self.assertEqual(self._mpu.intStatusReads, 0, "The interrupt status must not be polled")
+
+
+    def test_noReadWithoutInterrupt(self):
+
+        self._mpu.fifo = bytearray(PACKET_SIZE)
+
+        self._sensor._readPacket()
+
+        self.assertIsNone(self._sensor._packet, "The FIFO must not be read until the interrupt is triggered")
+
+
+    def test_resetOnOverflow(self):
+
+        self._mpu.fifo = bytearray(Imu6050Dmp.FIFO_SIZE)
+
+        self._interrupt.trigger()
+        self._sensor._readPacket()
+
+        self.assertEqual(self._mpu.resets, 1, "FIFO must be reset on overflow")
+        self.assertIsNone(self._sensor._packet, "Misaligned packets must not be published")
+
+
+    def test_shortReadIsDropped(self):
+
+        self._mpu.fifo = bytearray(2 * PACKET_SIZE)
+        self._mpu.failingTransaction = 1
+
+        self._interrupt.trigger()
+        self._sensor._readPacket()
+
+        self.assertIsNone(self._sensor._packet, "Incomplete packets must not be published")
+        self.assertEqual(self._mpu.resets, 1, "FIFO must be reset after a short read")
+
+
+    def test_refreshStateFromFifo(self):
+
+        #Two packets with the quaternion (1, 0, 0, 0) and 1g on the Z-axis
+        packet = bytearray(PACKET_SIZE)
+        packet[0:2] = struct.pack(">h", 16384)
+        packet[36:38] = struct.pack(">h", 8192)
+        self._mpu.fifo = packet * 2
+
+        self._interrupt.trigger()
+        self._sensor._readPacket()
+        self._sensor.refreshState()
+
+        self.assertEqual(len(self._sensor.getRawFrame()), 2 * PACKET_SIZE, "The whole FIFO must be published")
+        for angle in self._sensor.readAngles():
+            self.assertAlmostEqual(angle, 0.0, places=6, msg="Wrong angle")
+        for accel in self._sensor.readAccels():
+            self.assertAlmostEqual(accel, 0.0, places=6, msg="Gravity must be removed")
+
+
+    def test_calibrateWithoutPackets(self):
+
+        directory = tempfile.mkdtemp()
+        times = (Imu6050Dmp.SETTLING_TIME, Imu6050Dmp.VALIDATION_TIME, Imu6050Dmp.BURST_INTERVAL)
+        Imu6050Dmp.SETTLING_TIME = Imu6050Dmp.VALIDATION_TIME = Imu6050Dmp.BURST_INTERVAL = 0.0
+        try:
+            store = CalibrationStore(os.path.join(directory, "calibration.json"), 10.0)
+            self._sensor._calibrationStore = store
+            self._sensor._readTemperature = lambda: 25.0
+
+            with self.assertRaises(Exception) as context:
+                self._sensor.calibrate()
+            self.assertIn("isn't producing packets", str(context.exception), "Wrong error without packets")
+
+            #The stored calibration can't be validated either
+            store.save(Imu6050Dmp.SENSOR_TYPE, Calibration(angles=[0.0, 0.0, 0.0]), 25.0)
+            with self.assertRaises(Exception) as context:
+                self._sensor.calibrate()
+            self.assertIn("isn't producing packets", str(context.exception), "Wrong error without packets")
+            self.assertEqual(store.load(Imu6050Dmp.SENSOR_TYPE, 25.0).getAngles(), [0.0, 0.0, 0.0], \
+                             "The stored calibration must be kept")
+
+        finally:
+            Imu6050Dmp.SETTLING_TIME, Imu6050Dmp.VALIDATION_TIME, Imu6050Dmp.BURST_INTERVAL = times
+            shutil.rmtree(directory)
+
+
+    def test_periodicSimulatedInterrupt(self):
+
+        interrupt = SimulatedInterrupt(0.001)
+        interrupt.open()
+        try:
+            self.assertTrue(interrupt.wait(1.0), "The periodic interrupt was not triggered")
+        finally:
+            interrupt.close()
+
+
+    def test_pendingSimulatedTriggers(self):
+
+        interrupt = SimulatedInterrupt()
+        interrupt.open()
+        try:
+            #Both triggers happen before anyone waits
+            interrupt.trigger()
+            interrupt.trigger()
+
+            self.assertTrue(interrupt.wait(0.0), "The first trigger was lost")
+            self.assertTrue(interrupt.wait(0.0), "The second trigger was lost")
+            self.assertFalse(interrupt.wait(0.01), "The triggers must be consumed")
+        finally:
+            interrupt.close()
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_readWholePacketsOnInterrupt']
+    unittest.main()
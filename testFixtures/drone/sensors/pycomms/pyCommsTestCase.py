@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import unittest
+import sensors.pycomms.pycomms as pycomms
+from sensors.pycomms.pycomms import PyComms
+
+
+class FakeBus(object):
+    '''
+    SMBus replacement. Registers auto-increment on block reads.
+    '''
+
+    def __init__(self):
+
+        self.registers = [0] * 256
+        self.transactions = 0
+        self.failingRegister = None
+
+
+    def read_byte_data(self, address, reg):
+
+        self.transactions += 1
+        return self.registers[reg]
+
+
+    def write_byte_data(self, address, reg, value):
+
+        self.transactions += 1
+        self.registers[reg] = value
+
+
+    def read_i2c_block_data(self, address, reg, length=32):
+
+        self.transactions += 1
+        if self.failingRegister != None and reg <= self.failingRegister < reg + length:
+            raise IOError("Remote I/O error")
+        return self.registers[reg:reg + length]
+
+
+class PyCommsTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self._bus = FakeBus()
+        self._smbus = pycomms.smbus
+        bus = self._bus
+
+        class FakeSmbus(object):
+            @staticmethod
+            def SMBus(channel):
+                return bus
+
+        pycomms.smbus = FakeSmbus
+        self._comms = PyComms(0x68, 1, [0x3A])
+
+
+    def tearDown(self):
+
+        pycomms.smbus = self._smbus
+
+
+    def test_readU16(self):
+
+        self._bus.registers[0x10:0x12] = [0xFF, 0xFE]
+
+        self.assertEqual(self._comms.readU16(0x10), 0xFFFE, "Unsigned word was not properly decoded")
+        self.assertEqual(self._bus.transactions, 1, "Word was not read within a single transaction")
+
+
+    def test_readS16(self):
+
+        self._bus.registers[0x10:0x12] = [0xFF, 0xFE]
+
+        self.assertEqual(self._comms.readS16(0x10), -2, "Signed word was not properly decoded")
+
+
+    def test_readWords(self):
+
+        self._bus.registers[0x20:0x26] = [0x00, 0x01, 0xFF, 0xFF, 0x80, 0x00]
+
+        words = self._comms.readWords(0x20, 3)
+
+        self.assertEqual(list(words), [1, -1, -32768], "Words were not properly decoded")
+        self.assertEqual(self._bus.transactions, 1, "Words were not read within a single transaction")
+
+
+    def test_readBytesListS(self):
+
+        self._bus.registers[0x30:0x33] = [0x01, 0xFF, 0x80]
+
+        self.assertListEqual(self._comms.readBytesListS(0x30, 3), [1, -1, -128], "Signed bytes were not properly decoded")
+
+
+    def test_readBytesChunks(self):
+
+        data = self._comms.readBytesListU(0x00, 70)
+
+        self.assertEqual(len(data), 70, "Wrong number of bytes read")
+        self.assertEqual(self._bus.transactions, 3, "Bytes were not read in blocks")
+
+
+    def test_readBytesFailure(self):
+
+        self._bus.registers[0x00:0x02] = [0x01, 0xFF]
+        self._bus.failingRegister = 0x22
+
+        data = self._comms.readBytesListU(0x00, 40)
+        self.assertEqual(len(data), 40, "The failed bytes must be returned too")
+        self.assertEqual(data[0:2], [0x01, 0xFF], "Wrong bytes read before the failure")
+        self.assertEqual(data[32:], [-1] * 8, "The failed bytes must be -1")
+
+        self.assertEqual(self._comms.readBytesListS(0x20, 32), [-1] * 32, "The failed bytes must be -1")
+
+
+    def test_writeBitsShadow(self):
+
+        self._bus.registers[0x1B] = 0b10000001
+        self._comms.writeBits(0x1B, 4, 2, 0b11)
+        self._comms.writeBit(0x1B, 0, 0)
+
+        self.assertEqual(self._bus.registers[0x1B], 0b10011000, "Register was not properly written")
+        #One read and two writes
+        self.assertEqual(self._bus.transactions, 3, "Register was read again instead of using the shadow")
+
+
+    def test_writeBitVolatile(self):
+
+        self._comms.writeBit(0x3A, 0, 1)
+        self._bus.registers[0x3A] = 0b10
+        self._comms.writeBit(0x3A, 2, 1)
+
+        self.assertEqual(self._bus.registers[0x3A], 0b110, "Volatile register was taken from the shadow")
+
+
+    def test_invalidateShadow(self):
+
+        self._comms.write8(0x1B, 0)
+        self._bus.registers[0x1B] = 0b100
+        self._comms.invalidateShadow()
+        self._comms.writeBit(0x1B, 0, 1)
+
+        self.assertEqual(self._bus.registers[0x1B], 0b101, "Shadow was not invalidated")
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from emulation.replay import ReplaySimulation
+from sensors.recording import SensorRecorder, SensorRecordReader, SensorRecordWriter, ReplaySensor
+
+
+class FakeSensor(object):
+    '''
+    Sensor whose readings change on each refresh
+    '''
+
+    def __init__(self):
+
+        self._count = 0
+        self._frame = None
+
+
+    def refreshState(self):
+
+        self._count += 1
+        if self._count % 2 == 1:
+            self._frame = bytearray([self._count] * 4)
+
+
+    def readAngleSpeeds(self):
+
+        return [self._count * 1.0, 0.5, -0.25]
+
+
+    def readAngles(self):
+
+        return [0.0] * 3
+
+
+    def readDeviceAngles(self):
+
+        return [self._count * 0.1, -2.0, 90.0]
+
+
+    def readAccels(self):
+
+        return [0.0, 0.0, 1.0]
+
+
+    def getRawFrame(self):
+
+        return self._frame
+
+
+    def start(self):
+        pass
+
+
+    def stop(self):
+        pass
+
+
+class RecordingTestCase(unittest.TestCase):
+
+
+    def setUp(self):
+
+        self._directory = tempfile.mkdtemp()
+        self._filePath = os.path.join(self._directory, "record.bin")
+
+
+    def tearDown(self):
+
+        shutil.rmtree(self._directory)
+
+
+    def _record(self, count):
+
+        times = [10.0]
+        recorder = SensorRecorder(FakeSensor(), self._filePath, True, lambda: times[0])
+        recorder.start()
+
+        readings = []
+        for _ in range(count):
+            recorder.refreshState()
+            readings.append(recorder.readAngleSpeeds() + recorder.readDeviceAngles() + recorder.readAccels())
+            times[0] += 0.01
+
+        recorder.stop()
+
+        return readings
+
+
+    def test_recordAndRead(self):
+
+        readings = self._record(5)
+        reader = SensorRecordReader.readFile(self._filePath)
+
+        states = reader.getStates()
+        self.assertEqual(len(states), 5, "Wrong number of states")
+        for index, (timestamp, sample) in enumerate(states):
+            self.assertAlmostEqual(timestamp, 10.0 + index * 0.01, places=9, msg="Wrong timestamp")
+            for value, expected in zip(sample, readings[index]):
+                self.assertAlmostEqual(value, expected, places=5, msg="Wrong value of the state {0}".format(index))
+
+        #The same frame is recorded once
+        frames = reader.getRawFrames()
+        self.assertEqual([bytearray(frame) for _, frame in frames], \
+                         [bytearray([1] * 4), bytearray([3] * 4), bytearray([5] * 4)], "Wrong raw frames")
+
+
+    def test_listFrame(self):
+
+        with open(self._filePath, "wb") as recordFile:
+            writer = SensorRecordWriter(recordFile)
+            writer.writeRaw(1.0, [1, 2, 255])
+            writer.writeRaw(2.0, bytearray([1, 2, 255]))
+
+        frames = SensorRecordReader.readFile(self._filePath).getRawFrames()
+        self.assertEqual([bytearray(frame) for _, frame in frames], [bytearray([1, 2, 255])] * 2, \
+                         "Lists and buffers must be recorded as the same bytes")
+
+
+    def test_replay(self):
+
+        readings = self._record(3)
+        sensor = ReplaySensor(self._filePath)
+        sensor.start()
+
+        for reading in readings:
+            self.assertFalse(sensor.isFinished(), "The replay finished too early")
+            sensor.refreshState()
+            self.assertAlmostEqual(sensor.readAngleSpeeds()[0], reading[0], places=5, msg="Wrong angle speed")
+            self.assertAlmostEqual(sensor.readDeviceAngles()[0], reading[3], places=5, msg="Wrong angle")
+
+        self.assertTrue(sensor.isFinished(), "The replay must be finished")
+
+        sensor.refreshState()
+        self.assertAlmostEqual(sensor.readAngleSpeeds()[0], readings[-1][0], places=5, \
+                               msg="The last state must be kept")
+
+
+    def test_replayRealTime(self):
+
+        self._record(4)
+
+        times = [100.0]
+        sleeps = []
+
+        def sleep(delay):
+            sleeps.append(delay)
+            times[0] += delay
+
+        sensor = ReplaySensor(self._filePath, True, lambda: times[0], sleep)
+        sensor.start()
+        for _ in range(4):
+            sensor.refreshState()
+            times[0] += 0.004
+
+        self.assertEqual(len(sleeps), 3, "Each state but the first one must wait")
+        for delay in sleeps:
+            self.assertAlmostEqual(delay, 0.006, places=6, msg="Wrong pacing")
+
+
+    def test_replaySimulation(self):
+
+        self._record(20)
+
+        simulation = ReplaySimulation(self._filePath)
+        throttles = simulation.run()
+
+        #The PID takes the first state when it starts
+        self.assertEqual(len(throttles), 19, "Wrong number of steps")
+        self.assertEqual(len(throttles[0]), simulation.getController()._driver.getMotorCount(), \
+                         "Wrong number of motors")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_recordAndRead']
+    unittest.main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+'''
+Created on 18/10/2026
+
+@author: david
+'''
+
+from math import cos, pi as PI, sin
+import unittest
+
+from sensors.rotation import Rotation, Quaternion, rotateVectors, numpy
+
+
+class RotationTestCase(unittest.TestCase):
+
+    ANGLES = [[0.0, 0.0, 0.0], [0.3, 0.0, 0.0], [0.0, -0.7, 0.0], [0.0, 0.0, 2.0], [0.4, -1.2, 2.9], [-2.5, 1.1, -0.3]]
+    VECTOR = [1.5, -2.0, 0.75]
+
+    @staticmethod
+    def _rotateBySteps(vector, angles):
+        '''
+        Rotates on each axis one after another
+        '''
+
+        x, y, z = vector
+        for axis, angle in enumerate(angles):
+            cosine = cos(angle)
+            sine = sin(angle)
+            if axis == 0:
+                y, z = y * cosine - z * sine, y * sine + z * cosine
+            elif axis == 1:
+                x, z = x * cosine + z * sine, -x * sine + z * cosine
+            else:
+                x, y = x * cosine - y * sine, x * sine + y * cosine
+
+        return [x, y, z]
+
+
+    def _assertVectorsEqual(self, vector1, vector2, message):
+
+        for value1, value2 in zip(vector1, vector2):
+            self.assertAlmostEqual(value1, value2, places=9, msg=message)
+
+
+    def test_fusedRotation(self):
+
+        for angles in RotationTestCase.ANGLES:
+            rotation = Rotation(angles)
+            rotated = rotation.apply(RotationTestCase.VECTOR)
+
+            self._assertVectorsEqual(rotated, RotationTestCase._rotateBySteps(RotationTestCase.VECTOR, angles), \
+                                     "Wrong rotation for {0}".format(angles))
+            self._assertVectorsEqual(rotation.applyInverse(rotated), RotationTestCase.VECTOR, \
+                                     "Wrong inverse rotation for {0}".format(angles))
+
+
+    def test_quaternion(self):
+
+        for angles in RotationTestCase.ANGLES:
+            expected = Rotation(angles).apply(RotationTestCase.VECTOR)
+            quaternion = Quaternion.fromEuler(angles)
+
+            self.assertAlmostEqual(quaternion.norm(), 1.0, places=12, msg="The quaternion must be unit")
+            self._assertVectorsEqual(quaternion.rotate(RotationTestCase.VECTOR), expected, \
+                                     "Wrong quaternion rotation for {0}".format(angles))
+            self._assertVectorsEqual(quaternion.toEuler(), angles, "Wrong Euler angles for {0}".format(angles))
+            self._assertVectorsEqual(Rotation.fromQuaternion(Rotation(angles).toQuaternion()).apply(RotationTestCase.VECTOR), \
+                                     expected, "Wrong matrix conversion for {0}".format(angles))
+
+
+    def test_quaternionProduct(self):
+
+        first = Quaternion.fromAxisAngle([1.0, 0.0, 0.0], 0.5)
+        second = Quaternion.fromAxisAngle([0.0, 0.0, 1.0], PI / 2.0)
+
+        product = (second * first).normalize()
+
+        self._assertVectorsEqual(product.rotate(RotationTestCase.VECTOR), \
+                                 second.rotate(first.rotate(RotationTestCase.VECTOR)), \
+                                 "The product must rotate by the right operand first")
+        self._assertVectorsEqual(product.toEuler(), [0.5, 0.0, PI / 2.0], "Wrong Euler angles of the product")
+        self._assertVectorsEqual((product * product.conjugate()), Quaternion.identity(), \
+                                 "The conjugate must undo the rotation")
+
+
+    def test_batch(self):
+
+        vectors = [[1.0, 0.0, 0.0], [0.0, 2.0, -1.0], RotationTestCase.VECTOR]
+        angles = RotationTestCase.ANGLES[3:6]
+
+        expected = [Rotation(vectorAngles).apply(vector) for vector, vectorAngles in zip(vectors, angles)]
+        for rotated, expectedVector in zip(rotateVectors(vectors, angles), expected):
+            self._assertVectorsEqual(rotated, expectedVector, "Wrong batch rotation of lists")
+
+        if numpy != None:
+            for rotated, expectedVector in zip(rotateVectors(numpy.array(vectors), numpy.array(angles)), expected):
+                self._assertVectorsEqual(rotated, expectedVector, "Wrong batch rotation of arrays")
+
+            rotation = Rotation(angles[0])
+            for rotated, vector in zip(rotation.applyAll(numpy.array(vectors)), vectors):
+                self._assertVectorsEqual(rotated, rotation.apply(vector), "Wrong rotation of all vectors")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.test_fusedRotation']
+    unittest.main()